@@ -4,11 +4,16 @@ Enhanced with predictive routing, auto-scaling, and intelligent load balancing
 """
 
 import asyncio
+import bisect
+import heapq
+import itertools
+import time
 import uuid
+from collections import defaultdict, deque
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
 
 class MessagePriority(int, Enum):
@@ -59,6 +64,141 @@ class ServiceEndpoint:
         self.current_load = 0
 
 
+class DeliveryRecord:
+    """Compact record of a finished message, kept in the delivery history."""
+
+    __slots__ = (
+        "id",
+        "source",
+        "destination",
+        "priority",
+        "status",
+        "retry_count",
+        "timestamp",
+        "latency_ms",
+    )
+
+    def __init__(self, message: RelayMessage, latency_ms: Optional[float] = None):
+        self.id = message.id
+        self.source = message.source
+        self.destination = message.destination
+        self.priority = message.priority
+        self.status = message.status
+        self.retry_count = message.retry_count
+        self.timestamp = message.timestamp
+        self.latency_ms = latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RoutingDecision:
+    """Compact record of one AI routing decision."""
+
+    __slots__ = (
+        "message_id",
+        "selected_service",
+        "timestamp",
+        "priority",
+        "payload_size",
+    )
+
+    def __init__(
+        self,
+        message_id: str,
+        selected_service: str,
+        timestamp: str,
+        priority: MessagePriority,
+        payload_size: int,
+    ):
+        self.message_id = message_id
+        self.selected_service = selected_service
+        self.timestamp = timestamp
+        self.priority = priority
+        self.payload_size = payload_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Upper bounds (ms) of the delivery latency histogram buckets; last is overflow
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class DestinationStats:
+    """Rolling delivery counters for one destination.
+
+    Covers the last ``window`` delivery outcomes: each new outcome is added
+    to the success/failure counts and latency histogram and the outcome it
+    pushes out of the window is subtracted, so updates and reads are O(1)
+    regardless of lifetime traffic.
+    """
+
+    __slots__ = ("window", "successes", "failures", "histogram", "_outcomes")
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.successes = 0
+        self.failures = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._outcomes: Deque[Tuple[bool, Optional[int]]] = deque()
+
+    @property
+    def total(self) -> int:
+        return self.successes + self.failures
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.total if self.total else 0.0
+
+    def record(self, success: bool, latency_ms: Optional[float] = None):
+        bucket = None
+        if latency_ms is not None:
+            bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+            self.histogram[bucket] += 1
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self._outcomes.append((success, bucket))
+
+        if len(self._outcomes) > self.window:
+            old_success, old_bucket = self._outcomes.popleft()
+            if old_success:
+                self.successes -= 1
+            else:
+                self.failures -= 1
+            if old_bucket is not None:
+                self.histogram[old_bucket] -= 1
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Upper bound of the histogram bucket holding the percentile."""
+        measured = sum(self.histogram)
+        if not measured:
+            return None
+        rank = percentile / 100 * measured
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                if bucket < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[bucket])
+                return float("inf")
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "failure_rate": self.failure_rate,
+            "latency_p50_ms": self.latency_percentile(50),
+            "latency_p95_ms": self.latency_percentile(95),
+            "latency_histogram": dict(
+                zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.histogram)
+            ),
+        }
+
+
 class IntelligentCircuitBreaker:
     """AI-enhanced circuit breaker with predictive failure detection"""
 
@@ -220,8 +360,8 @@ class AdaptiveLoadBalancer:
 class AIRoutingEngine:
     """AI-powered routing decisions with learning capabilities"""
 
-    def __init__(self):
-        self.routing_history: List[Dict] = []
+    def __init__(self, history_size: int = 1000):
+        self.routing_history: Deque[RoutingDecision] = deque(maxlen=history_size)
         self.performance_patterns: Dict[str, Dict] = {}
         self.learning_enabled = True
 
@@ -329,27 +469,100 @@ class AIRoutingEngine:
         self, message: RelayMessage, selected_service: str
     ):
         """Record routing decision for learning"""
-        decision_record = {
-            "message_id": message.id,
-            "selected_service": selected_service,
-            "timestamp": datetime.now().isoformat(),
-            "priority": message.priority,
-            "payload_size": len(str(message.payload)),
-        }
+        # The deque drops the oldest decision once history_size is reached
+        self.routing_history.append(
+            RoutingDecision(
+                message_id=message.id,
+                selected_service=selected_service,
+                timestamp=datetime.now().isoformat(),
+                priority=message.priority,
+                payload_size=len(str(message.payload)),
+            )
+        )
+
+
+class PriorityDispatchQueue:
+    """Priority queue of pending messages with per-destination concurrency.
+
+    Messages are kept in a heap ordered by priority, FIFO within a priority.
+    ``acquire`` hands out the highest-priority message whose destination has
+    fewer than ``max_in_flight_per_destination`` messages being delivered;
+    messages for a saturated destination are parked until ``release`` frees a
+    slot, so one slow service cannot hold up traffic for the others.
+    """
+
+    def __init__(self, max_in_flight_per_destination: int = 32):
+        self.max_in_flight_per_destination = max_in_flight_per_destination
+        self._heap: List[Tuple[int, int, RelayMessage]] = []
+        self._parked: Dict[str, Deque[Tuple[int, int, RelayMessage]]] = defaultdict(
+            deque
+        )
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._sequence = itertools.count()
+
+    def push(self, message: RelayMessage):
+        heapq.heappush(self._heap, (-message.priority, next(self._sequence), message))
+
+    def acquire(self) -> Optional[RelayMessage]:
+        """Pop the next deliverable message and reserve its destination slot."""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            destination = entry[2].destination
+            if self._in_flight[destination] >= self.max_in_flight_per_destination:
+                self._parked[destination].append(entry)
+                continue
+            self._in_flight[destination] += 1
+            return entry[2]
+        return None
+
+    def release(self, destination: str) -> bool:
+        """Free a destination slot; True if a parked message became ready."""
+        self._in_flight[destination] -= 1
+        if self._in_flight[destination] <= 0:
+            del self._in_flight[destination]
+
+        parked = self._parked.get(destination)
+        if not parked:
+            return False
+        # Entries keep their original sequence number, so FIFO order holds
+        heapq.heappush(self._heap, parked.popleft())
+        if not parked:
+            del self._parked[destination]
+        return True
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
 
-        self.routing_history.append(decision_record)
+    def __len__(self) -> int:
+        return len(self._heap) + sum(len(q) for q in self._parked.values())
 
-        # Keep only recent history (last 1000 decisions)
-        if len(self.routing_history) > 1000:
-            self.routing_history = self.routing_history[-1000:]
+    def __iter__(self) -> Iterator[RelayMessage]:
+        """Pending messages in dispatch order (for status views)."""
+        entries = list(self._heap)
+        for parked in self._parked.values():
+            entries.extend(parked)
+        return iter([entry[2] for entry in sorted(entries, key=lambda e: e[:2])])
 
 
 class RelayCore:
     """Enhanced RelayCore with AI-driven routing and optimization"""
 
-    def __init__(self):
-        self.message_queue: List[RelayMessage] = []
-        self.processed_messages: List[RelayMessage] = []
+    def __init__(
+        self,
+        num_workers: int = 8,
+        max_in_flight_per_destination: int = 32,
+        retry_delay: float = 0.5,
+        history_size: int = 10000,
+        stats_window: int = 1000,
+    ):
+        self.message_queue = PriorityDispatchQueue(max_in_flight_per_destination)
+        self.num_workers = num_workers
+        self.retry_delay = retry_delay
+        self._queue_event = asyncio.Event()
+        self.processed_messages: Deque[DeliveryRecord] = deque(maxlen=history_size)
+        self.stats_window = stats_window
+        self.destination_stats: Dict[str, DestinationStats] = {}
         self.active_connections: Dict[str, Any] = {}
         self.routing_table: Dict[str, str] = {}
         self.service_registry: Dict[str, ServiceEndpoint] = {}
@@ -385,6 +598,19 @@ class RelayCore:
             self._processing_task.cancel()
         print("🛑 RelayCore stopped")
 
+    def enqueue_message(self, message: RelayMessage):
+        """Queue a message for the dispatch workers."""
+        self.message_queue.push(message)
+        self._queue_event.set()
+
+    def _schedule_retry(self, message: RelayMessage):
+        """Re-queue a message after a backoff delay instead of immediately."""
+        delay = self.retry_delay * 2 ** max(0, message.retry_count - 1)
+        try:
+            asyncio.get_running_loop().call_later(delay, self.enqueue_message, message)
+        except RuntimeError:
+            self.enqueue_message(message)
+
     async def route_message(self, message: RelayMessage) -> bool:
         """Enhanced message routing with AI optimization"""
         try:
@@ -475,6 +701,7 @@ class RelayCore:
         self, message: RelayMessage, endpoint: ServiceEndpoint
     ) -> bool:
         """Deliver message to endpoint"""
+        started = time.perf_counter()
         try:
             message.status = MessageStatus.PROCESSING
 
@@ -488,26 +715,42 @@ class RelayCore:
             import random
 
             success = random.random() > 0.05  # 95% success rate
+            latency_ms = (time.perf_counter() - started) * 1000
 
             if success:
                 message.status = MessageStatus.DELIVERED
-                self.processed_messages.append(message)
                 self.performance_metrics["messages_processed"] += 1
             else:
                 message.status = MessageStatus.FAILED
                 if message.retry_count < message.max_retries:
                     message.retry_count += 1
                     message.status = MessageStatus.RETRYING
-                    self.message_queue.append(message)
+                    self._schedule_retry(message)
+            self._record_outcome(message, success, latency_ms)
 
             endpoint.current_load = max(0, endpoint.current_load - 1)
             return success
 
         except Exception as e:
             message.status = MessageStatus.FAILED
+            self._record_outcome(message, False)
             print(f"Delivery error: {e}")
             return False
 
+    def _record_outcome(
+        self, message: RelayMessage, success: bool, latency_ms: Optional[float] = None
+    ):
+        """Update rolling destination counters and the delivery history."""
+        stats = self.destination_stats.get(message.destination)
+        if stats is None:
+            stats = DestinationStats(self.stats_window)
+            self.destination_stats[message.destination] = stats
+        stats.record(success, latency_ms)
+
+        # Retried messages are recorded once they finally succeed or fail
+        if message.status != MessageStatus.RETRYING:
+            self.processed_messages.append(DeliveryRecord(message, latency_ms))
+
     async def _handle_circuit_breaker_open(self, message: RelayMessage) -> bool:
         """Handle circuit breaker open state"""
         # Try to find alternative route
@@ -524,12 +767,13 @@ class RelayCore:
 
         # Queue for retry later
         message.status = MessageStatus.RETRYING
-        self.message_queue.append(message)
+        self._schedule_retry(message)
         return False
 
     async def _handle_no_available_endpoint(self, message: RelayMessage) -> bool:
         """Handle no available endpoints"""
         message.status = MessageStatus.FAILED
+        self._record_outcome(message, False)
         print(f"No available endpoints for {message.destination}")
         return False
 
@@ -541,25 +785,33 @@ class RelayCore:
         if message.retry_count < message.max_retries:
             message.retry_count += 1
             message.status = MessageStatus.RETRYING
-            self.message_queue.append(message)
+            self._schedule_retry(message)
         return False
 
     async def _process_message_queue(self):
         """Background task to process message queue"""
+        await asyncio.gather(
+            *(self._dispatch_worker() for _ in range(self.num_workers))
+        )
+
+    async def _dispatch_worker(self):
+        """Deliver queued messages, highest priority first, until stopped."""
         while self._running:
+            message = self.message_queue.acquire()
+            if message is None:
+                # Sleep until enqueue_message or a freed destination slot
+                self._queue_event.clear()
+                await self._queue_event.wait()
+                continue
+
+            destination = message.destination
             try:
-                if self.message_queue:
-                    # Process high priority messages first
-                    self.message_queue.sort(key=lambda m: m.priority, reverse=True)
-
-                    message = self.message_queue.pop(0)
-                    await self.route_message(message)
-
-                await asyncio.sleep(0.1)  # Brief pause between processing
-
+                await self.route_message(message)
             except Exception as e:
                 print(f"Queue processing error: {e}")
-                await asyncio.sleep(1)
+            finally:
+                if self.message_queue.release(destination):
+                    self._queue_event.set()
 
     async def _load_initial_routing_table(self):
         """Load initial routing configuration"""
@@ -597,10 +849,16 @@ class RelayCore:
         return {
             "status": "running" if self._running else "stopped",
             "queue_size": len(self.message_queue),
+            "in_flight": self.message_queue.in_flight,
+            "dispatch_workers": self.num_workers,
             "processed_messages": len(self.processed_messages),
             "active_connections": len(self.active_connections),
             "routing_table": self.routing_table,
             "performance_metrics": self.performance_metrics,
+            "destinations": {
+                destination: stats.summary()
+                for destination, stats in self.destination_stats.items()
+            },
             "ai_optimization": {
                 "circuit_breaker_state": self.circuit_breaker.state,
                 "routing_decisions": len(self.routing_engine.routing_history),
@@ -612,16 +870,15 @@ class RelayCore:
     async def optimize_performance(self):
         """Trigger AI-driven performance optimization"""
         # Update circuit breaker thresholds based on recent performance
-        recent_failures = sum(
-            1
-            for msg in self.processed_messages[-100:]
-            if msg.status == MessageStatus.FAILED
-        )
-        failure_rate = recent_failures / min(100, len(self.processed_messages))
+        recent_total = sum(s.total for s in self.destination_stats.values())
+        recent_failures = sum(s.failures for s in self.destination_stats.values())
+        failure_rate = recent_failures / recent_total if recent_total else 0.0
 
         # Update AI predictions
         for service in self.routing_table.values():
             self.circuit_breaker.update_ai_prediction(service, failure_rate)
+        for destination, stats in self.destination_stats.items():
+            self.circuit_breaker.update_ai_prediction(destination, stats.failure_rate)
 
         # Optimize load balancer algorithm
         if failure_rate > 0.1:
@@ -661,7 +918,8 @@ async def get_message_queue():
 
 async def get_processed_messages(limit: int = 100):
     """Get recently processed messages"""
-    return [asdict(msg) for msg in relay_core.processed_messages[-limit:]]
+    recent = itertools.islice(reversed(relay_core.processed_messages), limit)
+    return [record.to_dict() for record in reversed(list(recent))]
 
 
 async def trigger_optimization():
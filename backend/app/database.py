@@ -1,11 +1,20 @@
 """Database connection and session management utilities."""
 
+import asyncio
 import logging
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Generator, Optional
 
 from app.core.config import settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -79,8 +88,6 @@ def drop_tables():
 def check_database_connection() -> bool:
     """Check if database connection is working."""
     try:
-        from sqlalchemy import text
-
         with engine.connect() as connection:
             connection.execute(text("SELECT 1"))
         logger.info("Database connection successful")
@@ -88,3 +95,248 @@ def check_database_connection() -> bool:
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
         return False
+
+
+# Async engine and sessions
+#
+# The async engine is created on first use so that sync-only entry points
+# (migrations, seed scripts) do not need the async drivers installed.
+
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+_KNOWN_ASYNC_DRIVERS = {"asyncpg", "aiosqlite", "psycopg_async", "aiomysql", "asyncmy"}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_database_url(url: Optional[str] = None) -> str:
+    """
+    Return the async-driver form of a database URL.
+
+    Defaults to ASYNC_DATABASE_URL, or else the sync database URL with
+    psycopg2 swapped for asyncpg and pysqlite for aiosqlite.
+    """
+    if url is None:
+        if settings.ASYNC_DATABASE_URL:
+            return settings.ASYNC_DATABASE_URL
+        url = settings.SQLALCHEMY_DATABASE_URL
+
+    parsed = make_url(url)
+    backend, _, driver = parsed.drivername.partition("+")
+    if driver in _KNOWN_ASYNC_DRIVERS:
+        return url
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database '{backend}'")
+
+    async_url = parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+    return async_url.render_as_string(hide_password=False)
+
+
+def create_async_database_engine(url: Optional[str] = None) -> AsyncEngine:
+    """Create an async engine using the configured pool settings."""
+    async_url = get_async_database_url(url)
+    options = {
+        "pool_pre_ping": True,
+        "echo": settings.DEBUG if hasattr(settings, "DEBUG") else False,
+    }
+    # SQLite uses a single-connection pool that takes no sizing options
+    if make_url(async_url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return create_async_engine(async_url, **options)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first use."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is None:
+        _async_engine = create_async_database_engine()
+        # Objects stay readable after commit; lazy refreshes are not
+        # possible on an AsyncSession
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+def new_async_session() -> AsyncSession:
+    """Open a new session on the shared async engine."""
+    get_async_engine()
+    return _async_session_factory()
+
+
+class _SessionScope:
+    """
+    A lazily opened AsyncSession shared by everything inside a scope.
+
+    An AsyncSession must not be used by two tasks at once, so only one task
+    holds the session at a time. A task asking for it while another task
+    holds it (e.g. one started with ``create_task`` during the request)
+    gets no session from the scope and opens its own.
+    """
+
+    def __init__(self):
+        self.session: Optional[AsyncSession] = None
+        self.closed = False
+        self.failed = False
+        self._holder: Optional[asyncio.Task] = None
+        self._depth = 0
+
+    @property
+    def held(self) -> bool:
+        return self._depth > 0
+
+    def acquire(self) -> Optional[AsyncSession]:
+        task = asyncio.current_task()
+        # Tasks spawned from a request inherit its scope but may outlive it
+        if self.closed or (self.held and self._holder is not task):
+            return None
+        if self.session is None:
+            self.session = new_async_session()
+        self._holder = task
+        self._depth += 1
+        return self.session
+
+    async def release(self):
+        self._depth -= 1
+        if not self.held:
+            self._holder = None
+            if self.closed:
+                await self.finish()
+
+    async def finish(self):
+        """Commit (or, if the scope failed, discard) and close the session."""
+        session, self.session = self.session, None
+        if session is None:
+            return
+        try:
+            if not self.failed:
+                await session.commit()
+        finally:
+            await session.close()
+
+
+_session_scope: ContextVar[Optional[_SessionScope]] = ContextVar(
+    "async_db_session_scope", default=None
+)
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncGenerator[None, None]:
+    """
+    Share one AsyncSession across everything awaited inside the block.
+
+    Used per request (see AsyncSessionScopeMiddleware) so that middleware,
+    dependencies and services reuse a single session and connection. The
+    session is only opened if something asks for it. The scope owns the
+    transaction: it commits when the block exits normally and discards the
+    work if the block raises.
+    """
+    scope = _SessionScope()
+    token = _session_scope.set(scope)
+    try:
+        yield
+    except BaseException:
+        scope.failed = True
+        raise
+    finally:
+        _session_scope.reset(token)
+        scope.closed = True
+        # A task still using the session finishes it when it lets go
+        if not scope.held:
+            await scope.finish()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    Reuses the request's session when called inside a session scope.
+    """
+    scope = _session_scope.get()
+    scoped = scope.acquire() if scope is not None else None
+    if scoped is not None:
+        try:
+            yield scoped
+        finally:
+            await scope.release()
+        return
+
+    async with new_async_session() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_session(
+    shared: bool = True,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async context manager for database sessions.
+    Commits on success and rolls back on error.
+
+    Inside a session scope (unless ``shared`` is False) the scope's session
+    is reused and the block runs in a SAVEPOINT: an error rolls back only
+    the block's own work, and committing is left to the scope. Do not call
+    ``commit`` on a shared session; code that must commit on its own
+    schedule should pass ``shared=False``.
+    """
+    scope = _session_scope.get() if shared else None
+    scoped = scope.acquire() if scope is not None else None
+    if scoped is not None:
+        try:
+            async with scoped.begin_nested():
+                yield scoped
+        except Exception as e:
+            logger.error(f"Async database session error: {e}")
+            raise
+        finally:
+            await scope.release()
+        return
+
+    db = new_async_session()
+    try:
+        yield db
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Async database session error: {e}")
+        raise
+    finally:
+        await db.close()
+
+
+async def create_tables_async():
+    """Create all database tables through the async engine."""
+    try:
+        async with get_async_engine().begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.error(f"Error creating database tables: {e}")
+        raise
+
+
+async def check_async_database_connection() -> bool:
+    """Check if the async database connection is working."""
+    try:
+        async with get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        logger.info("Async database connection successful")
+        return True
+    except Exception as e:
+        logger.error(f"Async database connection failed: {e}")
+        return False
+
+
+async def dispose_async_engine():
+    """Close all pooled async connections. The engine is recreated on next use."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
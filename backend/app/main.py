@@ -19,6 +19,8 @@ from app.api import (
     workflows,
 )
 from app.api.enterprise import router as enterprise_router
+from app.database import dispose_async_engine
+from app.middleware.db_session import AsyncSessionScopeMiddleware
 from app.middleware.enhanced_error_middleware import (
     EnhancedErrorHandlingMiddleware,
     ErrorMetricsMiddleware,
@@ -36,11 +38,15 @@ from app.middleware.tenant_middleware import (
     TenantIsolationMiddleware,
 )
 from app.middleware.tracing import setup_tracing
+from app.services.audit_writer import close_audit_writer
+from app.services.kafka_service import close_kafka_service
+from app.services.search_service import close_search_service
 from app.startup.ai_ecosystem_startup import (
     ecosystem_manager,
     shutdown_event,
     startup_event,
 )
+from app.utils.error_aggregator import close_error_aggregator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -57,6 +63,11 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     await shutdown_event()
+    await close_search_service()
+    await close_kafka_service()
+    await close_error_aggregator()
+    await close_audit_writer()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -88,6 +99,8 @@ app.add_middleware(StructuredLoggingMiddleware)
 # Add tenant isolation and audit logging middleware
 app.add_middleware(AuditLoggingMiddleware)
 app.add_middleware(TenantIsolationMiddleware)
+# Outside the middleware above so they share the request's async session
+app.add_middleware(AsyncSessionScopeMiddleware)
 
 # Add Prometheus metrics middleware
 app.middleware("http")(prometheus_middleware)
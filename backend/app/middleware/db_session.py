@@ -0,0 +1,26 @@
+"""Per-request async database session scope."""
+
+from app.database import async_session_scope
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class AsyncSessionScopeMiddleware:
+    """
+    Run each HTTP request inside ``async_session_scope`` so everything that
+    asks for an async session during the request shares one.
+
+    Implemented as plain ASGI middleware so the scope also covers streamed
+    response bodies. Add it after (i.e. outside of) any middleware that
+    uses the database.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with async_session_scope():
+            await self.app(scope, receive, send)
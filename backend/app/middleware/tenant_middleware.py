@@ -1,11 +1,14 @@
 """Tenant isolation middleware for multi-tenant architecture."""
 
+import ipaddress
 import uuid
 from typing import Optional
 
-from app.database import SessionLocal
-from app.models.tenant import Tenant
-from app.models.user import User
+from app.services.tenant_resolver import (
+    ResolvedTenant,
+    TenantResolver,
+    tenant_resolver,
+)
 from fastapi import HTTPException, Request, Response, status
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -13,8 +16,14 @@ from starlette.middleware.base import BaseHTTPMiddleware
 class TenantIsolationMiddleware(BaseHTTPMiddleware):
     """Middleware to enforce tenant isolation."""
 
-    def __init__(self, app, exclude_paths: Optional[list] = None):
+    def __init__(
+        self,
+        app,
+        exclude_paths: Optional[list] = None,
+        resolver: Optional[TenantResolver] = None,
+    ):
         super().__init__(app)
+        self.resolver = resolver or tenant_resolver
         self.exclude_paths = exclude_paths or [
             "/docs",
             "/redoc",
@@ -51,9 +60,8 @@ class TenantIsolationMiddleware(BaseHTTPMiddleware):
     async def _extract_tenant_id(self, request: Request) -> Optional[uuid.UUID]:
         """Extract tenant ID from request."""
         # Try to get tenant from subdomain
-        host = request.headers.get("host", "")
-        if "." in host:
-            subdomain = host.split(".")[0]
+        subdomain = self._get_subdomain(request.headers.get("host", ""))
+        if subdomain:
             tenant = await self._get_tenant_by_slug(subdomain)
             if tenant:
                 return tenant.id
@@ -73,31 +81,37 @@ class TenantIsolationMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split(" ")[1]
-            user = await self._get_user_from_token(token)
-            if user:
-                return user.tenant_id
+            tenant_id = await self._get_tenant_id_from_token(token)
+            if tenant_id:
+                return tenant_id
 
         return None
 
-    async def _get_tenant_by_slug(self, slug: str) -> Optional[Tenant]:
-        """Get tenant by slug."""
-        db = SessionLocal()
+    def _get_subdomain(self, host: str) -> Optional[str]:
+        """First label of a DNS host name; None for IPs and localhost."""
+        hostname = host.strip()
+        if hostname.startswith("["):
+            return None  # IPv6 literal
+        hostname = hostname.rsplit(":", 1)[0] if ":" in hostname else hostname
+        if "." not in hostname or hostname.endswith(".localhost"):
+            return None
         try:
-            return db.query(Tenant).filter(Tenant.slug == slug).first()
-        finally:
-            db.close()
+            ipaddress.ip_address(hostname)
+            return None
+        except ValueError:
+            return hostname.split(".")[0]
+
+    async def _get_tenant_by_slug(self, slug: str) -> Optional[ResolvedTenant]:
+        """Get tenant by slug."""
+        return await self.resolver.get_by_slug(slug)
 
     async def _validate_tenant(self, tenant_id: uuid.UUID) -> bool:
         """Validate tenant is active."""
-        db = SessionLocal()
-        try:
-            tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-            return tenant and tenant.status == "active"
-        finally:
-            db.close()
+        tenant = await self.resolver.get_by_id(tenant_id)
+        return bool(tenant and tenant.is_active)
 
-    async def _get_user_from_token(self, token: str) -> Optional[User]:
-        """Get user from JWT token."""
+    async def _get_tenant_id_from_token(self, token: str) -> Optional[uuid.UUID]:
+        """Get the tenant of the user a JWT token belongs to."""
         try:
             from app.auth import verify_token
 
@@ -109,11 +123,7 @@ class TenantIsolationMiddleware(BaseHTTPMiddleware):
             if not email:
                 return None
 
-            db = SessionLocal()
-            try:
-                return db.query(User).filter(User.email == email).first()
-            finally:
-                db.close()
+            return await self.resolver.get_tenant_id_for_user(email)
         except Exception:
             return None
 
@@ -195,39 +205,31 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
             if not tenant_id:
                 return  # Skip if no tenant context
 
-            db = SessionLocal()
-            try:
-                audit_service = AuditService(db)
-
-                # Determine event type and action
-                event_type = self._get_event_type(request.url.path)
-                action = f"{request.method.lower()}_{self._get_resource_action(request.url.path)}"
-
-                # Determine resource type and ID
-                resource_type, resource_id = self._extract_resource_info(
-                    request.url.path
-                )
-
-                # Log the event
-                audit_service.log_event(
-                    tenant_id=tenant_id,
-                    event_type=event_type,
-                    resource_type=resource_type,
-                    resource_id=resource_id,
-                    action=action,
-                    user=user,
-                    request=request,
-                    status="success" if response.status_code < 400 else "failure",
-                    metadata={
-                        "method": request.method,
-                        "path": str(request.url.path),
-                        "status_code": response.status_code,
-                        "duration_ms": duration_ms,
-                        "request_body": self._sanitize_request_body(request_body),
-                    },
-                )
-            finally:
-                db.close()
+            # Determine event type and action
+            event_type = self._get_event_type(request.url.path)
+            action = f"{request.method.lower()}_{self._get_resource_action(request.url.path)}"
+
+            # Determine resource type and ID
+            resource_type, resource_id = self._extract_resource_info(request.url.path)
+
+            # Queue the event; the audit writer commits it in the background
+            await AuditService().queue_event(
+                tenant_id=tenant_id,
+                event_type=event_type,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                action=action,
+                user=user,
+                request=request,
+                status="success" if response.status_code < 400 else "failure",
+                metadata={
+                    "method": request.method,
+                    "path": str(request.url.path),
+                    "status_code": response.status_code,
+                    "duration_ms": duration_ms,
+                    "request_body": self._sanitize_request_body(request_body),
+                },
+            )
 
         except Exception as e:
             # Log audit failure but don't break the request
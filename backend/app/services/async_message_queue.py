@@ -0,0 +1,363 @@
+"""Asyncio Redis message queue and multi-queue consumer runner.
+
+Same keys, scripts and delivery guarantees as ``MessageQueue``, on
+``redis.asyncio`` so queue calls never block the event loop.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+import redis.asyncio as aioredis
+from app.services.message_queue import BaseMessageQueue, QueueMessage
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[QueueMessage], Union[Awaitable[Any], Any]]
+
+
+class AsyncMessageQueue(BaseMessageQueue):
+    """Asyncio variant of ``MessageQueue``."""
+
+    redis_module = aioredis
+
+    async def enqueue(
+        self,
+        queue_name: str,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        delay_seconds: int = 0,
+        ttl_seconds: Optional[int] = None,
+        max_retries: int = 3,
+    ) -> str:
+        """Enqueue a message with optional delay and TTL."""
+        message_ids = await self.enqueue_many(
+            queue_name, [payload], priority, delay_seconds, ttl_seconds, max_retries
+        )
+        return message_ids[0]
+
+    async def enqueue_many(
+        self,
+        queue_name: str,
+        payloads: List[Dict[str, Any]],
+        priority: int = 0,
+        delay_seconds: int = 0,
+        ttl_seconds: Optional[int] = None,
+        max_retries: int = 3,
+    ) -> List[str]:
+        """Enqueue several messages in one atomic round trip."""
+        messages = self._build_messages(
+            queue_name, payloads, priority, delay_seconds, ttl_seconds, max_retries
+        )
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            self._queue_enqueue(pipe, messages, ttl_seconds)
+            await pipe.execute()
+
+        return [message.id for message in messages]
+
+    async def dequeue(
+        self, queue_name: str, timeout: float = 0
+    ) -> Optional[QueueMessage]:
+        """Dequeue a message, waiting up to ``timeout`` seconds for one."""
+        messages = await self.dequeue_many_from([queue_name], 1, timeout)
+        return messages[0] if messages else None
+
+    async def dequeue_many(self, queue_name: str, count: int) -> List[QueueMessage]:
+        """Dequeue up to ``count`` ready messages without blocking."""
+        if count <= 0:
+            return []
+
+        message_data = await self._dequeue_script(
+            **self._dequeue_script_params(queue_name, count)
+        )
+        return self._dequeued_messages(message_data)
+
+    async def dequeue_many_from(
+        self, queue_names: List[str], count: int, timeout: float = 0
+    ) -> List[QueueMessage]:
+        """Dequeue up to ``count`` messages across several queues.
+
+        Queues are tried in the given order; when all are empty, waits up to
+        ``timeout`` seconds for an enqueue on any of them.
+        """
+        deadline = time.monotonic() + timeout
+        ready_keys = [self._get_ready_key(name) for name in queue_names]
+        while True:
+            messages: List[QueueMessage] = []
+            for queue_name in queue_names:
+                messages += await self.dequeue_many(queue_name, count - len(messages))
+                if len(messages) >= count:
+                    break
+            if messages:
+                return messages
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+
+            # Nothing ready: wait for an enqueue signal, then try again
+            await self.redis_client.brpop(ready_keys, remaining)
+
+    async def ack(self, message: QueueMessage) -> bool:
+        """Acknowledge successful message processing."""
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            self._queue_ack(pipe, message)
+            removed = (await pipe.execute())[0]
+
+        return removed > 0
+
+    async def nack(self, message: QueueMessage, error_message: str = None) -> bool:
+        """Negative acknowledge - retry or move to dead letter queue."""
+        updated = self._nack_update(message, error_message)
+        removed = await self._nack_script(**self._nack_script_params(updated))
+        if not removed:
+            return False
+
+        self._apply_nack(message, updated)
+        return True
+
+    async def process_scheduled_messages(self) -> int:
+        """Process scheduled messages that are ready."""
+        processed_count = 0
+        while True:
+            moved, examined = await self._promote_script(
+                **self._promote_script_params()
+            )
+            processed_count += moved
+            if examined < self.promote_batch_size:
+                return processed_count
+
+    async def recover_stale_messages(self) -> int:
+        """Recover messages stuck in processing state."""
+        processing_pattern = f"{self.processing_prefix}*"
+        recovered_count = 0
+        now = time.time()
+
+        async for key in self.redis_client.scan_iter(match=processing_pattern):
+            queue_name = key.replace(self.processing_prefix, "")
+            started_key = self._get_processing_started_key(queue_name)
+
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.lrange(self._get_processing_key(queue_name), 0, -1)
+                pipe.zrange(started_key, 0, -1, withscores=True)
+                stale_ids, untracked = self._stale_ids(*await pipe.execute(), now)
+
+            if untracked:
+                await self.redis_client.zadd(started_key, untracked, nx=True)
+            if not stale_ids:
+                continue
+
+            stale_data = await self.redis_client.mget(
+                [self._get_message_key(mid) for mid in stale_ids]
+            )
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for call in self._queue_recover(
+                    pipe, queue_name, stale_ids, stale_data
+                ):
+                    await call
+                await pipe.execute()
+            recovered_count += len(stale_ids)
+
+        return recovered_count
+
+    async def get_queue_stats(self, queue_name: str) -> Dict[str, int]:
+        """Get queue statistics."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key in self._queue_list_keys(queue_name):
+                pipe.llen(key)
+            return self._stats_from_counts(await pipe.execute())
+
+    async def get_message(self, message_id: str) -> Optional[QueueMessage]:
+        """Get message by ID."""
+        message_data = await self.redis_client.get(self._get_message_key(message_id))
+        if not message_data:
+            return None
+
+        return QueueMessage.model_validate_json(message_data)
+
+    async def purge_queue(self, queue_name: str) -> int:
+        """Purge all messages from a queue."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key in self._queue_list_keys(queue_name):
+                pipe.lrange(key, 0, -1)
+            all_ids = [msg_id for ids in await pipe.execute() for msg_id in ids]
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if all_ids:
+                pipe.delete(*[self._get_message_key(msg_id) for msg_id in all_ids])
+            pipe.delete(*self._purge_keys(queue_name))
+            await pipe.execute()
+
+        return len(all_ids)
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Perform health check on message queue."""
+        try:
+            await self.redis_client.ping()
+            return self._health_from_info(await self.redis_client.info())
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self.redis_client.aclose()
+
+
+class QueueConsumer:
+    """Consume several queues with a bounded number of concurrent handlers.
+
+    Each message is acked when its handler returns and nacked (retried or
+    dead-lettered) when it raises. The runner blocks on all queues at once
+    while idle, and periodically promotes due scheduled messages and
+    recovers stale ones so retries keep flowing.
+    """
+
+    def __init__(
+        self,
+        queue: AsyncMessageQueue,
+        handlers: Dict[str, MessageHandler],
+        concurrency: int = 10,
+        block_timeout: float = 1.0,
+        schedule_interval: float = 1.0,
+        recovery_interval: float = 60.0,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.block_timeout = block_timeout
+        self.schedule_interval = schedule_interval
+        self.recovery_interval = recovery_interval
+
+        self.processed = 0
+        self.failed = 0
+        self._running = False
+        self._active: Set[asyncio.Task] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._next_queue = 0
+
+    @property
+    def active(self) -> int:
+        """Number of handlers currently running."""
+        return len(self._active)
+
+    async def start(self):
+        """Start consuming in background tasks."""
+        if self._running:
+            return
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._maintain()),
+        ]
+        logger.info(f"Queue consumer started for {list(self.handlers)}")
+
+    async def stop(self, drain: bool = True):
+        """Stop fetching messages, then wait for (or cancel) running
+        handlers."""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if not drain:
+            for task in self._active:
+                task.cancel()
+        await asyncio.gather(*self._active, return_exceptions=True)
+        logger.info("Queue consumer stopped")
+
+    async def run(self):
+        """Consume until cancelled."""
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def _consume(self):
+        while self._running:
+            free = self.concurrency - len(self._active)
+            if free <= 0:
+                await asyncio.wait(
+                    set(self._active), return_when=asyncio.FIRST_COMPLETED
+                )
+                continue
+
+            try:
+                messages = await self.queue.dequeue_many_from(
+                    self._queue_order(), free, self.block_timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to fetch queue messages: {e}")
+                await asyncio.sleep(self.block_timeout)
+                continue
+
+            for message in messages:
+                task = asyncio.create_task(self._handle(message))
+                self._active.add(task)
+                task.add_done_callback(self._active.discard)
+
+    def _queue_order(self) -> List[str]:
+        """Queue names rotated each fetch so no queue is always tried last."""
+        names = list(self.handlers)
+        start = self._next_queue % len(names)
+        self._next_queue += 1
+        return names[start:] + names[:start]
+
+    async def _handle(self, message: QueueMessage):
+        handler = self.handlers[message.queue_name]
+        try:
+            result = handler(message)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.failed += 1
+            logger.warning(
+                f"Handler failed for message {message.id} on {message.queue_name}: {e}"
+            )
+            await self._settle(self.queue.nack(message, str(e)), message)
+        else:
+            self.processed += 1
+            await self._settle(self.queue.ack(message), message)
+
+    @staticmethod
+    async def _settle(call: Awaitable[bool], message: QueueMessage):
+        try:
+            await call
+        except Exception as e:
+            # Left in processing; stale recovery will retry it
+            logger.error(f"Failed to settle message {message.id}: {e}")
+
+    async def _maintain(self):
+        last_recovery = time.monotonic()
+        while self._running:
+            await asyncio.sleep(self.schedule_interval)
+            try:
+                await self.queue.process_scheduled_messages()
+                if time.monotonic() - last_recovery >= self.recovery_interval:
+                    last_recovery = time.monotonic()
+                    recovered = await self.queue.recover_stale_messages()
+                    if recovered:
+                        logger.info(f"Recovered {recovered} stale messages")
+            except Exception as e:
+                logger.error(f"Queue maintenance failed: {e}")
+
+
+# Global async message queue instance
+_async_message_queue: Optional[AsyncMessageQueue] = None
+
+
+def get_async_message_queue() -> AsyncMessageQueue:
+    """Get global async message queue instance."""
+    global _async_message_queue
+    if _async_message_queue is None:
+        _async_message_queue = AsyncMessageQueue()
+    return _async_message_queue
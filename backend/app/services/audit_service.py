@@ -1,20 +1,28 @@
 """Audit logging service for enterprise compliance."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.models.tenant import AuditLog
 from app.models.user import User
+from app.services.audit_writer import AuditWriter, audit_writer
 from fastapi import Request
 from sqlalchemy.orm import Session
 
 
 class AuditService:
-    """Service for comprehensive audit logging."""
+    """Service for comprehensive audit logging.
 
-    def __init__(self, db: Session):
+    ``log_event`` writes and commits immediately; ``queue_event`` hands the
+    event to the background audit writer and needs no session.
+    """
+
+    def __init__(
+        self, db: Optional[Session] = None, writer: Optional[AuditWriter] = None
+    ):
         self.db = db
+        self.writer = writer or audit_writer
 
     def log_event(
         self,
@@ -32,41 +40,105 @@ class AuditService:
         error_message: Optional[str] = None,
     ) -> AuditLog:
         """Log an audit event."""
-
-        # Extract request information if available
-        ip_address = None
-        user_agent = None
-        session_id = None
-
-        if request:
-            ip_address = self._get_client_ip(request)
-            user_agent = request.headers.get("user-agent")
-            session_id = request.headers.get("x-session-id")
-
-        # Create audit log entry
-        audit_log = AuditLog(
+        row = self.build_event_row(
             tenant_id=tenant_id,
-            user_id=user.id if user else None,
             event_type=event_type,
             resource_type=resource_type,
-            resource_id=resource_id,
             action=action,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            session_id=session_id,
+            user=user,
+            resource_id=resource_id,
             old_values=old_values,
             new_values=new_values,
             metadata=metadata,
+            request=request,
             status=status,
             error_message=error_message,
         )
 
+        audit_log = AuditLog(**row)
         self.db.add(audit_log)
         self.db.commit()
         self.db.refresh(audit_log)
 
         return audit_log
 
+    async def queue_event(
+        self,
+        tenant_id: UUID,
+        event_type: str,
+        resource_type: str,
+        action: str,
+        user: Optional[User] = None,
+        resource_id: Optional[str] = None,
+        old_values: Optional[Dict[str, Any]] = None,
+        new_values: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None,
+        status: str = "success",
+        error_message: Optional[str] = None,
+    ) -> None:
+        """Queue an audit event for the background writer."""
+        row = self.build_event_row(
+            tenant_id=tenant_id,
+            event_type=event_type,
+            resource_type=resource_type,
+            action=action,
+            user=user,
+            resource_id=resource_id,
+            old_values=old_values,
+            new_values=new_values,
+            metadata=metadata,
+            request=request,
+            status=status,
+            error_message=error_message,
+        )
+        await self.writer.submit(row)
+
+    def build_event_row(
+        self,
+        tenant_id: UUID,
+        event_type: str,
+        resource_type: str,
+        action: str,
+        user: Optional[User] = None,
+        resource_id: Optional[str] = None,
+        old_values: Optional[Dict[str, Any]] = None,
+        new_values: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None,
+        status: str = "success",
+        error_message: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Column values for an audit log row, captured at event time."""
+        # Extract request information if available
+        ip_address = None
+        user_agent = None
+        session_id = None
+
+        if request:
+            ip_address = self._get_client_ip(request)
+            user_agent = request.headers.get("user-agent")
+            session_id = request.headers.get("x-session-id")
+
+        return {
+            "id": uuid4(),
+            "tenant_id": tenant_id,
+            "user_id": user.id if user else None,
+            "event_type": event_type,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "action": action,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "session_id": session_id,
+            "old_values": old_values,
+            "new_values": new_values,
+            "audit_metadata": metadata,
+            "status": status,
+            "error_message": error_message,
+            "timestamp": datetime.now(timezone.utc),
+        }
+
     def log_authentication(
         self,
         tenant_id: UUID,
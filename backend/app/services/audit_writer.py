@@ -0,0 +1,274 @@
+"""Background writer for audit log events.
+
+Audit rows are queued in a bounded in-memory buffer and written by a
+background task with one multi-row INSERT and one commit per batch, so
+recording an audit event never adds a database commit to the request that
+produced it. Rows that cannot be buffered (buffer full) or written
+(database unavailable) are appended to a spill file, fsynced, and replayed
+once writes succeed again. ``close`` drains the buffer on shutdown.
+
+Several worker processes may share one spill file: appends and replays
+are coordinated with ``flock``, and every row carries its primary key from
+the start so a row replayed twice is only inserted once.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.tenant import AuditLog
+from app.utils.batch_worker import BatchWorker, RetryGate
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+AuditRow = Dict[str, Any]
+
+_UUID_FIELDS = ("id", "tenant_id", "user_id")
+
+
+@dataclass
+class AuditWriterStats:
+    """Counters for rows passing through the audit writer."""
+
+    queued: int = 0
+    written: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    overflowed: int = 0
+    spilled: int = 0
+    replayed: int = 0
+
+
+class AuditWriter(BatchWorker[AuditRow]):
+    def __init__(
+        self,
+        session_factory: Callable[[], Any] = SessionLocal,
+        max_buffer_size: int = 5000,
+        max_batch_size: int = 500,
+        flush_interval: float = 1.0,
+        retry_interval: float = 10.0,
+        spill_path: Optional[str] = None,
+    ):
+        super().__init__(max_buffer_size, max_batch_size, flush_interval)
+        self.session_factory = session_factory
+        self.spill_path = spill_path or settings.AUDIT_SPILL_PATH
+
+        self.stats = AuditWriterStats()
+        self._overflow: List[AuditRow] = []
+        self._overflow_task: Optional[asyncio.Task] = None
+        # Checked on startup too: the spill file outlives the process
+        self._spill_may_have_data = True
+        # After a failed write, rows go straight to the spill file for a while
+        self._retry = RetryGate(retry_interval)
+
+    async def submit(self, row: AuditRow) -> None:
+        """Queue a row for writing; spills it to disk if the buffer is full."""
+        # Fixed up front so that replaying a row cannot insert it twice
+        row.setdefault("id", uuid.uuid4())
+        try:
+            self._ensure_started().put_nowait(row)
+        except asyncio.QueueFull:
+            self.stats.overflowed += 1
+            self._overflow.append(row)
+            if self._overflow_task is None or self._overflow_task.done():
+                self._overflow_task = asyncio.get_running_loop().create_task(
+                    self._spill_overflow()
+                )
+            return
+        self.stats.queued += 1
+
+    async def flush(self):
+        """Wait until every queued row has been written (or spilled)."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        await super().flush()
+        if self._overflow_task is not None:
+            await self._overflow_task
+
+    async def close(self):
+        """Drain the buffer and stop the background task."""
+        await super().close()
+        self._overflow_task = None
+
+    async def _process_batch(self, batch: List[AuditRow]):
+        await self._write(batch)
+        await self._replay_spill()
+
+    async def _on_idle(self):
+        await self._replay_spill()
+
+    async def _write(self, rows: List[AuditRow]):
+        if self._retry.is_open():
+            try:
+                await asyncio.to_thread(self._insert, rows)
+                self.stats.written += len(rows)
+                self.stats.batches += 1
+                return
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} audit rows: {e}")
+                self.stats.failed_batches += 1
+                self._retry.trip()
+
+        await self._spill(rows)
+
+    def _insert(self, rows: List[AuditRow]):
+        """Write rows with a single multi-row INSERT and commit; rows whose
+        id is already in the table are skipped."""
+        db = self.session_factory()
+        try:
+            db.execute(self._insert_statement(db.get_bind().dialect.name), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _insert_statement(dialect_name: str):
+        if dialect_name == "postgresql":
+            return postgresql.insert(AuditLog).on_conflict_do_nothing(
+                index_elements=["id"]
+            )
+        if dialect_name == "sqlite":
+            return sqlite.insert(AuditLog).on_conflict_do_nothing(index_elements=["id"])
+        return insert(AuditLog)
+
+    async def _spill_overflow(self):
+        # Rows that overflow while a spill is running go out with the next one
+        while self._overflow:
+            rows, self._overflow = self._overflow, []
+            await self._spill(rows)
+
+    async def _spill(self, rows: List[AuditRow]):
+        try:
+            await asyncio.to_thread(self._append_spill, rows)
+        except OSError as e:
+            logger.error(f"Failed to spill {len(rows)} audit rows: {e}")
+            return
+        self.stats.spilled += len(rows)
+        self._spill_may_have_data = True
+
+    @contextmanager
+    def _file_lock(self, suffix: str, blocking: bool = True) -> Iterator[bool]:
+        """Hold an ``flock`` on ``<spill_path><suffix>``; yields False if
+        non-blocking and another process or thread holds it."""
+        os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+        with open(f"{self.spill_path}{suffix}", "a") as lock_file:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_spill(self, rows: List[AuditRow]):
+        lines = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        with self._file_lock(".lock"):
+            with open(self.spill_path, "a", encoding="utf-8") as spill:
+                spill.write(lines)
+                spill.flush()
+                os.fsync(spill.fileno())
+
+    async def _replay_spill(self):
+        if not self._spill_may_have_data or not self._retry.is_open():
+            return
+
+        try:
+            replayed = await asyncio.to_thread(self._replay_spill_file)
+        except Exception as e:
+            logger.error(f"Failed to replay spilled audit rows: {e}")
+            self.stats.failed_batches += 1
+            self._retry.trip()
+            return
+
+        if replayed is None:
+            self._spill_may_have_data = False
+        else:
+            self.stats.replayed += replayed
+
+    def _replay_spill_file(self) -> Optional[int]:
+        """Insert rows from the spill file; returns None when there was
+        nothing to replay and 0 when another process is replaying it.
+
+        The file is renamed before reading so rows spilled meanwhile go to a
+        fresh file. If an insert fails, the rows not yet written are saved
+        back for the next attempt.
+        """
+        replay_path = f"{self.spill_path}.replay"
+        if not os.path.exists(replay_path) and not os.path.exists(self.spill_path):
+            return None
+
+        with self._file_lock(".replay.lock", blocking=False) as owner:
+            if not owner:
+                return 0
+            return self._replay_claimed(replay_path)
+
+    def _replay_claimed(self, replay_path: str) -> Optional[int]:
+        if not os.path.exists(replay_path):
+            with self._file_lock(".lock"):
+                if not os.path.exists(self.spill_path):
+                    return None
+                os.replace(self.spill_path, replay_path)
+
+        rows = []
+        with open(replay_path, encoding="utf-8") as spill:
+            for line in spill:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(self._decode_row(json.loads(line)))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable spilled audit row: {e}")
+
+        for start in range(0, len(rows), self.max_batch_size):
+            try:
+                self._insert(rows[start : start + self.max_batch_size])
+            except Exception:
+                self._rewrite(replay_path, rows[start:])
+                raise
+
+        os.remove(replay_path)
+        return len(rows)
+
+    def _rewrite(self, path: str, rows: List[AuditRow]):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as spill:
+            for row in rows:
+                spill.write(json.dumps(row, default=str) + "\n")
+            spill.flush()
+            os.fsync(spill.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _decode_row(row: AuditRow) -> AuditRow:
+        """Restore the types ``json`` flattened to strings."""
+        for field in _UUID_FIELDS:
+            if row.get(field) is not None:
+                row[field] = uuid.UUID(row[field])
+        if row.get("timestamp") is not None:
+            row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+        return row
+
+
+audit_writer = AuditWriter()
+
+
+async def close_audit_writer():
+    """Write out buffered audit rows and stop the shared writer."""
+    await audit_writer.close()
@@ -9,6 +9,7 @@ from uuid import UUID
 import stripe
 from app.core.config import settings
 from app.models.tenant import BillingRecord, SubscriptionPlan, Tenant, UsageLog
+from app.services.tenant_resolver import tenant_resolver
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -77,6 +78,7 @@ class BillingService:
             self._update_tenant_plan_limits(tenant, plan)
 
             self.db.commit()
+            tenant_resolver.invalidate(tenant.id, tenant.slug)
 
             return tenant, subscription.latest_invoice.payment_intent.client_secret
 
@@ -139,6 +141,7 @@ class BillingService:
             tenant.updated_at = datetime.utcnow()
 
             self.db.commit()
+            tenant_resolver.invalidate(tenant.id, tenant.slug)
             return tenant
 
         except Exception as e:
@@ -378,6 +381,7 @@ class BillingService:
         )
 
         self.db.commit()
+        tenant_resolver.invalidate(tenant.id, tenant.slug)
 
     async def _handle_payment_failed(self, event_data: Dict):
         """Handle failed payment webhook."""
@@ -395,6 +399,7 @@ class BillingService:
         tenant.status = "payment_failed"
         tenant.updated_at = datetime.utcnow()
         self.db.commit()
+        tenant_resolver.invalidate(tenant.id, tenant.slug)
 
     async def _handle_subscription_updated(self, event_data: Dict):
         """Handle subscription update webhook."""
@@ -436,6 +441,7 @@ class BillingService:
         tenant.status = "suspended"
         tenant.updated_at = datetime.utcnow()
         self.db.commit()
+        tenant_resolver.invalidate(tenant.id, tenant.slug)
 
     # Utility Methods
     async def get_tenant_billing_info(self, tenant_id: UUID) -> Dict:
@@ -0,0 +1,175 @@
+"""Buffered Elasticsearch bulk indexer."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.utils.batch_worker import BatchWorker
+
+logger = logging.getLogger(__name__)
+
+# Bulk item statuses worth retrying: rejected under load or a node failure
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+@dataclass
+class BulkAction:
+    """One document waiting to be written with the ``_bulk`` API."""
+
+    index: str
+    document: Dict[str, Any]
+    doc_id: Optional[str] = None
+    attempts: int = 0
+
+    def to_operations(self) -> List[Dict[str, Any]]:
+        header: Dict[str, Any] = {"_index": self.index}
+        if self.doc_id is not None:
+            header["_id"] = self.doc_id
+        return [{"index": header}, self.document]
+
+
+@dataclass
+class BulkIndexerStats:
+    """Counters describing what the indexer has done so far."""
+
+    queued: int = 0
+    indexed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    retried: int = 0
+    bulk_requests: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retried": self.retried,
+            "bulk_requests": self.bulk_requests,
+            "recent_errors": self.errors[-10:],
+        }
+
+
+class BulkIndexer(BatchWorker[BulkAction]):
+    """Queue documents and write them to Elasticsearch in ``_bulk`` requests.
+
+    Documents are buffered in a bounded queue and sent by a background task
+    when ``max_batch_size`` documents are waiting or ``flush_interval``
+    seconds have passed since the first one arrived. ``submit`` waits for
+    room when the queue is full; ``submit_nowait`` never blocks and returns
+    False instead, so callers on a latency-sensitive path can shed load.
+    Items a bulk response rejects with a retryable status (or whole requests
+    that fail to reach the cluster) are retried with exponential backoff up
+    to ``max_retries`` times; other item errors are counted and logged.
+
+    The synchronous Elasticsearch client is called from a worker thread so
+    bulk requests never block the event loop.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        super().__init__(max_queue_size, max_batch_size, flush_interval, linger=True)
+        self.client = client
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.stats = BulkIndexerStats()
+
+    async def submit(self, action: BulkAction):
+        """Queue a document, waiting for room if the queue is full."""
+        queue = self._ensure_started()
+        await queue.put(action)
+        self.stats.queued += 1
+
+    def submit_nowait(self, action: BulkAction) -> bool:
+        """Queue a document without blocking; False if it was not accepted.
+
+        Must be called from the event loop thread.
+        """
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait(action)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            return False
+        self.stats.queued += 1
+        return True
+
+    async def _process_batch(self, batch: List[BulkAction]):
+        try:
+            await self._send(batch)
+        except Exception as e:
+            self._record_failure(len(batch), f"Bulk indexing failed: {e}")
+
+    async def _send(self, batch: List[BulkAction]):
+        """Write a batch, retrying rejected items with exponential backoff."""
+        pending = batch
+        while pending:
+            operations: List[Dict[str, Any]] = []
+            for action in pending:
+                operations.extend(action.to_operations())
+                action.attempts += 1
+
+            try:
+                self.stats.bulk_requests += 1
+                response = await asyncio.to_thread(
+                    self.client.bulk, operations=operations
+                )
+            except Exception as e:
+                # Nothing was acknowledged; the whole request is retryable
+                error = f"Bulk request failed: {e}"
+                retry = pending
+            else:
+                retry = self._collect_retries(pending, response)
+                error = "Bulk items rejected"
+
+            if not retry:
+                return
+
+            attempts = retry[0].attempts
+            if attempts > self.max_retries:
+                self._record_failure(len(retry), error)
+                return
+
+            self.stats.retried += len(retry)
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempts - 1))
+            pending = retry
+
+    def _collect_retries(
+        self, actions: List[BulkAction], response: Dict[str, Any]
+    ) -> List[BulkAction]:
+        """Count the outcome of each item; return the ones worth retrying."""
+        if not response.get("errors"):
+            self.stats.indexed += len(actions)
+            return []
+
+        retry = []
+        for action, item in zip(actions, response.get("items", [])):
+            result = next(iter(item.values()), {})
+            status = result.get("status", 500)
+            if status < 300:
+                self.stats.indexed += 1
+            elif status in RETRYABLE_STATUSES:
+                retry.append(action)
+            else:
+                self._record_failure(
+                    1,
+                    f"Failed to index document into {action.index}: "
+                    f"{result.get('error')}",
+                )
+        return retry
+
+    def _record_failure(self, count: int, message: str):
+        self.stats.failed += count
+        self.stats.errors.append(message)
+        del self.stats.errors[:-100]
+        logger.error(f"{message} ({count} documents)")
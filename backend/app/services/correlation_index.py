@@ -0,0 +1,347 @@
+"""Sliding-window index of recent errors for cross-system correlation."""
+
+import hashlib
+import heapq
+import itertools
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Keyword groups used by the correlation matchers. Membership is computed
+# once when an error is indexed instead of on every analysis pass.
+DEPENDENCY_KEYWORDS = ("database", "connection", "timeout", "network", "api", "service")
+RESOURCE_KEYWORDS = ("memory", "cpu", "disk", "quota", "limit", "exhausted", "full")
+NETWORK_KEYWORDS = ("connection", "timeout", "unreachable", "network", "dns", "resolve")
+AUTH_CODES = ("AUTHENTICATION_ERROR", "AUTHORIZATION_ERROR")
+
+SIGNAL_DEPENDENCY = "dependency"
+SIGNAL_RESOURCE = "resource"
+SIGNAL_NETWORK = "network"
+SIGNAL_AUTH = "auth"
+
+# Mersenne prime modulus for the universal hash family (a * x + b) mod p.
+_MINHASH_PRIME = (1 << 31) - 1
+
+
+def message_tokens(message: str) -> FrozenSet[str]:
+    """Lower-cased word set used for message similarity."""
+    return frozenset(message.lower().split())
+
+
+def jaccard(tokens1: FrozenSet[str], tokens2: FrozenSet[str]) -> float:
+    """Exact Jaccard similarity of two token sets."""
+    if not tokens1 or not tokens2:
+        return 0.0
+    union = len(tokens1 | tokens2)
+    return len(tokens1 & tokens2) / union if union else 0.0
+
+
+def error_signals(category: str, code: str, message: str) -> FrozenSet[str]:
+    """Keyword groups an error belongs to."""
+    lowered = message.lower()
+    signals = set()
+    if any(keyword in lowered for keyword in DEPENDENCY_KEYWORDS):
+        signals.add(SIGNAL_DEPENDENCY)
+    if any(keyword in lowered for keyword in RESOURCE_KEYWORDS):
+        signals.add(SIGNAL_RESOURCE)
+    if any(keyword in lowered for keyword in NETWORK_KEYWORDS):
+        signals.add(SIGNAL_NETWORK)
+    if category == "authentication" or "auth" in lowered or code in AUTH_CODES:
+        signals.add(SIGNAL_AUTH)
+    return frozenset(signals)
+
+
+class MinHasher:
+    """MinHash signatures with LSH banding over word sets.
+
+    ``num_perm`` hash functions are split into ``bands`` bands; two messages
+    become similarity candidates when any band matches exactly. With the
+    defaults (16 bands of 4 rows) a pair at Jaccard 0.7 is a candidate with
+    probability ~0.99, while unrelated messages rarely share a band.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._params = [
+            (rng.randrange(1, _MINHASH_PRIME), rng.randrange(0, _MINHASH_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _token_hash(token: str) -> int:
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % _MINHASH_PRIME
+
+    def signature(self, tokens: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """Signature of a token set, or ``None`` for an empty set."""
+        hashes = [self._token_hash(token) for token in tokens]
+        if not hashes:
+            return None
+        prime = _MINHASH_PRIME
+        return tuple(min((a * h + b) % prime for h in hashes) for a, b in self._params)
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """One hashable key per band."""
+        rows = self.rows
+        return [
+            signature[band * rows : (band + 1) * rows] for band in range(self.bands)
+        ]
+
+
+@dataclass
+class IndexedError:
+    """An error plus the features the matchers look up."""
+
+    error_id: str
+    system: str
+    code: str
+    category: str
+    timestamp: datetime
+    tokens: FrozenSet[str]
+    signals: FrozenSet[str]
+    bucket: int
+    band_keys: Tuple[Tuple[int, ...], ...]
+    error: object
+
+
+class CorrelationIndex:
+    """Errors seen within the correlation window, bucketed for lookup.
+
+    Errors are indexed by code, keyword signal, MinHash band and system, and
+    grouped into ``bucket_seconds``-wide time buckets so that expiry drops
+    whole buckets. Matchers ask for candidates from the relevant bucket
+    instead of scanning every recent error, and message similarity is only
+    computed for LSH candidates. Re-adding an error id replaces the earlier
+    entry, matching the overwrite semantics of the Redis store.
+    """
+
+    def __init__(
+        self,
+        window: timedelta = timedelta(minutes=5),
+        bucket_seconds: int = 30,
+        max_errors: int = 50000,
+        hasher: Optional[MinHasher] = None,
+    ):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.max_errors = max_errors
+        self.hasher = hasher or MinHasher()
+
+        self._entries: "OrderedDict[str, IndexedError]" = OrderedDict()
+        self._by_code: Dict[str, Dict[str, None]] = {}
+        self._by_signal: Dict[str, Dict[str, None]] = {}
+        self._bands: List[Dict[Tuple[int, ...], Set[str]]] = [
+            {} for _ in range(self.hasher.bands)
+        ]
+        self._buckets: Dict[int, Set[str]] = {}
+        self._bucket_heap: List[int] = []
+        # Per-system min-heap of (timestamp, seq, id); stale rows are skipped.
+        self._system_heaps: Dict[str, List[Tuple[datetime, int, str]]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, error_id: str) -> bool:
+        return error_id in self._entries
+
+    def get(self, error_id: str) -> Optional[IndexedError]:
+        return self._entries.get(error_id)
+
+    def _bucket_of(self, timestamp: datetime) -> int:
+        return int(timestamp.timestamp()) // self.bucket_seconds
+
+    def add(self, error) -> IndexedError:
+        """Index a ``SystemError`` (anything with the same attributes)."""
+        error_id = error.id
+        if error_id in self._entries:
+            self._remove(error_id)
+
+        system = str(getattr(error.system, "value", error.system))
+        tokens = message_tokens(error.message)
+        signature = self.hasher.signature(tokens)
+        band_keys = (
+            tuple(self.hasher.band_keys(signature)) if signature is not None else ()
+        )
+
+        entry = IndexedError(
+            error_id=error_id,
+            system=system,
+            code=error.code,
+            category=error.category,
+            timestamp=error.timestamp,
+            tokens=tokens,
+            signals=error_signals(error.category, error.code, error.message),
+            bucket=self._bucket_of(error.timestamp),
+            band_keys=band_keys,
+            error=error,
+        )
+
+        self._entries[error_id] = entry
+        self._by_code.setdefault(entry.code, {})[error_id] = None
+        for signal in entry.signals:
+            self._by_signal.setdefault(signal, {})[error_id] = None
+        for table, key in zip(self._bands, band_keys):
+            table.setdefault(key, set()).add(error_id)
+
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is None:
+            bucket = self._buckets[entry.bucket] = set()
+            heapq.heappush(self._bucket_heap, entry.bucket)
+        bucket.add(error_id)
+
+        heapq.heappush(
+            self._system_heaps.setdefault(system, []),
+            (entry.timestamp, next(self._seq), error_id),
+        )
+
+        while len(self._entries) > self.max_errors:
+            self._remove(next(iter(self._entries)))
+
+        return entry
+
+    def _discard(self, index: Dict[str, Dict[str, None]], key: str, error_id: str):
+        members = index.get(key)
+        if members is not None:
+            members.pop(error_id, None)
+            if not members:
+                del index[key]
+
+    def _remove(self, error_id: str) -> None:
+        entry = self._entries.pop(error_id, None)
+        if entry is None:
+            return
+
+        self._discard(self._by_code, entry.code, error_id)
+        for signal in entry.signals:
+            self._discard(self._by_signal, signal, error_id)
+        for table, key in zip(self._bands, entry.band_keys):
+            members = table.get(key)
+            if members is not None:
+                members.discard(error_id)
+                if not members:
+                    del table[key]
+
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is not None:
+            bucket.discard(error_id)
+            if not bucket:
+                del self._buckets[entry.bucket]
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Drop errors older than the window; returns how many were removed."""
+        cutoff = (now or datetime.utcnow()) - self.window
+        cutoff_bucket = self._bucket_of(cutoff)
+        removed = 0
+
+        # Buckets entirely before the cutoff go as a whole; the bucket the
+        # cutoff falls in is filtered at query time.
+        while self._bucket_heap and self._bucket_heap[0] < cutoff_bucket:
+            bucket_key = heapq.heappop(self._bucket_heap)
+            for error_id in list(self._buckets.get(bucket_key, ())):
+                self._remove(error_id)
+                removed += 1
+
+        for system, heap in list(self._system_heaps.items()):
+            self._prune_system_heap(heap)
+            if not heap:
+                del self._system_heaps[system]
+
+        return removed
+
+    def _live(self, error_id: str, cutoff: datetime) -> Optional[IndexedError]:
+        entry = self._entries.get(error_id)
+        if entry is not None and entry.timestamp >= cutoff:
+            return entry
+        return None
+
+    def _collect(
+        self, error_ids: Iterable[str], cutoff: datetime, exclude: Optional[str]
+    ) -> List[IndexedError]:
+        entries = []
+        for error_id in error_ids:
+            if error_id == exclude:
+                continue
+            entry = self._live(error_id, cutoff)
+            if entry is not None:
+                entries.append(entry)
+        entries.sort(key=lambda e: e.timestamp)
+        return entries
+
+    def _cutoff(self, now: Optional[datetime]) -> datetime:
+        return (now or datetime.utcnow()) - self.window
+
+    def recent(self, now: Optional[datetime] = None) -> List[IndexedError]:
+        """All errors within the window, oldest first."""
+        return self._collect(list(self._entries), self._cutoff(now), None)
+
+    def with_code(
+        self, code: str, exclude: Optional[str] = None, now: Optional[datetime] = None
+    ) -> List[IndexedError]:
+        return self._collect(
+            list(self._by_code.get(code, ())), self._cutoff(now), exclude
+        )
+
+    def with_signal(
+        self, signal: str, exclude: Optional[str] = None, now: Optional[datetime] = None
+    ) -> List[IndexedError]:
+        return self._collect(
+            list(self._by_signal.get(signal, ())), self._cutoff(now), exclude
+        )
+
+    def similar_messages(
+        self,
+        error_id: str,
+        threshold: float,
+        now: Optional[datetime] = None,
+    ) -> List[IndexedError]:
+        """Errors whose message Jaccard similarity exceeds ``threshold``.
+
+        Only errors sharing an LSH band with ``error_id`` are compared, and
+        each candidate is confirmed with the exact Jaccard score.
+        """
+        entry = self._entries.get(error_id)
+        if entry is None or not entry.band_keys:
+            return []
+
+        candidate_ids: Set[str] = set()
+        for table, key in zip(self._bands, entry.band_keys):
+            candidate_ids.update(table.get(key, ()))
+
+        candidates = self._collect(candidate_ids, self._cutoff(now), error_id)
+        return [c for c in candidates if jaccard(entry.tokens, c.tokens) > threshold]
+
+    def _prune_system_heap(self, heap: List[Tuple[datetime, int, str]]) -> None:
+        while heap:
+            timestamp, _, error_id = heap[0]
+            entry = self._entries.get(error_id)
+            if entry is not None and entry.timestamp == timestamp:
+                return
+            heapq.heappop(heap)
+
+    def earliest(
+        self, system: str, now: Optional[datetime] = None
+    ) -> Optional[IndexedError]:
+        """Oldest error from ``system`` still within the window."""
+        heap = self._system_heaps.get(system)
+        if not heap:
+            return None
+
+        cutoff = self._cutoff(now)
+        while heap:
+            self._prune_system_heap(heap)
+            if not heap:
+                break
+            entry = self._entries[heap[0][2]]
+            if entry.timestamp >= cutoff:
+                return entry
+            # Older than the window but its bucket has not expired yet.
+            heapq.heappop(heap)
+        return None
@@ -0,0 +1,439 @@
+"""In-process matrix index and bulk similarity passes for vector embeddings."""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexedEmbedding:
+    """Row payload kept alongside each vector in the matrix."""
+
+    embedding_id: UUID
+    item_id: UUID
+    item_type: str
+    content_hash: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class IndexMatch:
+    """A single similarity search hit."""
+
+    record: IndexedEmbedding
+    similarity_score: float
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; all-zero rows stay zero (similarity 0)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def stack_normalized(
+    vectors: Sequence[Sequence[float]], dimension: Optional[int] = None
+) -> Tuple[np.ndarray, List[int]]:
+    """Stack vectors of one dimension into a normalized float32 matrix.
+
+    Returns the matrix and the positions of the vectors that were kept;
+    vectors whose length differs from ``dimension`` (default: the first
+    vector's) are skipped.
+    """
+    if not vectors:
+        return np.zeros((0, dimension or 0), dtype=np.float32), []
+
+    dimension = dimension or len(vectors[0])
+    keep = [i for i, vector in enumerate(vectors) if len(vector) == dimension]
+    if len(keep) < len(vectors):
+        logger.warning(
+            f"Skipped {len(vectors) - len(keep)} embeddings with dimension "
+            f"different from {dimension}"
+        )
+
+    matrix = np.asarray([vectors[i] for i in keep], dtype=np.float32)
+    matrix = matrix.reshape(len(keep), dimension)
+    return np.ascontiguousarray(normalize_rows(matrix)), keep
+
+
+class EmbeddingMatrixIndex:
+    """Contiguous float32 matrix of pre-normalized embeddings.
+
+    Cosine similarity against every stored vector is a single matrix-vector
+    product, and the top ``k`` rows are selected with ``argpartition`` rather
+    than a full sort. Rows are added, replaced and removed in place (removal
+    swaps the last row into the freed slot), so the index can follow
+    individual writes without being rebuilt.
+    """
+
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 256):
+        self.dimension = dimension
+        self._initial_capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._records: List[IndexedEmbedding] = []
+        self._row_of: Dict[UUID, int] = {}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, embedding_id: UUID) -> bool:
+        return embedding_id in self._row_of
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the populated rows (normalized, float32)."""
+        if self._matrix is None:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return self._matrix[: len(self._records)]
+
+    @property
+    def records(self) -> List[IndexedEmbedding]:
+        return self._records
+
+    def bulk_load(
+        self, records: Sequence[IndexedEmbedding], vectors: Sequence[Sequence[float]]
+    ):
+        """Replace the index contents in one pass."""
+        self._records = []
+        self._row_of = {}
+        self._matrix = None
+
+        if not records:
+            self.loaded_at = time.monotonic()
+            return
+
+        if self.dimension is None:
+            self.dimension = len(vectors[0])
+
+        self._matrix, keep = stack_normalized(vectors, self.dimension)
+        self._records = [records[i] for i in keep]
+        self._row_of = {
+            record.embedding_id: row for row, record in enumerate(self._records)
+        }
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, record: IndexedEmbedding, vector: Sequence[float]) -> bool:
+        """Insert or replace one embedding; returns False on dimension mismatch."""
+        if self.dimension is None:
+            self.dimension = len(vector)
+        if len(vector) != self.dimension:
+            logger.warning(
+                f"Embedding {record.embedding_id} has dimension {len(vector)}, "
+                f"index expects {self.dimension}"
+            )
+            self.remove(record.embedding_id)
+            return False
+
+        row_vector = normalize_rows(np.asarray([vector], dtype=np.float32))[0]
+
+        row = self._row_of.get(record.embedding_id)
+        if row is None:
+            row = len(self._records)
+            self._ensure_capacity(row + 1)
+            self._records.append(record)
+            self._row_of[record.embedding_id] = row
+        else:
+            self._records[row] = record
+
+        self._matrix[row] = row_vector
+        return True
+
+    def remove(self, embedding_id: UUID) -> bool:
+        row = self._row_of.pop(embedding_id, None)
+        if row is None:
+            return False
+
+        last = len(self._records) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            moved = self._records[last]
+            self._records[row] = moved
+            self._row_of[moved.embedding_id] = row
+        self._records.pop()
+        return True
+
+    def search(
+        self, query: Sequence[float], limit: int = 10, threshold: float = -1.0
+    ) -> List[IndexMatch]:
+        """Return up to ``limit`` rows with cosine similarity >= ``threshold``."""
+        count = len(self._records)
+        if not count or limit <= 0 or len(query) != self.dimension:
+            return []
+
+        query_vector = normalize_rows(np.asarray([query], dtype=np.float32))[0]
+        scores = self.vectors @ query_vector
+
+        if limit < count:
+            top = np.argpartition(scores, -limit)[-limit:]
+        else:
+            top = np.arange(count)
+        top = top[scores[top] >= threshold]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        return [IndexMatch(self._records[row], float(scores[row])) for row in top]
+
+    def _ensure_capacity(self, rows: int):
+        if self._matrix is not None and self._matrix.shape[0] >= rows:
+            return
+
+        capacity = max(rows, self._initial_capacity)
+        if self._matrix is not None:
+            capacity = max(capacity, self._matrix.shape[0] * 2)
+
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[: len(self._records)] = self.vectors
+        self._matrix = matrix
+
+
+def _block_rows(count: int, memory_budget_bytes: int) -> int:
+    """Rows per block so a (rows x count) float32 block fits the budget."""
+    return max(1, min(count, memory_budget_bytes // max(1, count * 4)))
+
+
+def iter_similarity_blocks(
+    vectors: np.ndarray, memory_budget_bytes: int = 64 * 1024 * 1024
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(start, block)`` where block = vectors[start:end] @ vectors.T.
+
+    ``vectors`` must be row-normalized, so blocks hold cosine similarities.
+    Only one block is alive at a time, bounding memory for large sets.
+    """
+    count = len(vectors)
+    rows = _block_rows(count, memory_budget_bytes)
+    for start in range(0, count, rows):
+        yield start, vectors[start : start + rows] @ vectors.T
+
+
+def leader_clusters(
+    vectors: np.ndarray,
+    threshold: float,
+    memory_budget_bytes: int = 64 * 1024 * 1024,
+) -> List[List[int]]:
+    """Greedy leader clustering over normalized vectors.
+
+    Rows are visited in order; each unassigned row becomes a leader and
+    claims every unassigned row with similarity >= ``threshold`` to it.
+    """
+    assigned = np.zeros(len(vectors), dtype=bool)
+    clusters = []
+
+    for start, block in iter_similarity_blocks(vectors, memory_budget_bytes):
+        for offset, similarities in enumerate(block):
+            leader = start + offset
+            if assigned[leader]:
+                continue
+
+            assigned[leader] = True
+            members = np.flatnonzero((similarities >= threshold) & ~assigned)
+            assigned[members] = True
+            clusters.append([leader, *members.tolist()])
+
+    return clusters
+
+
+def leader_clusters_from_pairs(
+    count: int, left: np.ndarray, right: np.ndarray
+) -> List[List[int]]:
+    """Leader clustering restricted to the given similar pairs."""
+    neighbours: Dict[int, List[int]] = {}
+    for a, b in zip(left.tolist(), right.tolist()):
+        neighbours.setdefault(a, []).append(b)
+        neighbours.setdefault(b, []).append(a)
+
+    assigned = np.zeros(count, dtype=bool)
+    clusters = []
+    for leader in range(count):
+        if assigned[leader]:
+            continue
+        assigned[leader] = True
+        members = sorted(n for n in neighbours.get(leader, []) if not assigned[n])
+        assigned[members] = True
+        clusters.append([leader, *members])
+    return clusters
+
+
+def connected_components(
+    count: int, left: np.ndarray, right: np.ndarray
+) -> List[List[int]]:
+    """Group rows linked (transitively) by the given pairs."""
+    parent = np.arange(count)
+
+    def find(node: int) -> int:
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for a, b in zip(left.tolist(), right.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    components: Dict[int, List[int]] = {}
+    for node in range(count):
+        components.setdefault(find(node), []).append(node)
+    return list(components.values())
+
+
+def similar_pairs(
+    vectors: np.ndarray,
+    threshold: float,
+    memory_budget_bytes: int = 64 * 1024 * 1024,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """All pairs i < j with similarity >= ``threshold`` (exact, blocked)."""
+    lefts, rights, scores = [], [], []
+    for start, block in iter_similarity_blocks(vectors, memory_budget_bytes):
+        rows, cols = np.nonzero(block >= threshold)
+        upper = cols > rows + start
+        rows, cols = rows[upper], cols[upper]
+        lefts.append(rows + start)
+        rights.append(cols)
+        scores.append(block[rows, cols])
+    return _concat_pairs(lefts, rights, scores)
+
+
+def lsh_candidate_pairs(
+    vectors: np.ndarray,
+    bands: int = 16,
+    bits_per_band: int = 8,
+    max_bucket_size: int = 500,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Candidate pairs from random-hyperplane (SimHash) banding.
+
+    Vectors whose signatures agree on every bit of at least one band become
+    candidates. More bands raise recall, more bits per band raise precision.
+    Buckets larger than ``max_bucket_size`` are skipped to avoid quadratic
+    blow-up on degenerate inputs.
+    """
+    count, dimension = vectors.shape
+    if count < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((dimension, bands * bits_per_band))
+    signs = (vectors @ planes.astype(np.float32)) > 0
+    weights = 1 << np.arange(bits_per_band, dtype=np.int64)
+
+    candidates = set()
+    for band in range(bands):
+        band_bits = signs[:, band * bits_per_band : (band + 1) * bits_per_band]
+        codes = band_bits.astype(np.int64) @ weights
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        for bucket in np.split(order, boundaries):
+            if len(bucket) < 2 or len(bucket) > max_bucket_size:
+                continue
+            members = np.sort(bucket).tolist()
+            for position, a in enumerate(members):
+                for b in members[position + 1 :]:
+                    candidates.add((a, b))
+
+    if not candidates:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    pairs = np.array(sorted(candidates), dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def approximate_similar_pairs(
+    vectors: np.ndarray,
+    threshold: float,
+    chunk_size: int = 65536,
+    **lsh_options: Any,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs with similarity >= ``threshold`` among LSH candidates only."""
+    candidates_left, candidates_right = lsh_candidate_pairs(vectors, **lsh_options)
+
+    lefts, rights, scores = [], [], []
+    for start in range(0, len(candidates_left), chunk_size):
+        left = candidates_left[start : start + chunk_size]
+        right = candidates_right[start : start + chunk_size]
+        similarities = np.einsum("ij,ij->i", vectors[left], vectors[right])
+        keep = similarities >= threshold
+        lefts.append(left[keep])
+        rights.append(right[keep])
+        scores.append(similarities[keep])
+    return _concat_pairs(lefts, rights, scores)
+
+
+def mean_pairwise_similarity(vectors: np.ndarray) -> float:
+    """Exact mean cosine similarity over all pairs i < j in O(n * d).
+
+    Uses sum_{i<j} v_i . v_j = (|sum v|^2 - sum |v_i|^2) / 2.
+    """
+    count = len(vectors)
+    if count < 2:
+        return 0.0
+
+    vectors = vectors.astype(np.float64)
+    total = vectors.sum(axis=0)
+    self_similarity = np.einsum("ij,ij->", vectors, vectors)
+    pair_sum = (float(total @ total) - float(self_similarity)) / 2
+    return pair_sum / (count * (count - 1) / 2)
+
+
+def _concat_pairs(
+    lefts: List[np.ndarray], rights: List[np.ndarray], scores: List[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if not lefts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    return np.concatenate(lefts), np.concatenate(rights), np.concatenate(scores)
+
+
+class EmbeddingIndexRegistry:
+    """Per-(tenant, item_type) indexes shared by all service instances.
+
+    Indexes are loaded lazily and reloaded after ``max_age_seconds`` so that
+    writes made by other worker processes are eventually picked up.
+    """
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self._indexes: Dict[Tuple[UUID, str], EmbeddingMatrixIndex] = {}
+
+    def get(self, tenant_id: UUID, item_type: str) -> Optional[EmbeddingMatrixIndex]:
+        """Return a fresh loaded index, or None if it must be (re)loaded."""
+        index = self._indexes.get((tenant_id, item_type))
+        if index is None:
+            return None
+        if time.monotonic() - index.loaded_at > self.max_age_seconds:
+            del self._indexes[(tenant_id, item_type)]
+            return None
+        return index
+
+    def put(self, tenant_id: UUID, item_type: str, index: EmbeddingMatrixIndex):
+        self._indexes[(tenant_id, item_type)] = index
+
+    def invalidate(self, tenant_id: UUID, item_type: Optional[str] = None):
+        for key in list(self._indexes):
+            if key[0] == tenant_id and (item_type is None or key[1] == item_type):
+                del self._indexes[key]
+
+    def clear(self):
+        self._indexes.clear()
+
+
+# Global embedding index registry
+_embedding_indexes: Optional[EmbeddingIndexRegistry] = None
+
+
+def get_embedding_index_registry() -> EmbeddingIndexRegistry:
+    """Get global embedding index registry."""
+    global _embedding_indexes
+    if _embedding_indexes is None:
+        _embedding_indexes = EmbeddingIndexRegistry()
+    return _embedding_indexes
@@ -8,14 +8,24 @@ to identify patterns, correlate root causes, and implement automated recovery.
 import hashlib
 import json
 import logging
-from collections import Counter, defaultdict
+import time
+from collections import Counter
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Container, Dict, List, Optional, Set
 
 import redis.asyncio as redis
 
+from app.services.correlation_index import (
+    SIGNAL_AUTH,
+    SIGNAL_DEPENDENCY,
+    SIGNAL_NETWORK,
+    SIGNAL_RESOURCE,
+    CorrelationIndex,
+    IndexedError,
+)
+
 
 class SystemType(str, Enum):
     """Supported system types for error correlation."""
@@ -94,6 +104,14 @@ class ErrorCorrelationService:
         self.correlation_window = timedelta(minutes=5)
         self.max_correlation_age = timedelta(hours=24)
 
+        # Sliding-window index of recent errors, kept up to date incrementally.
+        # Errors written by other workers are pulled from Redis at most every
+        # index_sync_interval seconds, fetching only ids not yet indexed.
+        self.index = CorrelationIndex(window=self.correlation_window)
+        self.recent_error_scan = 101
+        self.index_sync_interval = 5.0
+        self._last_index_sync: Optional[float] = None
+
         # Initialize recovery actions
         self.recovery_actions = self._initialize_recovery_actions()
 
@@ -275,20 +293,22 @@ class ErrorCorrelationService:
         # Convert datetime to ISO string for JSON serialization
         data["timestamp"] = error.timestamp.isoformat()
 
-        await self.redis.setex(key, 3600, json.dumps(data, default=str))
-
-        # Add to system-specific error list
-        await self.redis.lpush(f"errors:{error.system}", error.id)
-        await self.redis.expire(f"errors:{error.system}", 3600)
+        # Single round trip for the payload and the system-specific error list
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setex(key, 3600, json.dumps(data, default=str))
+        pipe.lpush(f"errors:{error.system}", error.id)
+        pipe.expire(f"errors:{error.system}", 3600)
+        await pipe.execute()
 
     async def _trigger_correlation_analysis(self, new_error: SystemError) -> None:
         """Trigger correlation analysis for new error."""
         try:
-            # Get recent errors from all systems
-            recent_errors = await self._get_recent_errors()
+            self.index.add(new_error)
+            await self._sync_index_from_redis()
+            self.index.expire()
 
             # Run correlation analysis
-            correlations = await self._analyze_correlations(new_error, recent_errors)
+            correlations = await self._analyze_correlations(new_error)
 
             # Process any new correlations
             for correlation in correlations:
@@ -297,45 +317,89 @@ class ErrorCorrelationService:
         except Exception as e:
             self.logger.error(f"Correlation analysis failed: {e}")
 
-    async def _get_recent_errors(self) -> List[SystemError]:
-        """Get recent errors from all systems within correlation window."""
-        errors = []
+    async def _sync_index_from_redis(self, force: bool = False) -> int:
+        """Add errors stored by other workers to the index.
+
+        Returns the number of errors added. Runs at most once per
+        ``index_sync_interval`` unless ``force`` is set.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_index_sync is not None
+            and now - self._last_index_sync < self.index_sync_interval
+        ):
+            return 0
+        self._last_index_sync = now
+
+        errors = await self._get_recent_errors(skip_ids=self.index)
+        for error in errors:
+            self.index.add(error)
+        return len(errors)
+
+    async def _get_recent_errors(
+        self, skip_ids: Optional[Container[str]] = None
+    ) -> List[SystemError]:
+        """Get recent errors from all systems within correlation window.
+
+        The per-system id lists are read in one pipeline and the payloads in
+        one MGET; ids in ``skip_ids`` are not fetched.
+        """
         cutoff_time = datetime.utcnow() - self.correlation_window
+        systems = list(SystemType)
 
-        for system in SystemType:
-            error_ids = await self.redis.lrange(f"errors:{system}", 0, 100)
+        pipe = self.redis.pipeline(transaction=False)
+        for system in systems:
+            pipe.lrange(f"errors:{system}", 0, self.recent_error_scan - 1)
+        id_lists = await pipe.execute()
 
+        keys = []
+        seen = set()
+        for system, error_ids in zip(systems, id_lists):
             for error_id in error_ids:
-                error_key = f"error:{system}:{error_id.decode()}"
-                error_data = await self.redis.get(error_key)
+                if isinstance(error_id, bytes):
+                    error_id = error_id.decode()
+                if error_id in seen or (skip_ids is not None and error_id in skip_ids):
+                    continue
+                seen.add(error_id)
+                keys.append(f"error:{system}:{error_id}")
+
+        if not keys:
+            return []
 
-                if error_data:
-                    error_dict = json.loads(error_data)
-                    error_time = datetime.fromisoformat(error_dict["timestamp"])
+        errors = []
+        for error_data in await self.redis.mget(keys):
+            if not error_data:
+                continue
+
+            error_dict = json.loads(error_data)
+            error_time = datetime.fromisoformat(error_dict["timestamp"])
 
-                    if error_time >= cutoff_time:
-                        # Reconstruct SystemError object
-                        error = SystemError(**error_dict)
-                        error.timestamp = error_time
-                        errors.append(error)
+            if error_time >= cutoff_time:
+                # Reconstruct SystemError object
+                error = SystemError(**error_dict)
+                error.timestamp = error_time
+                error.system = SystemType(error.system)
+                errors.append(error)
 
         return errors
 
     async def _analyze_correlations(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: Optional[CorrelationIndex] = None
     ) -> List[ErrorCorrelation]:
         """Analyze correlations between new error and recent errors."""
+        index = index or self.index
         correlations = []
 
         for pattern, matcher in self.pattern_matchers.items():
-            correlation = await matcher(new_error, recent_errors)
+            correlation = await matcher(new_error, index)
             if correlation:
                 correlations.append(correlation)
 
         return correlations
 
     async def _detect_cascading_failure(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect cascading failure patterns across systems."""
         # Look for errors that follow dependency chain: AutoMatrix -> RelayCore -> NeuroWeaver
@@ -345,260 +409,177 @@ class ErrorCorrelationService:
             SystemType.NEUROWEAVER,
         ]
 
-        # Group errors by system and time
-        system_errors = defaultdict(list)
-        for error in recent_errors + [new_error]:
-            system_errors[error.system].append(error)
-
-        # Check for cascading pattern
+        # Take the first error of each system in the window
         cascade_errors = []
-        for i, system in enumerate(system_order):
-            if system in system_errors:
-                # Sort by timestamp
-                system_errors[system].sort(key=lambda x: x.timestamp)
-                if system_errors[system]:
-                    cascade_errors.extend(system_errors[system][:1])  # Take first error
+        for system in system_order:
+            earliest = index.earliest(system.value)
+            if earliest:
+                cascade_errors.append(earliest)
 
         # If we have errors from multiple systems in sequence, it's likely cascading
         if len(cascade_errors) >= 2:
-            affected_systems = {error.system for error in cascade_errors}
-
-            return ErrorCorrelation(
-                id=f"cascade_{datetime.utcnow().timestamp()}",
-                pattern=CorrelationPattern.CASCADING_FAILURE,
-                root_cause=(
-                    f"Cascading failure starting from {cascade_errors[0].system}"
-                ),
-                affected_systems=affected_systems,
-                error_ids=[error.id for error in cascade_errors],
-                confidence=0.8,
-                created_at=datetime.utcnow(),
-                recovery_actions=["restart_upstream_service", "retry_failed_requests"],
+            return self._build_correlation(
+                "cascade",
+                CorrelationPattern.CASCADING_FAILURE,
+                f"Cascading failure starting from {cascade_errors[0].system}",
+                cascade_errors,
+                None,
+                0.8,
+                ["restart_upstream_service", "retry_failed_requests"],
             )
 
         return None
 
     async def _detect_common_root_cause(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect errors with common root causes."""
-        # Look for similar error messages or codes across systems
-        similar_errors = []
-
-        for error in recent_errors:
-            if error.system != new_error.system:
-                # Check for similar error codes or messages
-                if (
-                    error.code == new_error.code
-                    or self._calculate_message_similarity(
-                        error.message, new_error.message
-                    )
-                    > 0.7
-                ):
-                    similar_errors.append(error)
+        # Look for similar error codes or messages across systems
+        candidates = {
+            entry.error_id: entry
+            for entry in index.with_code(new_error.code, exclude=new_error.id)
+        }
+        for entry in index.similar_messages(new_error.id, 0.7):
+            candidates[entry.error_id] = entry
+
+        new_system = SystemType(new_error.system).value
+        similar_errors = sorted(
+            (entry for entry in candidates.values() if entry.system != new_system),
+            key=lambda entry: entry.timestamp,
+        )
 
         if similar_errors:
-            all_errors = similar_errors + [new_error]
-            affected_systems = {error.system for error in all_errors}
-
-            return ErrorCorrelation(
-                id=f"common_cause_{datetime.utcnow().timestamp()}",
-                pattern=CorrelationPattern.COMMON_ROOT_CAUSE,
-                root_cause=f"Common root cause: {new_error.code}",
-                affected_systems=affected_systems,
-                error_ids=[error.id for error in all_errors],
-                confidence=0.7,
-                created_at=datetime.utcnow(),
-                recovery_actions=[
-                    "investigate_shared_dependency",
-                    "check_configuration",
-                ],
+            return self._build_correlation(
+                "common_cause",
+                CorrelationPattern.COMMON_ROOT_CAUSE,
+                f"Common root cause: {new_error.code}",
+                similar_errors,
+                new_error,
+                0.7,
+                ["investigate_shared_dependency", "check_configuration"],
             )
 
         return None
 
     async def _detect_dependency_failure(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect dependency failure patterns."""
         # Look for database, network, or external service failures
-        dependency_keywords = [
-            "database",
-            "connection",
-            "timeout",
-            "network",
-            "api",
-            "service",
-        ]
-
-        if any(keyword in new_error.message.lower() for keyword in dependency_keywords):
-            related_errors = []
-
-            for error in recent_errors:
-                if any(
-                    keyword in error.message.lower() for keyword in dependency_keywords
-                ):
-                    related_errors.append(error)
+        if SIGNAL_DEPENDENCY in self._signals_of(new_error, index):
+            related_errors = index.with_signal(SIGNAL_DEPENDENCY, exclude=new_error.id)
 
             if related_errors:
-                all_errors = related_errors + [new_error]
-                affected_systems = {error.system for error in all_errors}
-
-                return ErrorCorrelation(
-                    id=f"dependency_{datetime.utcnow().timestamp()}",
-                    pattern=CorrelationPattern.DEPENDENCY_FAILURE,
-                    root_cause="Shared dependency failure",
-                    affected_systems=affected_systems,
-                    error_ids=[error.id for error in all_errors],
-                    confidence=0.9,
-                    created_at=datetime.utcnow(),
-                    recovery_actions=[
-                        "restart_dependency",
-                        "check_network_connectivity",
-                    ],
+                return self._build_correlation(
+                    "dependency",
+                    CorrelationPattern.DEPENDENCY_FAILURE,
+                    "Shared dependency failure",
+                    related_errors,
+                    new_error,
+                    0.9,
+                    ["restart_dependency", "check_network_connectivity"],
                 )
 
         return None
 
     async def _detect_resource_exhaustion(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect resource exhaustion patterns."""
-        resource_keywords = [
-            "memory",
-            "cpu",
-            "disk",
-            "quota",
-            "limit",
-            "exhausted",
-            "full",
-        ]
-
-        if any(keyword in new_error.message.lower() for keyword in resource_keywords):
-            related_errors = []
-
-            for error in recent_errors:
-                if any(
-                    keyword in error.message.lower() for keyword in resource_keywords
-                ):
-                    related_errors.append(error)
+        if SIGNAL_RESOURCE in self._signals_of(new_error, index):
+            related_errors = index.with_signal(SIGNAL_RESOURCE, exclude=new_error.id)
 
             if related_errors:
-                all_errors = related_errors + [new_error]
-                affected_systems = {error.system for error in all_errors}
-
-                return ErrorCorrelation(
-                    id=f"resource_{datetime.utcnow().timestamp()}",
-                    pattern=CorrelationPattern.RESOURCE_EXHAUSTION,
-                    root_cause="Resource exhaustion across systems",
-                    affected_systems=affected_systems,
-                    error_ids=[error.id for error in all_errors],
-                    confidence=0.85,
-                    created_at=datetime.utcnow(),
-                    recovery_actions=[
-                        "scale_resources",
-                        "cleanup_resources",
-                        "restart_services",
-                    ],
+                return self._build_correlation(
+                    "resource",
+                    CorrelationPattern.RESOURCE_EXHAUSTION,
+                    "Resource exhaustion across systems",
+                    related_errors,
+                    new_error,
+                    0.85,
+                    ["scale_resources", "cleanup_resources", "restart_services"],
                 )
 
         return None
 
     async def _detect_auth_propagation(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect authentication error propagation."""
         if (
             new_error.category == "authentication"
             or "auth" in new_error.message.lower()
         ):
-            auth_errors = []
-
-            for error in recent_errors:
-                if (
-                    error.category == "authentication"
-                    or "auth" in error.message.lower()
-                    or error.code in ["AUTHENTICATION_ERROR", "AUTHORIZATION_ERROR"]
-                ):
-                    auth_errors.append(error)
+            auth_errors = index.with_signal(SIGNAL_AUTH, exclude=new_error.id)
 
             if auth_errors:
-                all_errors = auth_errors + [new_error]
-                affected_systems = {error.system for error in all_errors}
-
-                return ErrorCorrelation(
-                    id=f"auth_{datetime.utcnow().timestamp()}",
-                    pattern=CorrelationPattern.AUTHENTICATION_PROPAGATION,
-                    root_cause="Authentication failure propagation",
-                    affected_systems=affected_systems,
-                    error_ids=[error.id for error in all_errors],
-                    confidence=0.9,
-                    created_at=datetime.utcnow(),
-                    recovery_actions=[
-                        "refresh_tokens",
-                        "check_auth_service",
-                        "validate_permissions",
-                    ],
+                return self._build_correlation(
+                    "auth",
+                    CorrelationPattern.AUTHENTICATION_PROPAGATION,
+                    "Authentication failure propagation",
+                    auth_errors,
+                    new_error,
+                    0.9,
+                    ["refresh_tokens", "check_auth_service", "validate_permissions"],
                 )
 
         return None
 
     async def _detect_network_partition(
-        self, new_error: SystemError, recent_errors: List[SystemError]
+        self, new_error: SystemError, index: CorrelationIndex
     ) -> Optional[ErrorCorrelation]:
         """Detect network partition or connectivity issues."""
-        network_keywords = [
-            "connection",
-            "timeout",
-            "unreachable",
-            "network",
-            "dns",
-            "resolve",
-        ]
-
-        if any(keyword in new_error.message.lower() for keyword in network_keywords):
-            network_errors = []
-
-            for error in recent_errors:
-                if any(
-                    keyword in error.message.lower() for keyword in network_keywords
-                ):
-                    network_errors.append(error)
+        if SIGNAL_NETWORK in self._signals_of(new_error, index):
+            network_errors = index.with_signal(SIGNAL_NETWORK, exclude=new_error.id)
 
             # If multiple systems have network issues, likely partition
             if len(network_errors) >= 2:
-                all_errors = network_errors + [new_error]
-                affected_systems = {error.system for error in all_errors}
-
-                return ErrorCorrelation(
-                    id=f"network_{datetime.utcnow().timestamp()}",
-                    pattern=CorrelationPattern.NETWORK_PARTITION,
-                    root_cause="Network connectivity issues",
-                    affected_systems=affected_systems,
-                    error_ids=[error.id for error in all_errors],
-                    confidence=0.8,
-                    created_at=datetime.utcnow(),
-                    recovery_actions=[
-                        "check_network_connectivity",
-                        "restart_network_services",
-                    ],
+                return self._build_correlation(
+                    "network",
+                    CorrelationPattern.NETWORK_PARTITION,
+                    "Network connectivity issues",
+                    network_errors,
+                    new_error,
+                    0.8,
+                    ["check_network_connectivity", "restart_network_services"],
                 )
 
         return None
 
-    def _calculate_message_similarity(self, msg1: str, msg2: str) -> float:
-        """Calculate similarity between two error messages."""
-        # Simple word-based similarity
-        words1 = set(msg1.lower().split())
-        words2 = set(msg2.lower().split())
-
-        if not words1 or not words2:
-            return 0.0
-
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-
-        return len(intersection) / len(union) if union else 0.0
+    def _signals_of(self, error: SystemError, index: CorrelationIndex):
+        """Keyword signals of an error, from the index when it is there."""
+        entry = index.get(error.id)
+        if entry is None:
+            entry = index.add(error)
+        return entry.signals
+
+    def _build_correlation(
+        self,
+        id_prefix: str,
+        pattern: CorrelationPattern,
+        root_cause: str,
+        related: List[IndexedError],
+        new_error: Optional[SystemError],
+        confidence: float,
+        recovery_actions: List[str],
+    ) -> ErrorCorrelation:
+        """Build a correlation from indexed errors plus the triggering error."""
+        error_ids = [entry.error_id for entry in related]
+        affected_systems = {SystemType(entry.system) for entry in related}
+        if new_error is not None:
+            error_ids.append(new_error.id)
+            affected_systems.add(SystemType(new_error.system))
+
+        return ErrorCorrelation(
+            id=f"{id_prefix}_{datetime.utcnow().timestamp()}",
+            pattern=pattern,
+            root_cause=root_cause,
+            affected_systems=affected_systems,
+            error_ids=error_ids,
+            confidence=confidence,
+            created_at=datetime.utcnow(),
+            recovery_actions=recovery_actions,
+        )
 
     async def _process_correlation(self, correlation: ErrorCorrelation) -> None:
         """Process a detected error correlation."""
@@ -3,13 +3,16 @@ Execution Manager for tracking and managing tool and workflow executions.
 Implements execution logging, result management, performance monitoring, and analytics.
 """
 
+import heapq
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, Iterable, List, Optional
 from uuid import UUID, uuid4
 
+from app.utils.quantile_sketch import WindowedQuantileSketch
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,11 +84,190 @@ class ExecutionLog:
             self.metrics = ExecutionMetrics(start_time=self.created_at)
 
 
+FINAL_STATUSES = frozenset(
+    {
+        ExecutionStatus.COMPLETED,
+        ExecutionStatus.FAILED,
+        ExecutionStatus.CANCELLED,
+        ExecutionStatus.TIMEOUT,
+    }
+)
+
+
+class ExecutionStore:
+    """In-memory execution records with secondary indexes.
+
+    Records are kept in creation order and indexed by user, parent execution,
+    status and type, so lookups and "newest N" listings never scan the whole
+    history. Finished records are evicted by age and count; active ones are
+    never evicted.
+    """
+
+    def __init__(
+        self,
+        max_finished: int = 10000,
+        max_age: Optional[timedelta] = timedelta(days=30),
+    ):
+        self.max_finished = max_finished
+        self.max_age = max_age
+        # dicts preserve insertion order, which doubles as creation order
+        self._by_id: Dict[UUID, ExecutionLog] = {}
+        self._by_user: Dict[UUID, Dict[UUID, None]] = {}
+        self._by_parent: Dict[UUID, Dict[UUID, None]] = {}
+        self._by_type: Dict[ExecutionType, Dict[UUID, None]] = {}
+        self._by_status: Dict[ExecutionStatus, Dict[UUID, None]] = {}
+        self._finished_count = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def finished_count(self) -> int:
+        return self._finished_count
+
+    def add(self, execution: ExecutionLog):
+        self._by_id[execution.id] = execution
+        self._index(self._by_user, execution.user_id, execution.id)
+        self._index(self._by_type, execution.execution_type, execution.id)
+        self._index(self._by_status, execution.status, execution.id)
+        if execution.parent_execution_id:
+            self._index(self._by_parent, execution.parent_execution_id, execution.id)
+        if execution.status in FINAL_STATUSES:
+            self._finished_count += 1
+
+    def get(self, execution_id: UUID) -> Optional[ExecutionLog]:
+        return self._by_id.get(execution_id)
+
+    def set_status(self, execution: ExecutionLog, status: ExecutionStatus):
+        """Change an execution's status, keeping the status index in sync."""
+        previous = execution.status
+        if previous == status:
+            return
+
+        self._unindex(self._by_status, previous, execution.id)
+        execution.status = status
+        self._index(self._by_status, status, execution.id)
+
+        was_final = previous in FINAL_STATUSES
+        is_final = status in FINAL_STATUSES
+        if is_final and not was_final:
+            self._finished_count += 1
+        elif was_final and not is_final:
+            self._finished_count -= 1
+
+    def remove(self, execution_id: UUID) -> Optional[ExecutionLog]:
+        execution = self._by_id.pop(execution_id, None)
+        if execution is None:
+            return None
+
+        self._unindex(self._by_user, execution.user_id, execution_id)
+        self._unindex(self._by_type, execution.execution_type, execution_id)
+        self._unindex(self._by_status, execution.status, execution_id)
+        if execution.parent_execution_id:
+            self._unindex(self._by_parent, execution.parent_execution_id, execution_id)
+        if execution.status in FINAL_STATUSES:
+            self._finished_count -= 1
+        return execution
+
+    def query(
+        self,
+        user_id: Optional[UUID] = None,
+        execution_type: Optional[ExecutionType] = None,
+        status: Optional[ExecutionStatus] = None,
+        parent_execution_id: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[ExecutionLog]:
+        """Return matching executions, newest first."""
+        filters = []
+        if user_id is not None:
+            filters.append((self._by_user.get(user_id, {}), True))
+        if execution_type is not None:
+            filters.append((self._by_type.get(execution_type, {}), True))
+        if parent_execution_id is not None:
+            filters.append((self._by_parent.get(parent_execution_id, {}), True))
+        if status is not None:
+            # Status buckets are ordered by transition time, not creation time
+            filters.append((self._by_status.get(status, {}), False))
+
+        if not filters:
+            candidates, creation_ordered = self._by_id, True
+        else:
+            candidates, creation_ordered = min(filters, key=lambda f: len(f[0]))
+        others = [ids for ids, _ in filters if ids is not candidates]
+
+        matches = (
+            execution_id
+            for execution_id in (
+                reversed(candidates) if creation_ordered else candidates
+            )
+            if all(execution_id in ids for ids in others)
+        )
+
+        if creation_ordered:
+            results = []
+            for execution_id in matches:
+                if limit is not None and len(results) >= limit:
+                    break
+                results.append(self._by_id[execution_id])
+            return results
+
+        executions = (self._by_id[execution_id] for execution_id in matches)
+        if limit is None:
+            return sorted(executions, key=lambda e: e.created_at, reverse=True)
+        return heapq.nlargest(limit, executions, key=lambda e: e.created_at)
+
+    def finished(self) -> Iterable[ExecutionLog]:
+        """Iterate finished executions, oldest first."""
+        return (e for e in self._by_id.values() if e.status in FINAL_STATUSES)
+
+    def evict(
+        self,
+        max_age: Optional[timedelta] = None,
+        max_finished: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """Evict the oldest finished executions beyond the age/count limits."""
+        max_age = self.max_age if max_age is None else max_age
+        max_finished = self.max_finished if max_finished is None else max_finished
+        cutoff = (now or datetime.utcnow()) - max_age if max_age is not None else None
+
+        evicted = []
+        excess = max(0, self._finished_count - max_finished)
+        for execution in self._by_id.values():
+            too_old = cutoff is not None and execution.created_at <= cutoff
+            if not too_old and len(evicted) >= excess:
+                break
+            if execution.status in FINAL_STATUSES:
+                evicted.append(execution.id)
+
+        for execution_id in evicted:
+            self.remove(execution_id)
+        return len(evicted)
+
+    @staticmethod
+    def _index(index: Dict[Hashable, Dict[UUID, None]], key, execution_id: UUID):
+        index.setdefault(key, {})[execution_id] = None
+
+    @staticmethod
+    def _unindex(index: Dict[Hashable, Dict[UUID, None]], key, execution_id: UUID):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(execution_id, None)
+        if not bucket:
+            del index[key]
+
+
 class ExecutionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        max_history: int = 10000,
+        history_retention: timedelta = timedelta(days=30),
+    ):
         self.active_executions: Dict[UUID, ExecutionLog] = {}
-        self.execution_history: List[ExecutionLog] = []
-        self.performance_cache: Dict[str, List[float]] = {}
+        self.store = ExecutionStore(max_finished=max_history, max_age=history_retention)
+        # Duration sketches per "type:target"; hourly slots over the last week
+        self.performance_cache: Dict[str, WindowedQuantileSketch] = {}
         self.rate_limits: Dict[str, List[datetime]] = {}
 
     async def start_execution(
@@ -116,6 +298,7 @@ class ExecutionManager:
         )
 
         self.active_executions[execution_id] = execution_log
+        self.store.add(execution_log)
 
         logger.info(
             f"Started execution {execution_id} for {execution_type.value} {target_name}"
@@ -135,17 +318,12 @@ class ExecutionManager:
             logger.warning(f"Execution {execution_id} not found")
             return False
 
-        execution.status = status
+        self.store.set_status(execution, status)
         execution.updated_at = datetime.utcnow()
 
         if status == ExecutionStatus.RUNNING:
             execution.metrics.start_time = datetime.utcnow()
-        elif status in [
-            ExecutionStatus.COMPLETED,
-            ExecutionStatus.FAILED,
-            ExecutionStatus.CANCELLED,
-            ExecutionStatus.TIMEOUT,
-        ]:
+        elif status in FINAL_STATUSES:
             execution.metrics.end_time = datetime.utcnow()
             execution.metrics.calculate_duration()
 
@@ -154,9 +332,9 @@ class ExecutionManager:
             if error_details:
                 execution.error_details = error_details
 
-            # Move to history
-            self.execution_history.append(execution)
+            # The store keeps finished executions; drop them from the active set
             del self.active_executions[execution_id]
+            self.store.evict()
 
             # Update performance cache
             await self._update_performance_cache(execution)
@@ -190,18 +368,14 @@ class ExecutionManager:
             execution_id, ExecutionStatus.FAILED, error_details=error_details
         )
 
+    @property
+    def execution_history(self) -> List[ExecutionLog]:
+        """Finished executions still retained, oldest first."""
+        return list(self.store.finished())
+
     def get_execution(self, execution_id: UUID) -> Optional[ExecutionLog]:
         """Get an execution by ID."""
-        # Check active executions first
-        if execution_id in self.active_executions:
-            return self.active_executions[execution_id]
-
-        # Check history
-        for execution in self.execution_history:
-            if execution.id == execution_id:
-                return execution
-
-        return None
+        return self.store.get(execution_id)
 
     def list_executions(
         self,
@@ -210,29 +384,17 @@ class ExecutionManager:
         status: Optional[ExecutionStatus] = None,
         limit: int = 100,
     ) -> List[ExecutionLog]:
-        """List executions with optional filtering."""
-        all_executions = list(self.active_executions.values()) + self.execution_history
-
-        # Apply filters
-        if user_id:
-            all_executions = [e for e in all_executions if e.user_id == user_id]
-        if execution_type:
-            all_executions = [
-                e for e in all_executions if e.execution_type == execution_type
-            ]
-        if status:
-            all_executions = [e for e in all_executions if e.status == status]
-
-        # Sort by created_at descending and limit
-        all_executions.sort(key=lambda x: x.created_at, reverse=True)
-        return all_executions[:limit]
+        """List executions with optional filtering, newest first."""
+        return self.store.query(
+            user_id=user_id,
+            execution_type=execution_type,
+            status=status,
+            limit=limit,
+        )
 
     def get_child_executions(self, parent_execution_id: UUID) -> List[ExecutionLog]:
         """Get all child executions for a parent execution."""
-        all_executions = list(self.active_executions.values()) + self.execution_history
-        return [
-            e for e in all_executions if e.parent_execution_id == parent_execution_id
-        ]
+        return self.store.query(parent_execution_id=parent_execution_id)
 
     async def cancel_execution(self, execution_id: UUID) -> bool:
         """Cancel a running execution."""
@@ -254,30 +416,42 @@ class ExecutionManager:
 
         cache_key = f"{execution.execution_type.value}:{execution.target_id}"
         if cache_key not in self.performance_cache:
-            self.performance_cache[cache_key] = []
-
-        self.performance_cache[cache_key].append(execution.metrics.duration_ms)
+            self.performance_cache[cache_key] = WindowedQuantileSketch(
+                interval_seconds=3600, num_intervals=24 * 7
+            )
 
-        # Keep only last 100 measurements
-        if len(self.performance_cache[cache_key]) > 100:
-            self.performance_cache[cache_key] = self.performance_cache[cache_key][-100:]
+        self.performance_cache[cache_key].add(execution.metrics.duration_ms)
 
     def get_performance_stats(
-        self, target_id: str, execution_type: ExecutionType
+        self,
+        target_id: str,
+        execution_type: ExecutionType,
+        window_seconds: Optional[int] = None,
     ) -> Dict[str, float]:
-        """Get performance statistics for a target."""
+        """Get performance statistics for a target.
+
+        Covers every execution in the retained window (the last week unless
+        ``window_seconds`` narrows it), not just a recent sample.
+        """
         cache_key = f"{execution_type.value}:{target_id}"
-        durations = self.performance_cache.get(cache_key, [])
+        sketch = self.performance_cache.get(cache_key)
+        if sketch is None:
+            return {}
 
-        if not durations:
+        durations = sketch.snapshot(window_seconds)
+        if not durations.count:
             return {}
 
+        percentiles = durations.percentiles()
         return {
-            "avg_duration_ms": sum(durations) / len(durations),
-            "min_duration_ms": min(durations),
-            "max_duration_ms": max(durations),
-            "median_duration_ms": sorted(durations)[len(durations) // 2],
-            "total_executions": len(durations),
+            "avg_duration_ms": durations.mean,
+            "min_duration_ms": durations.min,
+            "max_duration_ms": durations.max,
+            "median_duration_ms": percentiles["p50"],
+            "p95_duration_ms": percentiles["p95"],
+            "p99_duration_ms": percentiles["p99"],
+            "p999_duration_ms": percentiles["p999"],
+            "total_executions": durations.count,
         }
 
     async def check_rate_limit(self, user_id: UUID, limit_per_minute: int = 60) -> bool:
@@ -315,7 +489,7 @@ class ExecutionManager:
 
         # Filter executions by date range
         filtered_executions = [
-            e for e in self.execution_history if start_date <= e.created_at <= end_date
+            e for e in self.store.finished() if start_date <= e.created_at <= end_date
         ]
 
         if not filtered_executions:
@@ -383,14 +557,7 @@ class ExecutionManager:
 
     def cleanup_old_executions(self, days_to_keep: int = 30):
         """Clean up old execution history."""
-        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
-
-        original_count = len(self.execution_history)
-        self.execution_history = [
-            e for e in self.execution_history if e.created_at > cutoff_date
-        ]
-
-        cleaned_count = original_count - len(self.execution_history)
+        cleaned_count = self.store.evict(max_age=timedelta(days=days_to_keep))
         logger.info(f"Cleaned up {cleaned_count} old executions")
 
         return cleaned_count
@@ -398,7 +565,7 @@ class ExecutionManager:
     def get_system_stats(self) -> Dict[str, Any]:
         """Get overall system execution statistics."""
         active_count = len(self.active_executions)
-        history_count = len(self.execution_history)
+        history_count = self.store.finished_count
 
         # Status breakdown of active executions
         active_status_breakdown = {}
@@ -1,33 +1,113 @@
+"""Kafka event publishing.
+
+Events are buffered in memory and handed to the producer in batches by a
+background task, so publishing never waits on the broker; the producer
+itself batches per partition (linger/batch size) and compresses.
+"""
+
+import asyncio
 import json
+import logging
 import os
-from typing import Any, Dict
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from app.exceptions import ServiceError
+from app.exceptions import ExternalAPIError
+from app.utils.batch_worker import BatchWorker
 from kafka import KafkaProducer
 
+logger = logging.getLogger(__name__)
+
+# Called from the producer's I/O thread with (topic, event, error); error is
+# None when the broker acknowledged the event.
+DeliveryCallback = Callable[[str, Dict[str, Any], Optional[Exception]], None]
+
+
+@dataclass
+class PublishStats:
+    """Counters for events passing through the publisher."""
+
+    queued: int = 0
+    sent: int = 0
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    flushes: int = 0
+    flush_failures: int = 0
 
-class KafkaService:
-    def __init__(self):
+
+class KafkaService(BatchWorker[Tuple[str, Dict[str, Any]]]):
+    def __init__(
+        self,
+        producer_factory: Optional[Callable[..., Any]] = None,
+        linger_ms: int = 20,
+        batch_size: int = 65536,
+        compression_type: Optional[str] = "gzip",
+        max_buffer_size: int = 10000,
+        max_batch_events: int = 500,
+        flush_interval: float = 5.0,
+        flush_timeout: float = 10.0,
+        on_delivery: Optional[DeliveryCallback] = None,
+    ):
+        super().__init__(max_buffer_size, max_batch_events, flush_interval)
         self.bootstrap_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
         self.producer = None
         self.consumer = None
 
+        self.producer_factory = producer_factory or KafkaProducer
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self.compression_type = compression_type
+        self.flush_timeout = flush_timeout
+        self.on_delivery = on_delivery
+
+        self.stats = PublishStats()
+        self._stats_lock = threading.Lock()
+        self._producer_lock = threading.Lock()
+        self._unflushed = 0
+
     def get_producer(self) -> KafkaProducer:
-        if not self.producer:
-            self.producer = KafkaProducer(
-                bootstrap_servers=self.bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v).encode("utf-8"),
-            )
-        return self.producer
+        with self._producer_lock:
+            if not self.producer:
+                self.producer = self.producer_factory(
+                    bootstrap_servers=self.bootstrap_servers,
+                    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+                    linger_ms=self.linger_ms,
+                    batch_size=self.batch_size,
+                    compression_type=self.compression_type,
+                )
+            return self.producer
 
     async def publish_event(self, topic: str, event: Dict[str, Any]) -> bool:
+        """Queue an event for delivery, waiting only while the buffer is full.
+
+        Delivery happens in the background; failures are counted in
+        ``stats`` and reported to ``on_delivery``.
+        """
         try:
-            producer = self.get_producer()
-            producer.send(topic, event)
-            producer.flush()
-            return True
+            buffer = self._ensure_started()
+            await buffer.put((topic, event))
         except Exception as e:
-            raise ServiceError(f"Failed to publish event to {topic}: {str(e)}")
+            raise ExternalAPIError(
+                f"Failed to publish event to {topic}: {str(e)}", api_name="kafka"
+            )
+
+        self._count("queued")
+        return True
+
+    def publish_event_nowait(self, topic: str, event: Dict[str, Any]) -> bool:
+        """Queue an event without waiting; returns False (and drops the
+        event) if the buffer is full."""
+        try:
+            self._ensure_started().put_nowait((topic, event))
+        except asyncio.QueueFull:
+            self._count("dropped")
+            logger.warning(f"Kafka publish buffer full, dropped event for {topic}")
+            return False
+
+        self._count("queued")
+        return True
 
     async def publish_workflow_event(
         self, workflow_id: str, event_type: str, data: Dict[str, Any]
@@ -40,5 +120,103 @@ class KafkaService:
         }
         await self.publish_event("workflow-events", event)
 
+    async def flush(self):
+        """Wait until every queued event has been handed to the producer
+        and the producer has sent them."""
+        await super().flush()
+        if self.producer is not None:
+            await asyncio.to_thread(self._flush_producer)
+
+    async def close(self):
+        """Hand over outstanding events and close the producer, which
+        flushes them."""
+        await super().close()
+
+        if self.producer is not None:
+            producer, self.producer = self.producer, None
+            await asyncio.to_thread(producer.close, self.flush_timeout)
+
+    async def _process_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        await asyncio.to_thread(self._send_batch, batch)
+
+    async def _on_idle(self):
+        # Idle for a full interval: push out anything still lingering
+        with self._stats_lock:
+            unflushed = self._unflushed
+        if unflushed:
+            await self._flush_idle()
+
+    async def _flush_idle(self):
+        try:
+            await asyncio.to_thread(self._flush_producer)
+        except Exception as e:
+            # E.g. KafkaTimeoutError while the broker is down; the next idle
+            # interval tries again
+            self._count("flush_failures")
+            logger.error(f"Kafka producer flush failed: {e}")
+
+    def _send_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Hand a batch to the producer; runs in a worker thread because
+        ``send`` may block on metadata or a full producer buffer."""
+        try:
+            producer = self.get_producer()
+        except Exception as e:
+            logger.error(f"Kafka producer unavailable: {e}")
+            for topic, event in batch:
+                self._on_error(topic, event, e)
+            return
+
+        for topic, event in batch:
+            try:
+                future = producer.send(topic, event)
+            except Exception as e:
+                self._on_error(topic, event, e)
+                continue
+
+            with self._stats_lock:
+                self.stats.sent += 1
+                self._unflushed += 1
+            future.add_callback(self._on_success, topic, event)
+            future.add_errback(self._on_error, topic, event)
+
+    def _flush_producer(self):
+        # Claim the sends this flush covers; sends made meanwhile, or claimed
+        # by an overlapping flush, are left to the next one
+        with self._stats_lock:
+            unflushed, self._unflushed = self._unflushed, 0
+        try:
+            self.producer.flush(timeout=self.flush_timeout)
+        except Exception:
+            with self._stats_lock:
+                self._unflushed += unflushed
+            raise
+        self._count("flushes")
+
+    def _on_success(self, topic: str, event: Dict[str, Any], metadata: Any):
+        self._count("delivered")
+        self._notify(topic, event, None)
+
+    def _on_error(self, topic: str, event: Dict[str, Any], error: Exception):
+        self._count("failed")
+        logger.error(f"Failed to deliver event to {topic}: {error}")
+        self._notify(topic, event, error)
+
+    def _notify(self, topic: str, event: Dict[str, Any], error: Optional[Exception]):
+        if self.on_delivery is None:
+            return
+        try:
+            self.on_delivery(topic, event, error)
+        except Exception as e:
+            logger.error(f"Kafka delivery callback failed: {e}")
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
 
 kafka_service = KafkaService()
+
+
+async def close_kafka_service():
+    """Flush and close the shared Kafka publisher."""
+    await kafka_service.close()
@@ -2,14 +2,20 @@
 
 import time
 import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis
 from app.config.settings import get_settings
 from pydantic import BaseModel, Field
 
+MAX_PRIORITY = 10
+
+# Enqueue signals kept per queue for blocked consumers
+READY_SIGNAL_LIMIT = 64
+
 
 class MessageStatus(str, Enum):
     """Message status enumeration."""
@@ -27,7 +33,7 @@ class QueueMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     queue_name: str
     payload: Dict[str, Any]
-    priority: int = Field(default=0, ge=0, le=10)
+    priority: int = Field(default=0, ge=0, le=MAX_PRIORITY)
     retry_count: int = Field(default=0, ge=0)
     max_retries: int = Field(default=3, ge=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -37,16 +43,165 @@ class QueueMessage(BaseModel):
     error_message: Optional[str] = None
 
 
-class MessageQueue:
-    """Redis-based message queue with persistence and delivery guarantees."""
-
-    def __init__(self, redis_url: Optional[str] = None):
-        """Initialize message queue with Redis connection."""
+# Server-side scripts: each runs atomically in one round trip, so no other
+# client can observe or interleave with the intermediate states.
+#
+# DEQUEUE_SCRIPT and PROMOTE_SCHEDULED_SCRIPT touch message, lane and ready
+# keys named after ids and queue names they read from Redis, so those keys
+# cannot be declared in KEYS up front. The queue therefore needs a
+# standalone Redis server (optionally with replicas); Redis Cluster and
+# key-routing proxies are not supported.
+
+# Move up to ARGV[2] ids from the priority lanes (KEYS[4..], highest
+# priority first) to the processing list, recording when processing
+# started, and mark each message PROCESSING (status ARGV[5]) with the
+# processing timeout ARGV[4] as its TTL; returns the updated data. Lanes
+# are picked by smooth weighted round robin over the non-empty lanes, using
+# the weights in ARGV[6..] and the credits kept in the KEYS[3] hash, so
+# every waiting lane is served in proportion to its weight and none
+# starves. Ids whose data has expired are dropped from the processing list.
+#
+# The status is replaced in the stored JSON rather than decoding and
+# re-encoding it, which would alter the payload (cjson turns empty arrays
+# into objects and rounds floats). Messages are stored compact by
+# ``model_dump_json`` and ``status`` is the last field written before
+# ``error_message``, a string, so the last ``"status":"`` is the field
+# itself and never part of the payload.
+DEQUEUE_SCRIPT = """
+local lanes = #KEYS - 3
+local saved = {}
+local stored = redis.call('HGETALL', KEYS[3])
+for i = 1, #stored, 2 do
+    saved[stored[i]] = tonumber(stored[i + 1])
+end
+local lengths, weights, credits = {}, {}, {}
+for i = 1, lanes do
+    lengths[i] = redis.call('LLEN', KEYS[i + 3])
+    weights[i] = tonumber(ARGV[i + 5])
+    credits[i] = saved[KEYS[i + 3]] or 0
+end
+local out = {}
+for _ = 1, tonumber(ARGV[2]) do
+    local best, total = nil, 0
+    for i = 1, lanes do
+        if lengths[i] > 0 then
+            credits[i] = credits[i] + weights[i]
+            total = total + weights[i]
+            if not best or credits[i] > credits[best] then
+                best = i
+            end
+        end
+    end
+    if not best then break end
+    credits[best] = credits[best] - total
+    lengths[best] = lengths[best] - 1
+    local id = redis.call('RPOPLPUSH', KEYS[best + 3], KEYS[1])
+    local key = ARGV[1] .. id
+    local data = redis.call('GET', key)
+    if data then
+        local head, tail = string.match(data, '^(.*"status":")[^"]*(".*)$')
+        if head then
+            data = head .. ARGV[5] .. tail
+        end
+        redis.call('SET', key, data, 'EX', ARGV[4])
+        redis.call('ZADD', KEYS[2], ARGV[3], id)
+        table.insert(out, data)
+    else
+        redis.call('LREM', KEYS[1], 1, id)
+    end
+end
+for i = 1, lanes do
+    if lengths[i] > 0 then
+        redis.call('HSET', KEYS[3], KEYS[i + 3], credits[i])
+    else
+        redis.call('HDEL', KEYS[3], KEYS[i + 3])
+    end
+end
+return out
+"""
+
+# Remove a message from processing and either schedule its retry (ZADD) or
+# dead-letter it (LPUSH), storing its updated data. No-op if it was not in
+# the processing list, e.g. because it was already acked or recovered.
+NACK_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+if ARGV[2] == 'retry' then
+    redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+else
+    redis.call('LPUSH', KEYS[4], ARGV[1])
+end
+redis.call('SETEX', KEYS[3], ARGV[4], ARGV[5])
+return 1
+"""
+
+# Move up to ARGV[5] due scheduled messages onto the lane of their queue
+# and priority, dropping those whose data is gone or whose expires_at
+# (ISO-8601 UTC, compared as strings) has passed, and signal waiting
+# consumers on the ready list (prefix ARGV[6], capped at ARGV[7] entries).
+# Returns {moved, examined}.
+PROMOTE_SCHEDULED_SCRIPT = """
+local ids = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[5])
+)
+local moved = 0
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local key = ARGV[2] .. id
+    local data = redis.call('GET', key)
+    if data then
+        local message = cjson.decode(data)
+        local expires_at = message['expires_at']
+        if type(expires_at) == 'string' and expires_at < ARGV[3] then
+            redis.call('DEL', key)
+        else
+            local lane = ARGV[4] .. message['queue_name']
+            local priority = tonumber(message['priority']) or 0
+            if priority > 0 then
+                lane = lane .. ':p' .. string.format('%d', priority)
+            end
+            redis.call('LPUSH', lane, id)
+            local ready = ARGV[6] .. message['queue_name']
+            redis.call('LPUSH', ready, 1)
+            redis.call('LTRIM', ready, 0, tonumber(ARGV[7]) - 1)
+            moved = moved + 1
+        end
+    end
+end
+return {moved, #ids}
+"""
+
+
+class BaseMessageQueue:
+    """Key layout, message building and script parameters shared by the
+    synchronous and asyncio queues; subclasses perform the Redis I/O.
+
+    Requires a standalone Redis server, not Redis Cluster (see the scripts
+    above).
+    """
+
+    redis_module: Any = redis
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        lane_weights: Optional[Dict[int, int]] = None,
+    ):
+        """Initialize message queue with Redis connection.
+
+        Each queue keeps one lane per priority level. ``lane_weights`` maps
+        priority to its share of dequeues while several lanes are waiting;
+        by default a lane's weight is its priority plus one.
+        """
         settings = get_settings()
         self.redis_url = redis_url or getattr(
             settings, "REDIS_URL", "redis://localhost:6379"
         )
-        self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+        self.redis_client = self.redis_module.from_url(
+            self.redis_url, decode_responses=True
+        )
 
         # Queue configuration
         self.default_ttl = 86400  # 24 hours
@@ -59,6 +214,25 @@ class MessageQueue:
         self.dead_letter_prefix = "dead_letter:"
         self.message_prefix = "message:"
         self.scheduled_prefix = "scheduled:"
+        self.processing_started_prefix = "processing_started:"
+        self.lane_credit_prefix = "lane_credit:"
+        self.ready_prefix = "queue_ready:"
+
+        # Dequeue weight per priority lane, highest priority first
+        weights = lane_weights or {}
+        self.lane_weights = [
+            (priority, weights.get(priority, priority + 1))
+            for priority in range(MAX_PRIORITY, -1, -1)
+        ]
+
+        # Scheduled messages promoted per script call
+        self.promote_batch_size = 1000
+
+        self._dequeue_script = self.redis_client.register_script(DEQUEUE_SCRIPT)
+        self._nack_script = self.redis_client.register_script(NACK_SCRIPT)
+        self._promote_script = self.redis_client.register_script(
+            PROMOTE_SCHEDULED_SCRIPT
+        )
 
     def _get_queue_key(self, queue_name: str) -> str:
         """Get Redis key for queue."""
@@ -72,6 +246,26 @@ class MessageQueue:
         """Get Redis key for dead letter queue."""
         return f"{self.dead_letter_prefix}{queue_name}"
 
+    def _get_lane_key(self, queue_name: str, priority: int) -> str:
+        """Get Redis key for the lane of a queue at a priority level."""
+        queue_key = self._get_queue_key(queue_name)
+        return queue_key if priority == 0 else f"{queue_key}:p{priority}"
+
+    def _get_lane_keys(self, queue_name: str) -> List[str]:
+        """Lane keys of a queue, highest priority first."""
+        return [
+            self._get_lane_key(queue_name, priority)
+            for priority, _ in self.lane_weights
+        ]
+
+    def _get_lane_credit_key(self, queue_name: str) -> str:
+        """Get Redis key for the weighted round robin state of a queue."""
+        return f"{self.lane_credit_prefix}{queue_name}"
+
+    def _get_ready_key(self, queue_name: str) -> str:
+        """Get Redis key for signals that wake blocked consumers."""
+        return f"{self.ready_prefix}{queue_name}"
+
     def _get_message_key(self, message_id: str) -> str:
         """Get Redis key for message data."""
         return f"{self.message_prefix}{message_id}"
@@ -80,223 +274,387 @@ class MessageQueue:
         """Get Redis key for scheduled messages."""
         return f"{self.scheduled_prefix}messages"
 
-    def enqueue(
+    def _get_processing_started_key(self, queue_name: str) -> str:
+        """Get Redis key for processing start times (sorted set)."""
+        return f"{self.processing_started_prefix}{queue_name}"
+
+    def _build_messages(
         self,
         queue_name: str,
-        payload: Dict[str, Any],
-        priority: int = 0,
-        delay_seconds: int = 0,
-        ttl_seconds: Optional[int] = None,
-        max_retries: int = 3,
-    ) -> str:
-        """Enqueue a message with optional delay and TTL."""
-        message = QueueMessage(
-            queue_name=queue_name,
-            payload=payload,
-            priority=priority,
-            max_retries=max_retries,
-        )
+        payloads: List[Dict[str, Any]],
+        priority: int,
+        delay_seconds: int,
+        ttl_seconds: Optional[int],
+        max_retries: int,
+    ) -> List[QueueMessage]:
+        messages = []
+        for payload in payloads:
+            message = QueueMessage(
+                queue_name=queue_name,
+                payload=payload,
+                priority=priority,
+                max_retries=max_retries,
+            )
 
-        # Set expiration if TTL provided
-        if ttl_seconds:
-            message.expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+            # Set expiration if TTL provided
+            if ttl_seconds:
+                message.expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+
+            # Set scheduled time if delay provided
+            if delay_seconds > 0:
+                message.scheduled_at = datetime.utcnow() + timedelta(
+                    seconds=delay_seconds
+                )
+
+            messages.append(message)
+        return messages
+
+    def _queue_enqueue(
+        self, pipe: Any, messages: List[QueueMessage], ttl_seconds: Optional[int]
+    ):
+        """Add the writes that store and enqueue ``messages`` to ``pipe``."""
+        ready = Counter()
+        for message in messages:
+            # Store message data
+            pipe.setex(
+                self._get_message_key(message.id),
+                ttl_seconds or self.default_ttl,
+                message.model_dump_json(),
+            )
 
-        # Set scheduled time if delay provided
-        if delay_seconds > 0:
-            message.scheduled_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+            # Add to appropriate queue
+            if message.scheduled_at:
+                # Add to scheduled messages sorted set
+                pipe.zadd(
+                    self._get_scheduled_key(),
+                    {message.id: message.scheduled_at.timestamp()},
+                )
+            else:
+                # Add to the lane for its priority
+                pipe.lpush(
+                    self._get_lane_key(message.queue_name, message.priority),
+                    message.id,
+                )
+                ready[message.queue_name] += 1
+
+        # Wake consumers blocked on these queues
+        for queue_name, count in ready.items():
+            ready_key = self._get_ready_key(queue_name)
+            pipe.lpush(ready_key, *[1] * min(count, READY_SIGNAL_LIMIT))
+            pipe.ltrim(ready_key, 0, READY_SIGNAL_LIMIT - 1)
+
+    def _dequeue_script_params(self, queue_name: str, count: int) -> Dict[str, Any]:
+        """Keys and args for DEQUEUE_SCRIPT."""
+        return {
+            "keys": [
+                self._get_processing_key(queue_name),
+                self._get_processing_started_key(queue_name),
+                self._get_lane_credit_key(queue_name),
+                *self._get_lane_keys(queue_name),
+            ],
+            "args": [
+                self.message_prefix,
+                count,
+                time.time(),
+                self.processing_timeout,
+                MessageStatus.PROCESSING.value,
+                *[weight for _, weight in self.lane_weights],
+            ],
+        }
 
-        # Store message data
-        message_key = self._get_message_key(message.id)
-        self.redis_client.setex(
-            message_key, ttl_seconds or self.default_ttl, message.model_dump_json()
+    @staticmethod
+    def _dequeued_messages(message_data: List[str]) -> List[QueueMessage]:
+        """Messages from the data DEQUEUE_SCRIPT returned."""
+        return [QueueMessage.model_validate_json(data) for data in message_data]
+
+    def _queue_ack(self, pipe: Any, message: QueueMessage):
+        """Add the writes that acknowledge ``message`` to ``pipe``."""
+        message.status = MessageStatus.COMPLETED
+        pipe.lrem(self._get_processing_key(message.queue_name), 1, message.id)
+        pipe.zrem(self._get_processing_started_key(message.queue_name), message.id)
+        pipe.setex(
+            self._get_message_key(message.id),
+            3600,  # Keep completed messages for 1 hour
+            message.model_dump_json(),
         )
 
-        # Add to appropriate queue
-        if message.scheduled_at:
-            # Add to scheduled messages sorted set
-            scheduled_key = self._get_scheduled_key()
-            self.redis_client.zadd(
-                scheduled_key, {message.id: message.scheduled_at.timestamp()}
-            )
-        else:
-            # Add to immediate processing queue
-            queue_key = self._get_queue_key(queue_name)
-            self.redis_client.lpush(queue_key, message.id)
+    def _nack_update(
+        self, message: QueueMessage, error_message: Optional[str]
+    ) -> QueueMessage:
+        """Copy of ``message`` as it will be stored after a nack."""
+        updated = message.model_copy()
+        updated.retry_count += 1
+        updated.error_message = error_message
 
-        return message.id
+        if updated.retry_count <= updated.max_retries:
+            # Retry with exponential backoff
+            delay = min(300, 2**updated.retry_count)  # Max 5 minutes
+            updated.scheduled_at = datetime.utcnow() + timedelta(seconds=delay)
+            updated.status = MessageStatus.PENDING
+        else:
+            updated.status = MessageStatus.DEAD_LETTER
+        return updated
 
-    def dequeue(self, queue_name: str, timeout: int = 0) -> Optional[QueueMessage]:
-        """Dequeue a message with blocking support."""
-        queue_key = self._get_queue_key(queue_name)
-        processing_key = self._get_processing_key(queue_name)
+    @staticmethod
+    def _apply_nack(message: QueueMessage, updated: QueueMessage):
+        for field in ("retry_count", "error_message", "scheduled_at", "status"):
+            setattr(message, field, getattr(updated, field))
 
-        # Move message from queue to processing with atomic operation
-        if timeout > 0:
-            result = self.redis_client.brpoplpush(queue_key, processing_key, timeout)
+    def _nack_script_params(self, message: QueueMessage) -> Dict[str, Any]:
+        """Keys and args for NACK_SCRIPT given the updated message."""
+        if message.status == MessageStatus.DEAD_LETTER:
+            # Move to dead letter queue
+            mode = "dead"
+            target = self._get_dead_letter_key(message.queue_name)
+            score = 0
+            ttl = self.dead_letter_ttl
         else:
-            result = self.redis_client.rpoplpush(queue_key, processing_key)
+            # Add to scheduled messages
+            mode = "retry"
+            target = self._get_scheduled_key()
+            score = message.scheduled_at.timestamp()
+            ttl = self.default_ttl
 
-        if not result:
-            return None
+        return {
+            "keys": [
+                self._get_processing_key(message.queue_name),
+                self._get_processing_started_key(message.queue_name),
+                self._get_message_key(message.id),
+                target,
+            ],
+            "args": [message.id, mode, score, ttl, message.model_dump_json()],
+        }
 
-        message_id = result
-        message_key = self._get_message_key(message_id)
-        message_data = self.redis_client.get(message_key)
+    def _promote_script_params(self) -> Dict[str, Any]:
+        """Keys and args for PROMOTE_SCHEDULED_SCRIPT."""
+        return {
+            "keys": [self._get_scheduled_key()],
+            "args": [
+                time.time(),
+                self.message_prefix,
+                datetime.utcnow().isoformat(),
+                self.queue_prefix,
+                self.promote_batch_size,
+                self.ready_prefix,
+                READY_SIGNAL_LIMIT,
+            ],
+        }
 
-        if not message_data:
-            # Message expired, remove from processing
-            self.redis_client.lrem(processing_key, 1, message_id)
-            return None
+    def _stale_ids(
+        self, message_ids: List[str], started: List[Any], now: float
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """Ids in processing past the timeout, and untracked ids to start
+        the clock on."""
+        started_at = dict(started)
 
-        message = QueueMessage.model_validate_json(message_data)
-        message.status = MessageStatus.PROCESSING
+        # Ids dequeued before start times were tracked get a clock now
+        untracked = {mid: now for mid in message_ids if mid not in started_at}
 
-        # Update message status and add processing timeout
-        self.redis_client.setex(
-            message_key, self.processing_timeout, message.model_dump_json()
-        )
+        # Check if processing timeout exceeded
+        cutoff = now - self.processing_timeout
+        stale_ids = [mid for mid in message_ids if started_at.get(mid, now) <= cutoff]
+        return stale_ids, untracked
 
-        return message
+    def _queue_recover(
+        self,
+        pipe: Any,
+        queue_name: str,
+        stale_ids: List[str],
+        stale_data: List[Optional[str]],
+    ) -> List[Any]:
+        """Add writes recovering stale messages to ``pipe``; returns the
+        pending nack script calls for asyncio pipelines to await."""
+        calls = []
+        for message_id, message_data in zip(stale_ids, stale_data):
+            if not message_data:
+                # Message expired, remove from processing
+                pipe.lrem(self._get_processing_key(queue_name), 1, message_id)
+                pipe.zrem(self._get_processing_started_key(queue_name), message_id)
+            else:
+                # Treat as failed and retry
+                message = QueueMessage.model_validate_json(message_data)
+                updated = self._nack_update(message, "Processing timeout exceeded")
+                calls.append(
+                    self._nack_script(**self._nack_script_params(updated), client=pipe)
+                )
+        return calls
+
+    def _stats_from_counts(self, counts: List[int]) -> Dict[str, int]:
+        *lanes, processing, dead_letter = counts
+        return {
+            "pending": sum(lanes),
+            "processing": processing,
+            "dead_letter": dead_letter,
+        }
 
-    def ack(self, message: QueueMessage) -> bool:
-        """Acknowledge successful message processing."""
-        processing_key = self._get_processing_key(message.queue_name)
-        message_key = self._get_message_key(message.id)
+    def _queue_list_keys(self, queue_name: str) -> List[str]:
+        """Lanes, processing and dead letter lists of a queue."""
+        return [
+            *self._get_lane_keys(queue_name),
+            self._get_processing_key(queue_name),
+            self._get_dead_letter_key(queue_name),
+        ]
+
+    def _purge_keys(self, queue_name: str) -> List[str]:
+        """Every structural key of a queue."""
+        return [
+            *self._queue_list_keys(queue_name),
+            self._get_processing_started_key(queue_name),
+            self._get_lane_credit_key(queue_name),
+            self._get_ready_key(queue_name),
+        ]
+
+    @staticmethod
+    def _health_from_info(info: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "healthy",
+            "redis_version": info.get("redis_version"),
+            "connected_clients": info.get("connected_clients"),
+            "used_memory_human": info.get("used_memory_human"),
+            "uptime_in_seconds": info.get("uptime_in_seconds"),
+        }
 
-        # Remove from processing queue
-        removed = self.redis_client.lrem(processing_key, 1, message.id)
 
-        # Update message status
-        message.status = MessageStatus.COMPLETED
-        self.redis_client.setex(
-            message_key,
-            3600,  # Keep completed messages for 1 hour
-            message.model_dump_json(),
-        )
+class MessageQueue(BaseMessageQueue):
+    """Redis-based message queue with persistence and delivery guarantees."""
 
-        return removed > 0
+    def enqueue(
+        self,
+        queue_name: str,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        delay_seconds: int = 0,
+        ttl_seconds: Optional[int] = None,
+        max_retries: int = 3,
+    ) -> str:
+        """Enqueue a message with optional delay and TTL."""
+        return self.enqueue_many(
+            queue_name, [payload], priority, delay_seconds, ttl_seconds, max_retries
+        )[0]
 
-    def nack(self, message: QueueMessage, error_message: str = None) -> bool:
-        """Negative acknowledge - retry or move to dead letter queue."""
-        processing_key = self._get_processing_key(message.queue_name)
-        message_key = self._get_message_key(message.id)
+    def enqueue_many(
+        self,
+        queue_name: str,
+        payloads: List[Dict[str, Any]],
+        priority: int = 0,
+        delay_seconds: int = 0,
+        ttl_seconds: Optional[int] = None,
+        max_retries: int = 3,
+    ) -> List[str]:
+        """Enqueue several messages in one atomic round trip."""
+        messages = self._build_messages(
+            queue_name, payloads, priority, delay_seconds, ttl_seconds, max_retries
+        )
 
-        # Remove from processing queue
-        removed = self.redis_client.lrem(processing_key, 1, message.id)
-        if removed == 0:
-            return False
+        pipe = self.redis_client.pipeline(transaction=True)
+        self._queue_enqueue(pipe, messages, ttl_seconds)
+        pipe.execute()
 
-        message.retry_count += 1
-        message.error_message = error_message
+        return [message.id for message in messages]
 
-        if message.retry_count <= message.max_retries:
-            # Retry with exponential backoff
-            delay = min(300, 2**message.retry_count)  # Max 5 minutes
-            message.scheduled_at = datetime.utcnow() + timedelta(seconds=delay)
-            message.status = MessageStatus.PENDING
+    def dequeue(self, queue_name: str, timeout: int = 0) -> Optional[QueueMessage]:
+        """Dequeue a message with blocking support."""
+        deadline = time.monotonic() + timeout
+        while True:
+            messages = self.dequeue_many(queue_name, 1)
+            if messages:
+                return messages[0]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            # Nothing ready: wait for an enqueue signal, then try again
+            self.redis_client.brpop(self._get_ready_key(queue_name), remaining)
+
+    def dequeue_many(self, queue_name: str, count: int) -> List[QueueMessage]:
+        """Dequeue up to ``count`` ready messages without blocking.
+
+        Higher priority lanes are served more often, in proportion to their
+        weights, while lower priority lanes still get their share.
+        """
+        if count <= 0:
+            return []
+
+        # Pick lanes, pop, load and mark processing atomically; expired ids
+        # are dropped
+        message_data = self._dequeue_script(
+            **self._dequeue_script_params(queue_name, count)
+        )
+        return self._dequeued_messages(message_data)
 
-            # Add to scheduled messages
-            scheduled_key = self._get_scheduled_key()
-            self.redis_client.zadd(
-                scheduled_key, {message.id: message.scheduled_at.timestamp()}
-            )
+    def ack(self, message: QueueMessage) -> bool:
+        """Acknowledge successful message processing."""
+        pipe = self.redis_client.pipeline(transaction=True)
+        self._queue_ack(pipe, message)
+        removed = pipe.execute()[0]
 
-            # Update message data
-            self.redis_client.setex(
-                message_key, self.default_ttl, message.model_dump_json()
-            )
-        else:
-            # Move to dead letter queue
-            message.status = MessageStatus.DEAD_LETTER
-            dead_letter_key = self._get_dead_letter_key(message.queue_name)
+        return removed > 0
 
-            self.redis_client.lpush(dead_letter_key, message.id)
-            self.redis_client.setex(
-                message_key, self.dead_letter_ttl, message.model_dump_json()
-            )
+    def nack(self, message: QueueMessage, error_message: str = None) -> bool:
+        """Negative acknowledge - retry or move to dead letter queue."""
+        updated = self._nack_update(message, error_message)
+        removed = self._nack_script(**self._nack_script_params(updated))
+        if not removed:
+            return False
 
+        self._apply_nack(message, updated)
         return True
 
     def process_scheduled_messages(self) -> int:
         """Process scheduled messages that are ready."""
-        scheduled_key = self._get_scheduled_key()
-        current_time = time.time()
-
-        # Get messages ready for processing
-        ready_messages = self.redis_client.zrangebyscore(
-            scheduled_key, 0, current_time, withscores=True
-        )
-
         processed_count = 0
-        for message_id, _ in ready_messages:
-            message_key = self._get_message_key(message_id)
-            message_data = self.redis_client.get(message_key)
-
-            if not message_data:
-                # Message expired, remove from scheduled
-                self.redis_client.zrem(scheduled_key, message_id)
-                continue
-
-            message = QueueMessage.model_validate_json(message_data)
-
-            # Check if message has expired
-            if message.expires_at and message.expires_at < datetime.utcnow():
-                self.redis_client.zrem(scheduled_key, message_id)
-                self.redis_client.delete(message_key)
-                continue
-
-            # Move to processing queue
-            queue_key = self._get_queue_key(message.queue_name)
-            self.redis_client.lpush(queue_key, message_id)
-            self.redis_client.zrem(scheduled_key, message_id)
-
-            processed_count += 1
-
-        return processed_count
+        while True:
+            moved, examined = self._promote_script(**self._promote_script_params())
+            processed_count += moved
+            if examined < self.promote_batch_size:
+                return processed_count
 
     def recover_stale_messages(self) -> int:
         """Recover messages stuck in processing state."""
         processing_pattern = f"{self.processing_prefix}*"
         recovered_count = 0
+        now = time.time()
 
         for key in self.redis_client.scan_iter(match=processing_pattern):
             queue_name = key.replace(self.processing_prefix, "")
-            processing_key = self._get_processing_key(queue_name)
+            started_key = self._get_processing_started_key(queue_name)
 
-            # Get all messages in processing
-            message_ids = self.redis_client.lrange(processing_key, 0, -1)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.lrange(self._get_processing_key(queue_name), 0, -1)
+            pipe.zrange(started_key, 0, -1, withscores=True)
+            stale_ids, untracked = self._stale_ids(*pipe.execute(), now)
 
-            for message_id in message_ids:
-                message_key = self._get_message_key(message_id)
-                message_data = self.redis_client.get(message_key)
-
-                if not message_data:
-                    # Message expired, remove from processing
-                    self.redis_client.lrem(processing_key, 1, message_id)
-                    recovered_count += 1
-                    continue
-
-                message = QueueMessage.model_validate_json(message_data)
+            if untracked:
+                self.redis_client.zadd(started_key, untracked, nx=True)
+            if not stale_ids:
+                continue
 
-                # Check if processing timeout exceeded
-                processing_time = datetime.utcnow() - message.created_at
-                if processing_time.total_seconds() > self.processing_timeout:
-                    # Treat as failed and retry
-                    self.nack(message, "Processing timeout exceeded")
-                    recovered_count += 1
+            stale_data = self.redis_client.mget(
+                [self._get_message_key(mid) for mid in stale_ids]
+            )
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._queue_recover(pipe, queue_name, stale_ids, stale_data)
+            pipe.execute()
+            recovered_count += len(stale_ids)
 
         return recovered_count
 
     def get_queue_stats(self, queue_name: str) -> Dict[str, int]:
         """Get queue statistics."""
-        queue_key = self._get_queue_key(queue_name)
-        processing_key = self._get_processing_key(queue_name)
-        dead_letter_key = self._get_dead_letter_key(queue_name)
-
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in self._queue_list_keys(queue_name):
+            pipe.llen(key)
+        return self._stats_from_counts(pipe.execute())
+
+    def get_lane_stats(self, queue_name: str) -> Dict[int, int]:
+        """Get pending message counts per priority lane."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for lane_key in self._get_lane_keys(queue_name):
+            pipe.llen(lane_key)
         return {
-            "pending": self.redis_client.llen(queue_key),
-            "processing": self.redis_client.llen(processing_key),
-            "dead_letter": self.redis_client.llen(dead_letter_key),
+            priority: pending
+            for (priority, _), pending in zip(self.lane_weights, pipe.execute())
         }
 
     def get_message(self, message_id: str) -> Optional[QueueMessage]:
@@ -311,27 +669,18 @@ class MessageQueue:
 
     def purge_queue(self, queue_name: str) -> int:
         """Purge all messages from a queue."""
-        queue_key = self._get_queue_key(queue_name)
-        processing_key = self._get_processing_key(queue_name)
-        dead_letter_key = self._get_dead_letter_key(queue_name)
-
         # Get all message IDs
-        pending_ids = self.redis_client.lrange(queue_key, 0, -1)
-        processing_ids = self.redis_client.lrange(processing_key, 0, -1)
-        dead_letter_ids = self.redis_client.lrange(dead_letter_key, 0, -1)
-
-        all_ids = pending_ids + processing_ids + dead_letter_ids
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in self._queue_list_keys(queue_name):
+            pipe.lrange(key, 0, -1)
+        all_ids = [msg_id for ids in pipe.execute() for msg_id in ids]
 
-        # Delete message data
+        # Delete message data and clear queues together
+        pipe = self.redis_client.pipeline(transaction=True)
         if all_ids:
-            message_keys = [self._get_message_key(msg_id) for msg_id in all_ids]
-            self.redis_client.delete(*message_keys)
-
-        # Clear queues
-        deleted_count = 0
-        deleted_count += self.redis_client.delete(queue_key)
-        deleted_count += self.redis_client.delete(processing_key)
-        deleted_count += self.redis_client.delete(dead_letter_key)
+            pipe.delete(*[self._get_message_key(msg_id) for msg_id in all_ids])
+        pipe.delete(*self._purge_keys(queue_name))
+        pipe.execute()
 
         return len(all_ids)
 
@@ -342,15 +691,7 @@ class MessageQueue:
             self.redis_client.ping()
 
             # Get Redis info
-            info = self.redis_client.info()
-
-            return {
-                "status": "healthy",
-                "redis_version": info.get("redis_version"),
-                "connected_clients": info.get("connected_clients"),
-                "used_memory_human": info.get("used_memory_human"),
-                "uptime_in_seconds": info.get("uptime_in_seconds"),
-            }
+            return self._health_from_info(self.redis_client.info())
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
 
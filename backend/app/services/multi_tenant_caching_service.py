@@ -14,9 +14,15 @@ import redis.asyncio as redis
 from app.core.saas_config import SaaSConfig
 from app.models.tenant import Tenant
 from app.models.user import User
+from app.utils.quantile_sketch import WindowedQuantileSketch
 
 logger = logging.getLogger(__name__)
 
+# Response-time history kept by the sketches; longer reports are clamped
+RESPONSE_TIME_SLOT_SECONDS = 900
+RESPONSE_TIME_WINDOW_HOURS = 24
+RESPONSE_TIME_SLOTS = RESPONSE_TIME_WINDOW_HOURS * 3600 // RESPONSE_TIME_SLOT_SECONDS
+
 
 class CacheType(str, Enum):
     """Types of cache implementations."""
@@ -133,6 +139,9 @@ class MultiTenantCachingService:
 
         # Performance monitoring
         self.performance_metrics: List[PerformanceMetrics] = []
+        # Response-time sketches, global and per tenant
+        self.response_time_sketch = self._new_response_time_sketch()
+        self.tenant_response_time_sketches: Dict[UUID, WindowedQuantileSketch] = {}
 
     async def initialize(self):
         """Initialize the caching service."""
@@ -216,6 +225,12 @@ class MultiTenantCachingService:
             )
 
             self.performance_metrics.append(metrics)
+            self.response_time_sketch.add(response_time)
+            sketch = self.tenant_response_time_sketches.get(tenant_id)
+            if sketch is None:
+                sketch = self._new_response_time_sketch()
+                self.tenant_response_time_sketches[tenant_id] = sketch
+            sketch.add(response_time)
 
             # Keep only recent metrics
             if len(self.performance_metrics) > 1000:
@@ -563,8 +578,14 @@ class MultiTenantCachingService:
     async def get_performance_report(
         self, tenant_id: Optional[UUID] = None, hours: int = 24
     ) -> Dict[str, Any]:
-        """Generate performance report."""
+        """Generate performance report.
+
+        Response times are only kept for RESPONSE_TIME_WINDOW_HOURS, so a
+        longer ``hours`` is clamped; ``time_period_hours`` in the report is
+        the window actually covered.
+        """
         try:
+            hours = min(hours, RESPONSE_TIME_WINDOW_HOURS)
             cutoff_time = datetime.utcnow() - timedelta(hours=hours)
 
             if tenant_id:
@@ -580,32 +601,32 @@ class MultiTenantCachingService:
                     m for m in self.performance_metrics if m.timestamp >= cutoff_time
                 ]
 
-            if not metrics:
+            sketch = (
+                self.tenant_response_time_sketches.get(tenant_id)
+                if tenant_id
+                else self.response_time_sketch
+            )
+            response_times = sketch.snapshot(hours * 3600) if sketch else None
+
+            if not response_times or not response_times.count:
                 return {"message": "No performance data available"}
 
-            # Calculate performance statistics
-            response_times = [m.response_time_ms for m in metrics]
+            # Response-time statistics cover every request in the window;
+            # the raw metrics list is a recent sample used for cache hit rate.
             cache_hits = sum(1 for m in metrics if m.cache_hit)
+            percentiles = response_times.percentiles()
 
             report = {
                 "time_period_hours": hours,
-                "total_requests": len(metrics),
+                "total_requests": response_times.count,
                 "cache_hit_rate": (cache_hits / len(metrics) * 100) if metrics else 0,
-                "avg_response_time_ms": (
-                    sum(response_times) / len(response_times) if response_times else 0
-                ),
-                "min_response_time_ms": min(response_times) if response_times else 0,
-                "max_response_time_ms": max(response_times) if response_times else 0,
-                "p95_response_time_ms": (
-                    self._calculate_percentile(response_times, 95)
-                    if response_times
-                    else 0
-                ),
-                "p99_response_time_ms": (
-                    self._calculate_percentile(response_times, 99)
-                    if response_times
-                    else 0
-                ),
+                "avg_response_time_ms": response_times.mean,
+                "min_response_time_ms": response_times.min,
+                "max_response_time_ms": response_times.max,
+                "p50_response_time_ms": percentiles["p50"],
+                "p95_response_time_ms": percentiles["p95"],
+                "p99_response_time_ms": percentiles["p99"],
+                "p999_response_time_ms": percentiles["p999"],
                 "cache_metrics": (
                     await self.get_global_cache_metrics()
                     if not tenant_id
@@ -619,23 +640,11 @@ class MultiTenantCachingService:
             logger.error(f"Performance report generation failed: {str(e)}")
             return {"error": str(e)}
 
-    def _calculate_percentile(self, data: List[float], percentile: float) -> float:
-        """Calculate percentile from data list."""
-        if not data:
-            return 0.0
-
-        data_sorted = sorted(data)
-        index = (len(data_sorted) - 1) * (percentile / 100)
-        floor_index = int(index)
-        ceil_index = floor_index + 1
-
-        if ceil_index >= len(data_sorted):
-            return data_sorted[floor_index]
-
-        # Linear interpolation
-        weight = index - floor_index
-        return (
-            data_sorted[floor_index] * (1 - weight) + data_sorted[ceil_index] * weight
+    @staticmethod
+    def _new_response_time_sketch() -> WindowedQuantileSketch:
+        return WindowedQuantileSketch(
+            interval_seconds=RESPONSE_TIME_SLOT_SECONDS,
+            num_intervals=RESPONSE_TIME_SLOTS,
         )
 
     def _build_cache_key(self, key: str, tenant_id: Optional[UUID] = None) -> str:
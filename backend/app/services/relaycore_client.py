@@ -1,10 +1,13 @@
 """RelayCore HTTP client for AutoMatrix backend integration."""
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import aiohttp
 from aiohttp import ClientTimeout
@@ -56,6 +59,11 @@ class RelayCoreClient:
         timeout: int = 30,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        coalesce_requests: bool = False,
     ):
         """
         Initialize RelayCore client.
@@ -65,13 +73,83 @@ class RelayCoreClient:
             timeout: Request timeout in seconds
             max_retries: Maximum retry attempts
             retry_delay: Delay between retries
+            max_connections: Connection pool size
+            max_connections_per_host: Pooled connections per host
+            keepalive_timeout: Seconds an idle connection is kept open
+            dns_cache_ttl: Seconds resolved addresses are cached
+            coalesce_requests: Share one request between identical
+                concurrent chat completions
         """
         self.base_url = base_url or os.getenv("RELAYCORE_URL", "http://localhost:3001")
         self.timeout = ClientTimeout(total=timeout)
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.coalesce_requests = coalesce_requests
         self.logger = logging.getLogger(__name__)
 
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "RelayCoreClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use.
+
+        One session (and connection pool) is reused for every request, so
+        connections stay alive between calls instead of paying TCP/TLS setup
+        each time. A session is bound to the event loop that created it; a
+        new one is made (and the old one released) if the loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._session
+        if session is None or session.closed or self._session_loop is not loop:
+            stale, stale_loop = session, self._session_loop
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._session = session
+            self._session_loop = loop
+            if stale is not None and not stale.closed:
+                await self._release_session(stale, stale_loop)
+        return session
+
+    @staticmethod
+    async def _release_session(
+        session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]
+    ):
+        """Close a session that belongs to another event loop."""
+        if loop is not None and loop.is_running():
+            # Its loop is still running in another thread; close it there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+
+        # Its loop is gone: drop the pooled connections without it
+        connector = session.connector
+        session.detach()
+        if connector is not None:
+            await connector.close()
+
     async def chat_completion(
         self,
         prompt: str,
@@ -102,7 +180,33 @@ class RelayCoreClient:
             system_source="autmatrix",
         )
 
-        return await self._make_request("/api/v1/ai/chat", request_data)
+        if not self.coalesce_requests:
+            data = await self._make_request("/api/v1/ai/chat", request_data)
+            return self._to_response(data)
+
+        payload = self._prepare_payload(request_data)
+        key = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        data = await self._single_flight(
+            key, lambda: self._make_request("/api/v1/ai/chat", request_data)
+        )
+        return self._to_response(data)
+
+    async def _single_flight(
+        self, key: str, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run ``request`` once for all concurrent callers with the same key."""
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(request())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.logger.debug("Coalescing identical in-flight RelayCore request")
+
+        # Shield so one caller being cancelled does not cancel the others
+        return await asyncio.shield(future)
 
     async def batch_completion(
         self, requests: List[Dict[str, Any]]
@@ -123,18 +227,7 @@ class RelayCoreClient:
         results = []
         for result in response.get("results", []):
             if "error" not in result:
-                results.append(
-                    RelayCoreResponse(
-                        content=result.get("content", ""),
-                        model_used=result.get("model_used", ""),
-                        provider=result.get("provider", ""),
-                        cost=result.get("cost", 0.0),
-                        latency=result.get("latency", 0),
-                        confidence=result.get("confidence", 0.0),
-                        metadata=result.get("metadata", {}),
-                        routing_info={},
-                    )
-                )
+                results.append(self._to_response(result))
             else:
                 # Handle error case
                 results.append(
@@ -152,6 +245,20 @@ class RelayCoreClient:
 
         return results
 
+    @staticmethod
+    def _to_response(result: Dict[str, Any]) -> RelayCoreResponse:
+        """Build a RelayCoreResponse from a chat or batch result payload."""
+        return RelayCoreResponse(
+            content=result.get("content", ""),
+            model_used=result.get("model_used", ""),
+            provider=result.get("provider", ""),
+            cost=result.get("cost", 0.0),
+            latency=result.get("latency", 0),
+            confidence=result.get("confidence", 0.0),
+            metadata=result.get("metadata", {}),
+            routing_info=result.get("routing_info", {}),
+        )
+
     async def get_providers(self) -> List[Dict[str, Any]]:
         """
         Get available AI providers from RelayCore.
@@ -170,9 +277,11 @@ class RelayCoreClient:
             True if service is healthy, False otherwise
         """
         try:
-            async with aiohttp.ClientSession(timeout=ClientTimeout(total=5)) as session:
-                async with session.get(f"{self.base_url}/health") as response:
-                    return response.status == 200
+            session = await self._get_session()
+            async with session.get(
+                f"{self.base_url}/health", timeout=ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
         except Exception as e:
             self.logger.warning(f"RelayCore health check failed: {e}")
             return False
@@ -203,16 +312,16 @@ class RelayCoreClient:
                     f"RelayCore request attempt {attempt + 1}/{self.max_retries + 1}"
                 )
 
-                async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                    if method.upper() == "GET":
-                        async with session.get(url) as response:
-                            return await self._handle_response(response)
-                    else:
-                        request_payload = self._prepare_payload(data)
-                        async with session.post(url, json=request_payload) as response:
-                            return await self._handle_response(response)
+                session = await self._get_session()
+                if method.upper() == "GET":
+                    async with session.get(url) as response:
+                        return await self._handle_response(response)
+                else:
+                    request_payload = self._prepare_payload(data)
+                    async with session.post(url, json=request_payload) as response:
+                        return await self._handle_response(response)
 
-            except aiohttp.ClientTimeout as e:
+            except asyncio.TimeoutError as e:
                 last_error = e
                 self.logger.warning(f"RelayCore timeout on attempt {attempt + 1}: {e}")
                 if attempt < self.max_retries:
@@ -277,6 +386,118 @@ class RelayCoreClient:
             return {"data": data}
 
 
+class RelayCoreMicroBatcher:
+    """Collect concurrent chat completions into ``/api/v1/ai/batch`` calls.
+
+    Requests submitted within ``max_wait`` seconds of each other (or until
+    ``max_batch_size`` are waiting) are sent as one batch request and each
+    caller receives its own result. An error for one item fails only that
+    caller; a failed batch request fails every caller in it. A batch of one
+    is sent to the plain chat endpoint.
+    """
+
+    def __init__(
+        self,
+        client: RelayCoreClient,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+    ):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.logger = logging.getLogger(__name__)
+
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        cost_constraints: Optional[RelayCoreCostConstraints] = None,
+        routing_preferences: Optional[Dict[str, Any]] = None,
+    ) -> RelayCoreResponse:
+        """Queue a chat completion and wait for its result."""
+        request_data = RelayCoreRequest(
+            prompt=prompt,
+            context=context or {},
+            routing_preferences=routing_preferences or {},
+            cost_constraints=cost_constraints or RelayCoreCostConstraints(),
+        )
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request_data, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything pending as one batch in a background task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[tuple]):
+        try:
+            if len(batch) == 1:
+                request_data, future = batch[0]
+                data = await self.client._make_request("/api/v1/ai/chat", request_data)
+                self._resolve(future, result=RelayCoreClient._to_response(data))
+                return
+
+            requests = [self.client._prepare_payload(r) for r, _ in batch]
+            response = await self.client._make_request(
+                "/api/v1/ai/batch", {"requests": requests}
+            )
+            results = response.get("results", [])
+        except Exception as e:
+            for _, future in batch:
+                self._resolve(future, error=e)
+            return
+
+        self.logger.debug(f"Sent {len(batch)} chat completions as one batch")
+        for index, (_, future) in enumerate(batch):
+            if index >= len(results):
+                self._resolve(
+                    future, error=AIServiceError("RelayCore batch result missing")
+                )
+            elif "error" in results[index]:
+                self._resolve(
+                    future,
+                    error=AIServiceError(
+                        f"RelayCore batch item failed: {results[index]['error']}"
+                    ),
+                )
+            else:
+                self._resolve(
+                    future, result=RelayCoreClient._to_response(results[index])
+                )
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future,
+        result: Optional[RelayCoreResponse] = None,
+        error: Optional[Exception] = None,
+    ):
+        if future.done():  # caller was cancelled
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
 class RelayCoreAIService:
     """AI service that uses RelayCore with fallback to direct OpenAI."""
 
@@ -285,6 +506,10 @@ class RelayCoreAIService:
         relaycore_client: Optional[RelayCoreClient] = None,
         fallback_service: Optional[Any] = None,
         enable_fallback: bool = True,
+        enable_batching: bool = False,
+        batch_max_size: int = 16,
+        batch_max_wait: float = 0.01,
+        health_check_ttl: float = 5.0,
     ):
         """
         Initialize RelayCore AI service.
@@ -293,12 +518,36 @@ class RelayCoreAIService:
             relaycore_client: RelayCore client instance
             fallback_service: Fallback AI service (e.g., direct OpenAI)
             enable_fallback: Whether to enable fallback on RelayCore failure
+            enable_batching: Send concurrent requests as batch requests
+            batch_max_size: Most requests combined into one batch
+            batch_max_wait: Seconds to wait for more requests to batch
+            health_check_ttl: Seconds a successful health check is trusted
         """
         self.relaycore_client = relaycore_client or RelayCoreClient()
         self.fallback_service = fallback_service
         self.enable_fallback = enable_fallback
+        self.batcher = (
+            RelayCoreMicroBatcher(self.relaycore_client, batch_max_size, batch_max_wait)
+            if enable_batching
+            else None
+        )
+        self.health_check_ttl = health_check_ttl
+        self._healthy_until = 0.0
         self.logger = logging.getLogger(__name__)
 
+    async def _relaycore_available(self) -> bool:
+        """Health check, reusing a recent success instead of asking every call."""
+        if time.monotonic() < self._healthy_until:
+            return True
+        if await self.relaycore_client.health_check():
+            self._healthy_until = time.monotonic() + self.health_check_ttl
+            return True
+        return False
+
+    async def close(self):
+        """Release the RelayCore client's pooled connections."""
+        await self.relaycore_client.close()
+
     async def process_text(
         self,
         prompt: str,
@@ -323,7 +572,7 @@ class RelayCoreAIService:
         # Try RelayCore first
         try:
             # Check if RelayCore is available
-            if not await self.relaycore_client.health_check():
+            if not await self._relaycore_available():
                 raise AIServiceError("RelayCore service unavailable")
 
             # Prepare routing preferences
@@ -336,11 +585,18 @@ class RelayCoreAIService:
                 routing_preferences["max_tokens"] = max_tokens
 
             # Make RelayCore request
-            response = await self.relaycore_client.chat_completion(
-                prompt=prompt,
-                context=context,
-                routing_preferences=routing_preferences,
-            )
+            if self.batcher is not None:
+                response = await self.batcher.submit(
+                    prompt=prompt,
+                    context=context,
+                    routing_preferences=routing_preferences,
+                )
+            else:
+                response = await self.relaycore_client.chat_completion(
+                    prompt=prompt,
+                    context=context,
+                    routing_preferences=routing_preferences,
+                )
 
             self.logger.info(
                 f"RelayCore request successful using {response.provider}/{response.model_used}"
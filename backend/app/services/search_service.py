@@ -1,9 +1,11 @@
 """Elasticsearch-based search service."""
 
+import asyncio
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from app.config.settings import get_settings
+from app.services.bulk_indexer import BulkAction, BulkIndexer
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import RequestError
 
@@ -17,6 +19,7 @@ class SearchService:
         self.host = host or getattr(settings, "ELASTICSEARCH_HOST", "localhost:9200")
 
         self.client = Elasticsearch([f"http://{self.host}"])
+        self.indexer = BulkIndexer(self.client)
 
         # Default indices
         self.workflow_index = "workflows"
@@ -91,8 +94,7 @@ class SearchService:
                 "definition": workflow_data.get("definition", {}),
             }
 
-            self.client.index(index=self.workflow_index, id=workflow_id, body=doc)
-            return True
+            return self._enqueue(self.workflow_index, doc, workflow_id)
         except Exception:
             return False
 
@@ -149,8 +151,7 @@ class SearchService:
                 "output_data": execution_data.get("output_data", {}),
             }
 
-            self.client.index(index=self.execution_index, id=execution_id, body=doc)
-            return True
+            return self._enqueue(self.execution_index, doc, execution_id)
         except Exception:
             return False
 
@@ -197,11 +198,42 @@ class SearchService:
     def index_log(self, log_data: Dict[str, Any]) -> bool:
         """Index log entry."""
         try:
-            self.client.index(index=self.logs_index, body=log_data)
-            return True
+            return self._enqueue(self.logs_index, log_data)
         except Exception:
             return False
 
+    def _enqueue(
+        self, index: str, document: Dict[str, Any], doc_id: Optional[str] = None
+    ) -> bool:
+        """Hand a document to the bulk indexer.
+
+        Inside an event loop the document is queued and written by a later
+        ``_bulk`` request, so the caller never waits on Elasticsearch; False
+        means the queue was full and the document was dropped. Without a
+        running loop (scripts, sync workers) it is indexed directly.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.client.index(index=index, id=doc_id, body=document)
+            return True
+
+        return self.indexer.submit_nowait(BulkAction(index, document, doc_id))
+
+    async def index_document(
+        self, index: str, document: Dict[str, Any], doc_id: Optional[str] = None
+    ):
+        """Queue a document for bulk indexing, waiting while the queue is full."""
+        await self.indexer.submit(BulkAction(index, document, doc_id))
+
+    async def flush(self):
+        """Wait until all queued documents have been written."""
+        await self.indexer.flush()
+
+    async def close(self):
+        """Flush queued documents and stop the bulk indexer."""
+        await self.indexer.close()
+
     def search_logs(
         self,
         query: Optional[str] = None,
@@ -273,6 +305,7 @@ class SearchService:
                 "cluster_status": health["status"],
                 "number_of_nodes": health["number_of_nodes"],
                 "active_shards": health["active_shards"],
+                "indexing": self.indexer.stats.to_dict(),
             }
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
@@ -288,3 +321,9 @@ def get_search_service() -> SearchService:
     if _search_service is None:
         _search_service = SearchService()
     return _search_service
+
+
+async def close_search_service():
+    """Flush pending index writes of the global instance, if one was created."""
+    if _search_service is not None:
+        await _search_service.close()
@@ -0,0 +1,177 @@
+"""In-process cache for resolving tenants on the request path.
+
+Tenant lookups by slug, id and user email are cached with a TTL (misses
+too, for a shorter time) so that tenant isolation does not cost database
+round trips on every request. Lookups that do reach the database use the
+async session layer (the request's session when there is one), and
+concurrent misses for the same key share one query. Anything that changes
+a tenant's status should call ``invalidate``.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, Callable, Dict, Hashable, Optional, Tuple
+
+from app.database import get_async_db_session
+from app.models.tenant import Tenant
+from app.models.user import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True)
+class ResolvedTenant:
+    """Snapshot of the tenant fields needed for request isolation."""
+
+    id: uuid.UUID
+    slug: str
+    status: str
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    @classmethod
+    def from_model(cls, tenant: Tenant) -> "ResolvedTenant":
+        status = getattr(tenant.status, "value", tenant.status)
+        return cls(id=tenant.id, slug=tenant.slug, status=status)
+
+
+class TenantResolver:
+    """TTL cache of tenants keyed by slug and id, and of user tenant ids
+    keyed by email."""
+
+    def __init__(
+        self,
+        session_scope: Callable[
+            [], AsyncContextManager[AsyncSession]
+        ] = get_async_db_session,
+        ttl: float = 60.0,
+        negative_ttl: float = 10.0,
+        max_entries: int = 10000,
+    ):
+        self.session_scope = session_scope
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        # key -> (expires_at, value); value None is a cached miss
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped by invalidate so loads that started earlier are not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get_by_slug(self, slug: str) -> Optional[ResolvedTenant]:
+        return await self._resolve(("slug", slug), self._load_by_slug, slug)
+
+    async def get_by_id(self, tenant_id: uuid.UUID) -> Optional[ResolvedTenant]:
+        return await self._resolve(("id", tenant_id), self._load_by_id, tenant_id)
+
+    async def get_tenant_id_for_user(self, email: str) -> Optional[uuid.UUID]:
+        return await self._resolve(("user", email), self._load_user_tenant_id, email)
+
+    def invalidate(
+        self, tenant_id: Optional[uuid.UUID] = None, slug: Optional[str] = None
+    ):
+        """Drop cached entries for a tenant (by id, slug, or both)."""
+        self._generation += 1
+        cached = self._entries.get(("id", tenant_id)) if tenant_id else None
+        if cached is not None and cached[1] is not None:
+            slug = slug or cached[1].slug
+        if tenant_id is not None:
+            self._entries.pop(("id", tenant_id), None)
+        if slug is not None:
+            self._entries.pop(("slug", slug), None)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+    def _get_cached(self, key: Hashable) -> Tuple[bool, Any]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return False, None
+        expires_at, value = cached
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def _put(self, key: Hashable, value: Any):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _resolve(self, key: Hashable, loader: Callable, arg: Any) -> Any:
+        found, value = self._get_cached(key)
+        if found:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only the request that started the load went away (e.g. the
+                # client disconnected); this one still needs the answer
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self._resolve(key, loader, arg)
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader(arg)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not reported
+            future.exception()
+            raise
+        else:
+            if generation == self._generation:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any):
+        self._put(key, value)
+        # A tenant found by slug also answers lookups by id, and vice versa
+        if isinstance(value, ResolvedTenant):
+            self._put(("id", value.id), value)
+            self._put(("slug", value.slug), value)
+
+    async def _load_by_slug(self, slug: str) -> Optional[ResolvedTenant]:
+        async with self.session_scope() as db:
+            result = await db.execute(select(Tenant).where(Tenant.slug == slug))
+            tenant = result.scalars().first()
+            return ResolvedTenant.from_model(tenant) if tenant else None
+
+    async def _load_by_id(self, tenant_id: uuid.UUID) -> Optional[ResolvedTenant]:
+        async with self.session_scope() as db:
+            tenant = await db.get(Tenant, tenant_id)
+            return ResolvedTenant.from_model(tenant) if tenant else None
+
+    async def _load_user_tenant_id(self, email: str) -> Optional[uuid.UUID]:
+        async with self.session_scope() as db:
+            result = await db.execute(
+                select(User.tenant_id).where(User.email == email).limit(1)
+            )
+            return result.scalars().first()
+
+
+tenant_resolver = TenantResolver()
@@ -6,6 +6,7 @@ from uuid import UUID
 from app.models.tenant import SSOConfiguration, Tenant, TenantStatus
 from app.models.user import User
 from app.services.audit_service import AuditService
+from app.services.tenant_resolver import tenant_resolver
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -133,6 +134,7 @@ class TenantService:
 
         self.db.commit()
         self.db.refresh(tenant)
+        tenant_resolver.invalidate(tenant.id, tenant.slug)
 
         # Log tenant update
         new_values = {
@@ -381,6 +383,7 @@ class TenantService:
         # Soft delete by setting status to inactive
         tenant.status = TenantStatus.INACTIVE
         self.db.commit()
+        tenant_resolver.invalidate(tenant.id, tenant.slug)
 
         # Log tenant deletion
         self.audit_service.log_system_event(
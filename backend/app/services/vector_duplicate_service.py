@@ -1,18 +1,40 @@
 """Vector Duplicate Service - Real-time similarity detection using vector embeddings."""
 
+import asyncio
 import hashlib
 import logging
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
 import numpy as np
 from app.models.auterity_expansion import VectorEmbedding
-from app.services.ai_service import AIService
+from app.services.embedding_index import (
+    EmbeddingMatrixIndex,
+    IndexedEmbedding,
+    approximate_similar_pairs,
+    connected_components,
+    get_embedding_index_registry,
+    leader_clusters,
+    leader_clusters_from_pairs,
+    mean_pairwise_similarity,
+    similar_pairs,
+    stack_normalized,
+)
+from app.services.vector_service import EMBEDDING_DIMENSIONS, get_vector_service
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Above this many embeddings, clustering and duplicate analysis default to
+# LSH candidate generation instead of the exact blocked pass
+APPROXIMATE_SIMILARITY_MIN_ITEMS = 20000
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+
+# Items written per transaction and contents per encoder batch
+EMBEDDING_WRITE_BATCH_SIZE = 100
+EMBEDDING_ENCODE_BATCH_SIZE = 64
+
 
 class SimilarityResult:
     """Container for similarity search results."""
@@ -37,8 +59,7 @@ class VectorDuplicateService:
 
     def __init__(self, db: Session):
         self.db = db
-        self.ai_service = AIService()
-        self._embedding_cache: Dict[str, List[float]] = {}
+        self.indexes = get_embedding_index_registry()
 
     async def find_similar_items(
         self,
@@ -51,56 +72,23 @@ class VectorDuplicateService:
         """Find similar items using vector similarity search."""
         try:
             # Generate embedding for input content
-            input_embedding = await self._generate_embedding(content)
+            input_embedding = await self._embed_content(content)
             if not input_embedding:
                 return []
 
-            # Get existing embeddings for the tenant and item type
-            existing_embeddings = (
-                self.db.query(VectorEmbedding)
-                .filter(
-                    and_(
-                        VectorEmbedding.tenant_id == tenant_id,
-                        VectorEmbedding.item_type == item_type,
-                    )
-                )
-                .all()
-            )
+            # Score every stored embedding with one matrix-vector product
+            index = self._get_index(tenant_id, item_type)
+            matches = index.search(input_embedding, limit=limit, threshold=threshold)
 
-            if not existing_embeddings:
-                return []
-
-            # Calculate similarities
-            similarities = []
-            for embedding in existing_embeddings:
-                similarity = self._calculate_cosine_similarity(
-                    input_embedding, embedding.embedding_vector
-                )
-
-                if similarity >= threshold:
-                    similarities.append(
-                        {"embedding": embedding, "similarity_score": similarity}
-                    )
-
-            # Sort by similarity and limit results
-            similarities.sort(key=lambda x: x["similarity_score"], reverse=True)
-            similarities = similarities[:limit]
-
-            # Convert to SimilarityResult objects
             results = []
-            for item in similarities:
-                embedding = item["embedding"]
-                similarity_score = item["similarity_score"]
-
-                # Get content preview from metadata or generate one
-                content_preview = self._get_content_preview(embedding, content)
-
+            for match in matches:
+                record = match.record
                 result = SimilarityResult(
-                    item_id=embedding.item_id,
-                    item_type=embedding.item_type,
-                    similarity_score=similarity_score,
-                    content_preview=content_preview,
-                    metadata=embedding.metadata,
+                    item_id=record.item_id,
+                    item_type=record.item_type,
+                    similarity_score=match.similarity_score,
+                    content_preview=self._get_content_preview(record.metadata, content),
+                    metadata=record.metadata,
                 )
                 results.append(result)
 
@@ -121,7 +109,7 @@ class VectorDuplicateService:
         """Create a new vector embedding."""
         try:
             # Generate embedding for content
-            embedding_vector = await self._generate_embedding(content)
+            embedding_vector = await self._embed_content(content)
             if not embedding_vector:
                 return None
 
@@ -147,6 +135,7 @@ class VectorDuplicateService:
                 existing.embedding_vector = embedding_vector
                 existing.metadata = metadata or existing.metadata
                 self.db.commit()
+                self._index_embedding(existing)
                 return existing
 
             # Create new embedding
@@ -162,6 +151,7 @@ class VectorDuplicateService:
             self.db.add(embedding)
             self.db.commit()
             self.db.refresh(embedding)
+            self._index_embedding(embedding)
 
             return embedding
 
@@ -194,7 +184,7 @@ class VectorDuplicateService:
                 return None
 
             # Generate new embedding
-            new_embedding_vector = await self._generate_embedding(content)
+            new_embedding_vector = await self._embed_content(content)
             if not new_embedding_vector:
                 return None
 
@@ -206,6 +196,7 @@ class VectorDuplicateService:
 
             self.db.commit()
             self.db.refresh(embedding)
+            self._index_embedding(embedding)
 
             return embedding
 
@@ -234,6 +225,10 @@ class VectorDuplicateService:
             self.db.delete(embedding)
             self.db.commit()
 
+            index = self.indexes.get(embedding.tenant_id, embedding.item_type)
+            if index is not None:
+                index.remove(embedding.id)
+
             return True
 
         except Exception as e:
@@ -242,29 +237,115 @@ class VectorDuplicateService:
             return False
 
     async def batch_create_embeddings(
-        self, tenant_id: UUID, items: List[Dict[str, Any]]
+        self,
+        tenant_id: UUID,
+        items: List[Dict[str, Any]],
+        batch_size: int = EMBEDDING_WRITE_BATCH_SIZE,
+        encode_batch_size: int = EMBEDDING_ENCODE_BATCH_SIZE,
     ) -> List[VectorEmbedding]:
-        """Create multiple embeddings in batch."""
-        try:
-            created_embeddings = []
+        """Create multiple embeddings in batch.
+
+        Items are processed ``batch_size`` at a time: contents are
+        deduplicated by SHA-256, hashes the tenant has already embedded reuse
+        the stored vector, only the misses are encoded, and each batch is
+        written with one query and one commit.
+        """
+        created_embeddings = []
+
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            try:
+                created_embeddings.extend(
+                    await self._create_embedding_batch(
+                        tenant_id, batch, encode_batch_size
+                    )
+                )
+            except Exception as e:
+                logger.error(
+                    f"Batch embedding creation failed for items "
+                    f"{start}-{start + len(batch) - 1}: {str(e)}"
+                )
+                self.db.rollback()
 
-            for item in items:
-                embedding = await self.create_embedding(
+        return created_embeddings
+
+    async def _create_embedding_batch(
+        self, tenant_id: UUID, items: List[Dict[str, Any]], encode_batch_size: int
+    ) -> List[VectorEmbedding]:
+        """Embed and persist one batch of items in a single transaction."""
+        hashes = [
+            hashlib.sha256(item["content"].encode()).hexdigest() for item in items
+        ]
+
+        # Rows already stored for these hashes supply their vectors
+        stored = (
+            self.db.query(VectorEmbedding)
+            .filter(
+                and_(
+                    VectorEmbedding.tenant_id == tenant_id,
+                    VectorEmbedding.content_hash.in_(set(hashes)),
+                )
+            )
+            .all()
+        )
+        existing = {}
+        vectors = {}
+        for row in stored:
+            vectors.setdefault(row.content_hash, row.embedding_vector)
+            existing[(row.item_type, row.item_id, row.content_hash)] = row
+
+        # Encode each distinct content not stored yet once
+        misses = {}
+        for item, content_hash in zip(items, hashes):
+            if content_hash not in vectors:
+                misses.setdefault(content_hash, item["content"])
+        if misses:
+            encoded = await self._generate_embeddings(
+                list(misses.values()), encode_batch_size
+            )
+            vectors.update(zip(misses, encoded))
+
+        embeddings = []
+        new_embeddings = []
+        for item, content_hash in zip(items, hashes):
+            vector = vectors.get(content_hash)
+            if not vector:
+                continue
+
+            row = existing.get((item["item_type"], item["item_id"], content_hash))
+            if row is not None:
+                row.embedding_vector = vector
+                row.embedding_metadata = item.get("metadata") or row.embedding_metadata
+            else:
+                row = VectorEmbedding(
+                    id=uuid4(),
                     tenant_id=tenant_id,
                     item_type=item["item_type"],
                     item_id=item["item_id"],
-                    content=item["content"],
-                    metadata=item.get("metadata"),
+                    content_hash=content_hash,
+                    embedding_vector=vector,
+                    embedding_metadata=item.get("metadata") or {},
                 )
+                new_embeddings.append(row)
+                existing[(row.item_type, row.item_id, content_hash)] = row
+            embeddings.append(row)
 
-                if embedding:
-                    created_embeddings.append(embedding)
+        # Capture index rows now; committing expires the ORM attributes
+        indexed = [
+            (embedding.item_type, *self._to_indexed(embedding))
+            for embedding in embeddings
+        ]
 
-            return created_embeddings
+        # add_all + one flush emits a multi-row INSERT for the new rows
+        self.db.add_all(new_embeddings)
+        self.db.commit()
 
-        except Exception as e:
-            logger.error(f"Batch embedding creation failed: {str(e)}")
-            return []
+        for item_type, record, vector in indexed:
+            index = self.indexes.get(tenant_id, item_type)
+            if index is not None:
+                index.upsert(record, vector)
+
+        return embeddings
 
     async def get_similarity_clusters(
         self,
@@ -272,66 +353,56 @@ class VectorDuplicateService:
         item_type: str,
         min_similarity: float = 0.7,
         min_cluster_size: int = 2,
+        method: str = "leader",
+        approximate: Optional[bool] = None,
     ) -> List[Dict[str, Any]]:
-        """Get clusters of similar items."""
+        """Get clusters of similar items.
+
+        ``method`` is "leader" (each unassigned item claims everything similar
+        to it) or "connected" (transitively linked items share a cluster).
+        ``approximate`` uses LSH candidate pairs; by default it is enabled only
+        for large sets.
+        """
         try:
-            embeddings = (
-                self.db.query(VectorEmbedding)
-                .filter(
-                    and_(
-                        VectorEmbedding.tenant_id == tenant_id,
-                        VectorEmbedding.item_type == item_type,
-                    )
-                )
-                .all()
-            )
+            index = self._get_index(tenant_id, item_type)
+            records = list(index.records)
+            vectors = index.vectors.copy()
 
-            if len(embeddings) < min_cluster_size:
+            if len(records) < min_cluster_size:
                 return []
 
-            # Simple clustering using similarity threshold
-            clusters = []
-            processed = set()
-
-            for i, embedding in enumerate(embeddings):
-                if embedding.id in processed:
-                    continue
+            if approximate is None:
+                approximate = len(records) > APPROXIMATE_SIMILARITY_MIN_ITEMS
 
-                cluster = [embedding]
-                processed.add(embedding.id)
-
-                # Find similar embeddings
-                for j, other_embedding in enumerate(embeddings):
-                    if i == j or other_embedding.id in processed:
-                        continue
-
-                    similarity = self._calculate_cosine_similarity(
-                        embedding.embedding_vector, other_embedding.embedding_vector
-                    )
-
-                    if similarity >= min_similarity:
-                        cluster.append(other_embedding)
-                        processed.add(other_embedding.id)
+            # The similarity pass is CPU bound; keep it off the event loop
+            groups = await asyncio.to_thread(
+                self._cluster_vectors, vectors, min_similarity, method, approximate
+            )
 
+            clusters = []
+            for group in groups:
                 # Only include clusters that meet minimum size
-                if len(cluster) >= min_cluster_size:
-                    clusters.append(
-                        {
-                            "cluster_id": len(clusters),
-                            "size": len(cluster),
-                            "items": [
-                                {
-                                    "id": item.item_id,
-                                    "content_hash": item.content_hash,
-                                    "metadata": item.metadata,
-                                }
-                                for item in cluster
-                            ],
-                            "representative_content": self._get_cluster_representative(
-                                cluster
-                            ),
-                        }
-                    )
+                if len(group) < min_cluster_size:
+                    continue
+
+                cluster = [records[row] for row in group]
+                clusters.append(
+                    {
+                        "cluster_id": len(clusters),
+                        "size": len(cluster),
+                        "items": [
+                            {
+                                "id": item.item_id,
+                                "content_hash": item.content_hash,
+                                "metadata": item.metadata,
+                            }
+                            for item in cluster
+                        ],
+                        "representative_content": self._get_cluster_representative(
+                            cluster
+                        ),
+                    }
+                )
 
             return clusters
 
@@ -340,7 +411,11 @@ class VectorDuplicateService:
             return []
 
     async def get_duplicate_analysis(
-        self, tenant_id: UUID, item_type: str, days: int = 30
+        self,
+        tenant_id: UUID,
+        item_type: str,
+        days: int = 30,
+        approximate: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """Get duplicate analysis metrics."""
         try:
@@ -349,8 +424,8 @@ class VectorDuplicateService:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
 
             # Get embeddings created in the time period
-            recent_embeddings = (
-                self.db.query(VectorEmbedding)
+            recent_vectors = (
+                self.db.query(VectorEmbedding.embedding_vector)
                 .filter(
                     and_(
                         VectorEmbedding.tenant_id == tenant_id,
@@ -361,7 +436,7 @@ class VectorDuplicateService:
                 .all()
             )
 
-            if not recent_embeddings:
+            if not recent_vectors:
                 return {
                     "total_items": 0,
                     "potential_duplicates": 0,
@@ -369,40 +444,26 @@ class VectorDuplicateService:
                     "avg_similarity": 0.0,
                 }
 
-            # Analyze for potential duplicates
-            potential_duplicates = 0
-            total_similarities = 0.0
-            similarity_count = 0
-
-            for i, embedding in enumerate(recent_embeddings):
-                for j, other_embedding in enumerate(recent_embeddings):
-                    if i >= j:
-                        continue
+            vectors, _ = stack_normalized([row[0] for row in recent_vectors])
+            if approximate is None:
+                approximate = len(vectors) > APPROXIMATE_SIMILARITY_MIN_ITEMS
 
-                    similarity = self._calculate_cosine_similarity(
-                        embedding.embedding_vector, other_embedding.embedding_vector
-                    )
-
-                    if similarity >= 0.8:  # High similarity threshold
-                        potential_duplicates += 1
-
-                    total_similarities += similarity
-                    similarity_count += 1
-
-            avg_similarity = (
-                total_similarities / similarity_count if similarity_count > 0 else 0.0
+            potential_duplicates, avg_similarity = await asyncio.to_thread(
+                self._analyze_duplicates, vectors, approximate
             )
+
             duplicate_percentage = (
-                (potential_duplicates / len(recent_embeddings)) * 100
-                if recent_embeddings
+                (potential_duplicates / len(recent_vectors)) * 100
+                if recent_vectors
                 else 0.0
             )
 
             return {
-                "total_items": len(recent_embeddings),
+                "total_items": len(recent_vectors),
                 "potential_duplicates": potential_duplicates,
                 "duplicate_percentage": round(duplicate_percentage, 2),
                 "avg_similarity": round(avg_similarity, 3),
+                "approximate": approximate,
             }
 
         except Exception as e:
@@ -414,24 +475,55 @@ class VectorDuplicateService:
                 "avg_similarity": 0.0,
             }
 
-    async def _generate_embedding(self, content: str) -> Optional[List[float]]:
-        """Generate vector embedding for content using AI service."""
+    def _cluster_vectors(
+        self,
+        vectors: np.ndarray,
+        min_similarity: float,
+        method: str,
+        approximate: bool,
+    ) -> List[List[int]]:
+        """Group row positions of ``vectors`` into clusters."""
+        if method not in ("leader", "connected"):
+            raise ValueError(f"Unknown clustering method: {method}")
+
+        if method == "leader" and not approximate:
+            return leader_clusters(vectors, min_similarity)
+
+        find_pairs = approximate_similar_pairs if approximate else similar_pairs
+        left, right, _ = find_pairs(vectors, min_similarity)
+
+        if method == "leader":
+            return leader_clusters_from_pairs(len(vectors), left, right)
+        return connected_components(len(vectors), left, right)
+
+    def _analyze_duplicates(
+        self, vectors: np.ndarray, approximate: bool
+    ) -> Tuple[int, float]:
+        """Count near-duplicate pairs and the mean pairwise similarity."""
+        find_pairs = approximate_similar_pairs if approximate else similar_pairs
+        left, _, _ = find_pairs(vectors, DUPLICATE_SIMILARITY_THRESHOLD)
+        return int(len(left)), mean_pairwise_similarity(vectors)
+
+    async def _embed_content(self, content: str) -> List[float]:
+        """Embed one content, reusing the vector for content seen recently."""
+        return (await self._generate_embeddings([content]))[0]
+
+    async def _generate_embeddings(
+        self, contents: List[str], batch_size: int = EMBEDDING_ENCODE_BATCH_SIZE
+    ) -> List[List[float]]:
+        """Embed many contents with one batched encode.
+
+        Goes through the shared vector service, whose bounded LRU cache
+        serves repeated and recently embedded contents. Falls back to hash
+        embeddings if the encoder is unavailable.
+        """
         try:
-            # Use AI service to generate embeddings
-            embedding = await self.ai_service.generate_embedding(
-                text=content, model="text-embedding-ada-002"
+            return await asyncio.to_thread(
+                get_vector_service().embed_texts, contents, batch_size
             )
-
-            if embedding and isinstance(embedding, list):
-                return embedding
-
-            # Fallback: generate simple hash-based embedding
-            return self._generate_hash_embedding(content)
-
         except Exception as e:
-            logger.error(f"Failed to generate AI embedding: {str(e)}")
-            # Fallback to hash-based embedding
-            return self._generate_hash_embedding(content)
+            logger.error(f"Failed to generate embeddings: {str(e)}")
+            return [self._generate_hash_embedding(content) for content in contents]
 
     def _generate_hash_embedding(self, content: str) -> List[float]:
         """Generate a simple hash-based embedding as fallback."""
@@ -448,8 +540,8 @@ class VectorDuplicateService:
             float_val = int(hex_pair, 16) / 255.0  # Normalize to 0-1
             embedding.append(float_val)
 
-        # Pad or truncate to standard embedding size (1536 for OpenAI)
-        target_size = 1536
+        # Pad or truncate to the encoder's size so vectors stay comparable
+        target_size = EMBEDDING_DIMENSIONS
         if len(embedding) < target_size:
             # Pad with zeros
             embedding.extend([0.0] * (target_size - len(embedding)))
@@ -459,41 +551,75 @@ class VectorDuplicateService:
 
         return embedding
 
-    def _calculate_cosine_similarity(
-        self, vec1: List[float], vec2: List[float]
-    ) -> float:
-        """Calculate cosine similarity between two vectors."""
-        try:
-            if len(vec1) != len(vec2):
-                return 0.0
-
-            # Convert to numpy arrays for efficient computation
-            v1 = np.array(vec1)
-            v2 = np.array(vec2)
-
-            # Calculate cosine similarity
-            dot_product = np.dot(v1, v2)
-            norm_v1 = np.linalg.norm(v1)
-            norm_v2 = np.linalg.norm(v2)
-
-            if norm_v1 == 0 or norm_v2 == 0:
-                return 0.0
-
-            similarity = dot_product / (norm_v1 * norm_v2)
-            return float(similarity)
-
-        except Exception as e:
-            logger.error(f"Cosine similarity calculation failed: {str(e)}")
-            return 0.0
+    def _get_index(self, tenant_id: UUID, item_type: str) -> EmbeddingMatrixIndex:
+        """Get the similarity index for a tenant/item type, loading it if needed."""
+        index = self.indexes.get(tenant_id, item_type)
+        if index is not None:
+            return index
+
+        rows = (
+            self.db.query(
+                VectorEmbedding.id,
+                VectorEmbedding.item_id,
+                VectorEmbedding.item_type,
+                VectorEmbedding.content_hash,
+                VectorEmbedding.embedding_vector,
+                VectorEmbedding.embedding_metadata,
+            )
+            .filter(
+                and_(
+                    VectorEmbedding.tenant_id == tenant_id,
+                    VectorEmbedding.item_type == item_type,
+                )
+            )
+            .all()
+        )
+
+        index = EmbeddingMatrixIndex()
+        index.bulk_load(
+            [
+                IndexedEmbedding(
+                    embedding_id=row.id,
+                    item_id=row.item_id,
+                    item_type=row.item_type,
+                    content_hash=row.content_hash,
+                    metadata=row.embedding_metadata or {},
+                )
+                for row in rows
+            ],
+            [row.embedding_vector for row in rows],
+        )
+        self.indexes.put(tenant_id, item_type, index)
+        return index
+
+    def _index_embedding(self, embedding: VectorEmbedding):
+        """Apply a committed write to the loaded index, if any."""
+        index = self.indexes.get(embedding.tenant_id, embedding.item_type)
+        if index is None:
+            return
+
+        index.upsert(*self._to_indexed(embedding))
+
+    def _to_indexed(
+        self, embedding: VectorEmbedding
+    ) -> Tuple[IndexedEmbedding, List[float]]:
+        record = IndexedEmbedding(
+            embedding_id=embedding.id,
+            item_id=embedding.item_id,
+            item_type=embedding.item_type,
+            content_hash=embedding.content_hash,
+            metadata=embedding.embedding_metadata or {},
+        )
+        return record, embedding.embedding_vector
 
     def _get_content_preview(
-        self, embedding: VectorEmbedding, original_content: str
+        self, metadata: Optional[Dict[str, Any]], original_content: str
     ) -> str:
         """Get content preview for similarity result."""
         try:
             # Try to get preview from metadata
-            if embedding.metadata and "content_preview" in embedding.metadata:
-                return embedding.metadata["content_preview"]
+            if metadata and "content_preview" in metadata:
+                return metadata["content_preview"]
 
             # Generate preview from original content
             if len(original_content) <= 100:
@@ -505,7 +631,7 @@ class VectorDuplicateService:
             logger.error(f"Failed to get content preview: {str(e)}")
             return "Content preview unavailable"
 
-    def _get_cluster_representative(self, cluster: List[VectorEmbedding]) -> str:
+    def _get_cluster_representative(self, cluster: List[IndexedEmbedding]) -> str:
         """Get representative content for a cluster."""
         try:
             if not cluster:
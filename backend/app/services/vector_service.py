@@ -1,14 +1,39 @@
 """Qdrant vector database service."""
 
+import hashlib
+import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    SearchRequest,
+    VectorParams,
+)
 from sentence_transformers import SentenceTransformer
 
 from ..config.settings import get_settings
 
+# Size of the vectors produced by the encoder
+EMBEDDING_DIMENSIONS = 384
+
+# Distinct texts whose embeddings are kept in memory
+EMBEDDING_CACHE_SIZE = 10000
+
+# Points sent per upsert request by store_vectors_batch
+UPSERT_BATCH_SIZE = 256
+
+# Payload fields indexed on new collections so filters on them stay cheap
+INDEXED_PAYLOAD_FIELDS = ("tenant_id", "workflow_id")
+
 
 class VectorService:
     """Qdrant vector database service."""
@@ -21,26 +46,100 @@ class VectorService:
 
         self.client = QdrantClient(host=self.host, port=self.port)
         self.encoder = SentenceTransformer("all-MiniLM-L6-v2")  # Lightweight model
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        # embed_texts may run in several worker threads at once
+        self._cache_lock = threading.Lock()
+        self._known_collections: Set[str] = set()
 
         # Default collection for workflow contexts
         self.default_collection = "workflow_contexts"
         self._ensure_collection(self.default_collection)
 
     def _ensure_collection(self, collection_name: str):
-        """Ensure collection exists."""
+        """Ensure collection exists.
+
+        Collections seen once are remembered, so only the first write to a
+        collection costs a ``get_collections`` round trip.
+        """
+        if collection_name in self._known_collections:
+            return
+
         try:
             collections = self.client.get_collections().collections
-            if not any(c.name == collection_name for c in collections):
+            self._known_collections.update(c.name for c in collections)
+            if collection_name not in self._known_collections:
                 self.client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(size=384, distance=Distance.COSINE),
+                    vectors_config=VectorParams(
+                        size=EMBEDDING_DIMENSIONS, distance=Distance.COSINE
+                    ),
                 )
+                for field_name in INDEXED_PAYLOAD_FIELDS:
+                    self.client.create_payload_index(
+                        collection_name=collection_name,
+                        field_name=field_name,
+                        field_schema=PayloadSchemaType.KEYWORD,
+                    )
+                self._known_collections.add(collection_name)
         except Exception:
             pass  # Collection might already exist
 
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Translate ``{"tenant_id": ..., "workflow_id": [...]}`` to a Qdrant filter.
+
+        Scalar values must match exactly; lists match any of their values.
+        """
+        if not filters:
+            return None
+
+        conditions = []
+        for key, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                match = MatchAny(any=[self._payload_value(v) for v in value])
+            else:
+                match = MatchValue(value=self._payload_value(value))
+            conditions.append(FieldCondition(key=key, match=match))
+        return Filter(must=conditions)
+
+    @staticmethod
+    def _payload_value(value: Any) -> Any:
+        # Qdrant matches keywords, integers and booleans; UUIDs etc. as strings
+        return value if isinstance(value, (str, int, bool)) else str(value)
+
     def embed_text(self, text: str) -> List[float]:
         """Generate embeddings for text."""
-        return self.encoder.encode(text).tolist()
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """Generate embeddings for many texts with one batched encode.
+
+        Texts are keyed by SHA-256; repeated texts and texts embedded
+        recently are served from an LRU cache, and only the remaining
+        distinct texts are passed to the encoder.
+        """
+        hashes = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+
+        found: Dict[str, List[float]] = {}
+        misses: Dict[str, str] = {}
+        with self._cache_lock:
+            for text, text_hash in zip(texts, hashes):
+                cached = self._embedding_cache.get(text_hash)
+                if cached is not None:
+                    self._embedding_cache.move_to_end(text_hash)
+                    found[text_hash] = cached
+                else:
+                    misses.setdefault(text_hash, text)
+
+        if misses:
+            encoded = self.encoder.encode(list(misses.values()), batch_size=batch_size)
+            with self._cache_lock:
+                for text_hash, vector in zip(misses, encoded):
+                    vector = vector.tolist()
+                    found[text_hash] = self._embedding_cache[text_hash] = vector
+                while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+
+        return [found[text_hash] for text_hash in hashes]
 
     def store_vector(
         self,
@@ -62,23 +161,110 @@ class VectorService:
         self.client.upsert(collection_name=collection_name, points=[point])
         return point_id
 
+    def store_vectors_batch(
+        self,
+        collection_name: str,
+        items: List[Dict[str, Any]],
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ) -> List[str]:
+        """Store many texts with vector embeddings.
+
+        ``items`` are dicts with ``text`` and optional ``metadata`` and
+        ``point_id``. All texts are embedded with one batched encode and the
+        points are upserted ``batch_size`` at a time. Every chunk but the last
+        is sent without waiting for it to be applied, so the requests are
+        pipelined; the last one waits, and Qdrant applies a collection's
+        updates in order, so all points are stored when this returns.
+        """
+        if not items:
+            return []
+
+        self._ensure_collection(collection_name)
+
+        vectors = self.embed_texts([item["text"] for item in items])
+        points = [
+            PointStruct(
+                id=item.get("point_id") or str(uuid.uuid4()),
+                vector=vector,
+                payload={**item.get("metadata", {}), "text": item["text"]},
+            )
+            for item, vector in zip(items, vectors)
+        ]
+
+        try:
+            for start in range(0, len(points), batch_size):
+                chunk = points[start : start + batch_size]
+                self.client.upsert(
+                    collection_name=collection_name,
+                    points=chunk,
+                    wait=start + batch_size >= len(points),
+                )
+        except Exception:
+            # The collection may have been dropped; check again next time
+            self._known_collections.discard(collection_name)
+            raise
+
+        return [str(point.id) for point in points]
+
     def search_similar(
         self,
         collection_name: str,
         query_text: str,
         limit: int = 5,
         score_threshold: float = 0.7,
+        filters: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        """Search for similar vectors."""
+        """Search for similar vectors.
+
+        ``filters`` restricts matches by payload, e.g. ``{"tenant_id": ...}``,
+        and is evaluated by Qdrant rather than on the returned results.
+        """
         query_vector = self.embed_text(query_text)
 
         results = self.client.search(
             collection_name=collection_name,
             query_vector=query_vector,
+            query_filter=self._build_filter(filters),
             limit=limit,
             score_threshold=score_threshold,
         )
 
+        return self._format_results(results)
+
+    def search_batch(
+        self,
+        collection_name: str,
+        query_texts: List[str],
+        limit: int = 5,
+        score_threshold: float = 0.7,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries with one request.
+
+        Returns one result list per query text, in order. ``filters`` applies
+        to every query, as in ``search_similar``.
+        """
+        if not query_texts:
+            return []
+
+        query_filter = self._build_filter(filters)
+        requests = [
+            SearchRequest(
+                vector=vector,
+                filter=query_filter,
+                limit=limit,
+                score_threshold=score_threshold,
+                with_payload=True,
+            )
+            for vector in self.embed_texts(query_texts)
+        ]
+
+        batch_results = self.client.search_batch(
+            collection_name=collection_name, requests=requests
+        )
+        return [self._format_results(results) for results in batch_results]
+
+    def _format_results(self, results: List[Any]) -> List[Dict[str, Any]]:
         return [
             {
                 "id": result.id,
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from app.database import get_db_session
+from app.database import get_async_db_session
 from app.exceptions import WorkflowExecutionError
 from app.executors.step_executors import (
     AIStepExecutor,
@@ -24,7 +24,8 @@ from app.models.execution import ExecutionLog, ExecutionStatus, WorkflowExecutio
 from app.models.workflow import Workflow
 from app.monitoring.performance import PerformanceMonitor
 from app.types.workflow import RetryConfig, WorkflowEdge, WorkflowNode
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
@@ -94,13 +95,16 @@ class WorkflowEngine:
         execution_id = None
 
         try:
-            with get_db_session() as db:
+            # Progress is committed as the workflow runs, independently of
+            # the transaction of the request that started it
+            async with get_async_db_session(shared=False) as db:
                 # Get workflow definition
-                workflow = (
-                    db.query(Workflow)
-                    .filter(Workflow.id == workflow_id, Workflow.is_active)
-                    .first()
+                result = await db.execute(
+                    select(Workflow).where(
+                        Workflow.id == workflow_id, Workflow.is_active
+                    )
                 )
+                workflow = result.scalars().first()
 
                 if not workflow:
                     raise WorkflowExecutionError(
@@ -114,8 +118,8 @@ class WorkflowEngine:
                     input_data=input_data,
                 )
                 db.add(execution)
-                db.commit()
-                db.refresh(execution)
+                await db.commit()
+                await db.refresh(execution)
                 execution_id = execution.id
 
                 self.logger.info(
@@ -125,7 +129,7 @@ class WorkflowEngine:
 
                 # Update status to running
                 execution.status = ExecutionStatus.RUNNING
-                db.commit()
+                await db.commit()
 
                 # Execute workflow steps
                 output_data = await self._execute_workflow_steps(
@@ -136,7 +140,7 @@ class WorkflowEngine:
                 execution.status = ExecutionStatus.COMPLETED
                 execution.output_data = output_data
                 execution.completed_at = datetime.utcnow()
-                db.commit()
+                await db.commit()
 
                 self.logger.info(
                     f"Workflow execution {execution_id} completed successfully"
@@ -154,17 +158,13 @@ class WorkflowEngine:
             # Update execution status to failed
             if execution_id:
                 try:
-                    with get_db_session() as db:
-                        execution = (
-                            db.query(WorkflowExecution)
-                            .filter(WorkflowExecution.id == execution_id)
-                            .first()
-                        )
+                    async with get_async_db_session(shared=False) as db:
+                        execution = await db.get(WorkflowExecution, execution_id)
                         if execution:
                             execution.status = ExecutionStatus.FAILED
                             execution.error_message = str(e)
                             execution.completed_at = datetime.utcnow()
-                            db.commit()
+                            await db.commit()
                 except Exception as db_error:
                     self.logger.error(f"Failed to update execution status: {db_error}")
 
@@ -186,12 +186,8 @@ class WorkflowEngine:
             Dictionary containing execution status information
         """
         try:
-            with get_db_session() as db:
-                execution = (
-                    db.query(WorkflowExecution)
-                    .filter(WorkflowExecution.id == execution_id)
-                    .first()
-                )
+            async with get_async_db_session() as db:
+                execution = await db.get(WorkflowExecution, execution_id)
 
                 if not execution:
                     return None
@@ -222,12 +218,8 @@ class WorkflowEngine:
             True if cancellation was successful, False otherwise
         """
         try:
-            with get_db_session() as db:
-                execution = (
-                    db.query(WorkflowExecution)
-                    .filter(WorkflowExecution.id == execution_id)
-                    .first()
-                )
+            async with get_async_db_session(shared=False) as db:
+                execution = await db.get(WorkflowExecution, execution_id)
 
                 if not execution:
                     self.logger.warning(
@@ -247,7 +239,7 @@ class WorkflowEngine:
                 execution.status = ExecutionStatus.CANCELLED
                 execution.completed_at = datetime.utcnow()
                 execution.error_message = "Execution cancelled by user"
-                db.commit()
+                await db.commit()
 
                 self.logger.info(f"Execution {execution_id} cancelled successfully")
                 return True
@@ -270,17 +262,18 @@ class WorkflowEngine:
             List of execution log dictionaries
         """
         try:
-            with get_db_session() as db:
+            async with get_async_db_session() as db:
                 query = (
-                    db.query(ExecutionLog)
-                    .filter(ExecutionLog.execution_id == execution_id)
+                    select(ExecutionLog)
+                    .where(ExecutionLog.execution_id == execution_id)
                     .order_by(ExecutionLog.timestamp)
                 )
 
                 if limit:
                     query = query.limit(limit)
 
-                logs = query.all()
+                result = await db.execute(query)
+                logs = result.scalars().all()
 
                 return [
                     {
@@ -302,7 +295,7 @@ class WorkflowEngine:
 
     async def _execute_workflow_steps(
         self,
-        db: Session,
+        db: AsyncSession,
         execution: WorkflowExecution,
         workflow_definition: Dict[str, Any],
         input_data: Dict[str, Any],
@@ -400,7 +393,7 @@ class WorkflowEngine:
 
     async def _execute_step_with_retry(
         self,
-        db: Session,
+        db: AsyncSession,
         execution: WorkflowExecution,
         node: WorkflowNode,
         input_data: Dict[str, Any],
@@ -427,7 +420,7 @@ class WorkflowEngine:
 
     async def _execute_step(
         self,
-        db: Session,
+        db: AsyncSession,
         execution: WorkflowExecution,
         node: WorkflowNode,
         input_data: Dict[str, Any],
@@ -475,7 +468,7 @@ class WorkflowEngine:
                 duration_ms=duration_ms,
             )
             db.add(log_entry)
-            db.commit()
+            await db.commit()
 
             return result.output_data
 
@@ -499,6 +492,6 @@ class WorkflowEngine:
                 error_message=error_message,
             )
             db.add(log_entry)
-            db.commit()
+            await db.commit()
 
             raise WorkflowStepError(f"Step '{step_name}' failed: {error_message}")
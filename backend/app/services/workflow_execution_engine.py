@@ -4,12 +4,16 @@ Handles parallel execution, dependency resolution, and error recovery
 """
 
 import asyncio
+import copy
+import hashlib
+import json
 import logging
-from collections import defaultdict, deque
+import uuid
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from .step_executors.factory import StepExecutorFactory
 
@@ -33,6 +37,7 @@ class ExecutionPlan:
     execution_order: List[List[str]]  # Batches of steps that can run in parallel
     dependencies: Dict[str, List[str]]
     step_configs: Dict[str, Dict[str, Any]]
+    dependents: Dict[str, List[str]] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.now)
 
 
@@ -49,6 +54,36 @@ class ExecutionContext:
     error: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 3
+    run_id: str = ""
+
+
+@dataclass
+class WorkflowRun:
+    """State owned by a single execution of a workflow
+
+    Each call to ``execute_workflow`` gets its own run, so concurrent runs of
+    the same workflow never share step results.
+    """
+
+    run_id: str
+    workflow_id: str
+    status: ExecutionStatus = ExecutionStatus.PENDING
+    completed_steps: Set[str] = field(default_factory=set)
+    step_results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    def to_status(self, active_steps: int = 0) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "workflow_id": self.workflow_id,
+            "status": self.status.value,
+            "completed_steps": list(self.completed_steps),
+            "active_executions": active_steps,
+            "step_results": self.step_results,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
 
 
 class RetryManager:
@@ -96,170 +131,350 @@ class RetryManager:
 class TopologicalExecutor:
     """Handles topological sorting and parallel execution of workflow steps"""
 
-    def __init__(self):
+    def __init__(self, plan_cache_size: int = 128):
         self.factory = StepExecutorFactory()
+        self.plan_cache_size = plan_cache_size
+        self._plan_cache: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
 
     def create_execution_plan(
         self, workflow_definition: Dict[str, Any]
     ) -> ExecutionPlan:
-        """Create execution plan with topological ordering"""
-        steps = workflow_definition.get("steps", {})
+        """Create execution plan with topological ordering
+
+        Plans are cached by a hash of the workflow definition, so repeated
+        executions of an unchanged workflow skip planning entirely.
+        """
+        cache_key = self._definition_hash(workflow_definition)
+        plan = self._plan_cache.get(cache_key)
+        if plan is not None:
+            self._plan_cache.move_to_end(cache_key)
+            return plan
+
+        steps = copy.deepcopy(workflow_definition.get("steps", {}))
         dependencies = self._extract_dependencies(steps)
+        dependents = self._build_dependents(steps, dependencies)
 
         # Perform topological sort
-        execution_order = self._topological_sort(steps.keys(), dependencies)
+        execution_order = self._topological_sort(steps.keys(), dependencies, dependents)
 
-        return ExecutionPlan(
+        plan = ExecutionPlan(
             workflow_id=workflow_definition.get("id", ""),
             execution_order=execution_order,
             dependencies=dependencies,
             step_configs=steps,
+            dependents=dependents,
         )
 
+        if self.plan_cache_size > 0:
+            self._plan_cache[cache_key] = plan
+            if len(self._plan_cache) > self.plan_cache_size:
+                self._plan_cache.popitem(last=False)
+
+        return plan
+
+    def clear_plan_cache(self) -> None:
+        """Drop all cached execution plans"""
+        self._plan_cache.clear()
+
+    def _definition_hash(self, workflow_definition: Dict[str, Any]) -> str:
+        """Stable content hash of a workflow definition"""
+        payload = json.dumps(workflow_definition, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def _extract_dependencies(self, steps: Dict[str, Any]) -> Dict[str, List[str]]:
         """Extract dependencies from step definitions"""
         dependencies = {}
         for step_id, step_config in steps.items():
             deps = step_config.get("depends_on", [])
-            dependencies[step_id] = (
-                deps if isinstance(deps, list) else [deps] if deps else []
-            )
+            deps = deps if isinstance(deps, list) else [deps] if deps else []
+            # Drop duplicate entries while keeping declaration order
+            dependencies[step_id] = list(dict.fromkeys(deps))
         return dependencies
 
+    def _build_dependents(
+        self, steps: Dict[str, Any], dependencies: Dict[str, List[str]]
+    ) -> Dict[str, List[str]]:
+        """Build the reverse adjacency index (step -> steps that depend on it)"""
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+        missing = []
+
+        for step_id, deps in dependencies.items():
+            for dep in deps:
+                if dep not in dependents:
+                    missing.append(f"{step_id} -> {dep}")
+                    continue
+                dependents[dep].append(step_id)
+
+        if missing:
+            raise MissingDependencyError(
+                f"Steps depend on undefined steps: {', '.join(missing)}"
+            )
+
+        return dependents
+
     def _topological_sort(
-        self, steps: Set[str], dependencies: Dict[str, List[str]]
+        self,
+        steps: Iterable[str],
+        dependencies: Dict[str, List[str]],
+        dependents: Dict[str, List[str]],
     ) -> List[List[str]]:
         """Perform topological sort to determine execution order"""
-        # Calculate in-degrees
-        in_degree = defaultdict(int)
-        for step in steps:
-            in_degree[step] = 0
-
-        for step, deps in dependencies.items():
-            for dep in deps:
-                in_degree[step] += 1
+        in_degree = {step: len(dependencies.get(step, [])) for step in steps}
 
         # Find steps with no dependencies
-        queue = deque([step for step in steps if in_degree[step] == 0])
+        current_batch = [step for step, degree in in_degree.items() if degree == 0]
         execution_order = []
+        visited = 0
 
-        while queue:
-            # Process all steps at current level (can run in parallel)
-            current_batch = []
-            batch_size = len(queue)
-
-            for _ in range(batch_size):
-                step = queue.popleft()
-                current_batch.append(step)
+        while current_batch:
+            # All steps at the current level can run in parallel
+            execution_order.append(current_batch)
+            visited += len(current_batch)
 
-                # Reduce in-degree for dependent steps
-                for dependent_step, deps in dependencies.items():
-                    if step in deps:
-                        in_degree[dependent_step] -= 1
-                        if in_degree[dependent_step] == 0:
-                            queue.append(dependent_step)
+            next_batch = []
+            for step in current_batch:
+                for dependent_step in dependents[step]:
+                    in_degree[dependent_step] -= 1
+                    if in_degree[dependent_step] == 0:
+                        next_batch.append(dependent_step)
+            current_batch = next_batch
 
-            execution_order.append(current_batch)
+        if visited < len(in_degree):
+            blocked = {step for step, degree in in_degree.items() if degree > 0}
+            cycle = self._find_cycle(blocked, dependencies)
+            raise CyclicDependencyError(cycle)
 
         return execution_order
 
+    def _find_cycle(
+        self, blocked: Set[str], dependencies: Dict[str, List[str]]
+    ) -> List[str]:
+        """Return one dependency cycle among steps that could not be ordered
+
+        Every blocked step has at least one blocked dependency, so walking
+        blocked dependencies from any blocked step must revisit a step.
+        """
+        step = next(iter(sorted(blocked)))
+        position: Dict[str, int] = {}
+        path: List[str] = []
+
+        while step not in position:
+            position[step] = len(path)
+            path.append(step)
+            step = next(dep for dep in dependencies[step] if dep in blocked)
+
+        return path[position[step] :] + [step]
+
 
 class WorkflowExecutionEngine:
     """Main workflow execution engine"""
 
-    def __init__(self, max_parallel_steps: int = 10):
+    def __init__(self, max_parallel_steps: int = 10, max_recent_runs: int = 100):
         self.active_executions: Dict[str, ExecutionContext] = {}
-        self.completed_steps: Dict[str, Set[str]] = defaultdict(set)
-        self.step_results: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self.active_runs: Dict[str, WorkflowRun] = {}
+        # Finished runs kept for status queries; oldest are dropped first
+        self.recent_runs: "OrderedDict[str, WorkflowRun]" = OrderedDict()
+        self.max_recent_runs = max_recent_runs
         self.retry_manager = RetryManager()
         self.topological_executor = TopologicalExecutor()
         self.max_parallel_steps = max_parallel_steps
         self._semaphore = asyncio.Semaphore(max_parallel_steps)
 
     async def execute_workflow(
-        self, workflow_definition: Dict[str, Any]
+        self, workflow_definition: Dict[str, Any], run_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Execute complete workflow with dependency resolution"""
+        run = WorkflowRun(
+            run_id=run_id or str(uuid.uuid4()),
+            workflow_id=workflow_definition.get("id", ""),
+            status=ExecutionStatus.RUNNING,
+        )
+        self.active_runs[run.run_id] = run
         try:
             # Create execution plan
             plan = self.topological_executor.create_execution_plan(workflow_definition)
             workflow_id = plan.workflow_id
 
-            logger.info(f"Starting workflow execution: {workflow_id}")
-
-            # Execute batches in order
-            for batch_index, batch in enumerate(plan.execution_order):
-                logger.info(
-                    f"Executing batch {batch_index + 1}/{len(plan.execution_order)}: {batch}"
-                )
+            logger.info(
+                f"Starting workflow execution: {workflow_id} (run {run.run_id})"
+            )
 
-                # Execute steps in current batch in parallel
-                batch_results = await self._execute_batch(workflow_id, batch, plan)
+            step_results, timings = await self._execute_ready_queue(run, plan)
 
-                # Check for failures
-                failed_steps = [
-                    step_id
-                    for step_id, (status, _) in batch_results.items()
-                    if status == ExecutionStatus.FAILED
-                ]
+            failed_steps = [
+                step_id
+                for step_id, (status, _) in step_results.items()
+                if status == ExecutionStatus.FAILED
+            ]
 
-                if failed_steps:
-                    logger.error(
-                        f"Batch {batch_index + 1} failed. Failed steps: {failed_steps}"
-                    )
-                    return {"status": "failed", "failed_steps": failed_steps}
+            if failed_steps:
+                logger.error(
+                    f"Workflow {workflow_id} failed. Failed steps: {failed_steps}"
+                )
+                run.status = ExecutionStatus.FAILED
+                return {
+                    "status": "failed",
+                    "run_id": run.run_id,
+                    "failed_steps": failed_steps,
+                }
 
             logger.info(f"Workflow {workflow_id} completed successfully")
+            run.status = ExecutionStatus.COMPLETED
             return {
                 "status": "completed",
-                "results": self.step_results[workflow_id],
-                "execution_time": (datetime.now() - plan.created_at).total_seconds(),
+                "run_id": run.run_id,
+                "results": run.step_results,
+                "execution_time": (datetime.now() - run.started_at).total_seconds(),
+                "critical_path": self._compute_critical_path(plan, timings),
             }
 
         except Exception as e:
             logger.error(f"Workflow execution failed: {str(e)}")
-            return {"status": "error", "error": str(e)}
-
-    async def _execute_batch(
-        self, workflow_id: str, batch: List[str], plan: ExecutionPlan
-    ) -> Dict[str, Tuple[ExecutionStatus, Dict[str, Any]]]:
-        """Execute a batch of steps in parallel"""
-        tasks = []
-
-        for step_id in batch:
-            step_config = plan.step_configs[step_id]
-            context = ExecutionContext(
-                workflow_id=workflow_id,
-                step_id=step_id,
-                step_type=step_config.get("type", "process"),
-                input_data=self._prepare_step_input(
-                    workflow_id, step_id, step_config, plan.dependencies
-                ),
-                start_time=datetime.now(),
-                status=ExecutionStatus.PENDING,
-                dependencies=plan.dependencies.get(step_id, []),
-                max_retries=step_config.get("max_retries", 3),
+            run.status = ExecutionStatus.FAILED
+            return {"status": "error", "run_id": run.run_id, "error": str(e)}
+
+        finally:
+            self._finish_run(run)
+
+    def _finish_run(self, run: WorkflowRun) -> None:
+        """Release a finished run, keeping it only in the bounded recent-run LRU"""
+        run.finished_at = datetime.now()
+        self.active_runs.pop(run.run_id, None)
+
+        if self.max_recent_runs <= 0:
+            return
+
+        self.recent_runs[run.run_id] = run
+        self.recent_runs.move_to_end(run.run_id)
+        while len(self.recent_runs) > self.max_recent_runs:
+            self.recent_runs.popitem(last=False)
+
+    async def _execute_ready_queue(
+        self, run: WorkflowRun, plan: ExecutionPlan
+    ) -> Tuple[
+        Dict[str, Tuple[ExecutionStatus, Dict[str, Any]]],
+        Dict[str, Tuple[datetime, datetime]],
+    ]:
+        """Launch each step as soon as all of its dependencies have completed.
+
+        Unlike level-by-level batching, a slow step only delays the steps that
+        actually depend on it. At most ``max_parallel_steps`` steps of this
+        workflow are in flight at once; after the first failure no new steps
+        are launched and the in-flight ones are allowed to finish.
+        """
+        dependents = plan.dependents
+        pending_deps = {
+            step_id: len(plan.dependencies.get(step_id, []))
+            for step_id in plan.step_configs
+        }
+
+        ready = deque(step_id for step_id, count in pending_deps.items() if count == 0)
+        running: Dict[asyncio.Task, ExecutionContext] = {}
+        results: Dict[str, Tuple[ExecutionStatus, Dict[str, Any]]] = {}
+        started: Dict[str, datetime] = {}
+        timings: Dict[str, Tuple[datetime, datetime]] = {}
+        failed = False
+
+        while ready or running:
+            while ready and not failed and len(running) < self.max_parallel_steps:
+                step_id = ready.popleft()
+                context = self._create_step_context(run, step_id, plan)
+                started[step_id] = datetime.now()
+                self.active_executions[f"{run.run_id}:{step_id}"] = context
+                task = asyncio.create_task(self._execute_step_with_semaphore(context))
+                running[task] = context
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(
+                running.keys(), return_when=asyncio.FIRST_COMPLETED
             )
 
-            task = asyncio.create_task(self._execute_step_with_semaphore(context))
-            tasks.append((step_id, task))
+            for task in done:
+                context = running.pop(task)
+                step_id = context.step_id
+                self.active_executions.pop(f"{run.run_id}:{step_id}", None)
+                timings[step_id] = (started[step_id], datetime.now())
+
+                try:
+                    status, result = task.result()
+                except Exception as e:
+                    logger.error(f"Task for step {step_id} failed: {str(e)}")
+                    status, result = ExecutionStatus.FAILED, {"error": str(e)}
 
-        # Wait for all tasks to complete
-        results = {}
-        for step_id, task in tasks:
-            try:
-                status, result = await task
                 results[step_id] = (status, result)
 
-                if status == ExecutionStatus.COMPLETED:
-                    self.completed_steps[workflow_id].add(step_id)
-                    self.step_results[workflow_id][step_id] = result
+                if status != ExecutionStatus.COMPLETED:
+                    failed = True
+                    continue
+
+                run.completed_steps.add(step_id)
+                run.step_results[step_id] = result
+
+                for dependent in dependents.get(step_id, []):
+                    pending_deps[dependent] -= 1
+                    if pending_deps[dependent] == 0:
+                        ready.append(dependent)
+
+        return results, timings
+
+    def _create_step_context(
+        self, run: WorkflowRun, step_id: str, plan: ExecutionPlan
+    ) -> ExecutionContext:
+        """Build the execution context for a step whose dependencies are done"""
+        step_config = plan.step_configs[step_id]
+        return ExecutionContext(
+            workflow_id=run.workflow_id,
+            step_id=step_id,
+            step_type=step_config.get("type", "process"),
+            input_data=self._prepare_step_input(
+                run, step_id, step_config, plan.dependencies
+            ),
+            start_time=datetime.now(),
+            status=ExecutionStatus.PENDING,
+            dependencies=plan.dependencies.get(step_id, []),
+            max_retries=step_config.get("max_retries", 3),
+            run_id=run.run_id,
+        )
 
-            except Exception as e:
-                logger.error(f"Task for step {step_id} failed: {str(e)}")
-                results[step_id] = (ExecutionStatus.FAILED, {"error": str(e)})
+    def _compute_critical_path(
+        self, plan: ExecutionPlan, timings: Dict[str, Tuple[datetime, datetime]]
+    ) -> Dict[str, Any]:
+        """Find the dependency chain with the largest total step duration"""
+        durations = {
+            step_id: (finished - started).total_seconds()
+            for step_id, (started, finished) in timings.items()
+        }
 
-        return results
+        path_cost: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for batch in plan.execution_order:
+            for step_id in batch:
+                best_dep, best_cost = None, 0.0
+                for dep in plan.dependencies.get(step_id, []):
+                    if dep in path_cost and (
+                        best_dep is None or path_cost[dep] > best_cost
+                    ):
+                        best_dep, best_cost = dep, path_cost[dep]
+                path_cost[step_id] = best_cost + durations.get(step_id, 0.0)
+                previous[step_id] = best_dep
+
+        if not path_cost:
+            return {"steps": [], "duration": 0.0, "step_durations": {}}
+
+        tail = max(path_cost, key=path_cost.get)
+        path = []
+        while tail is not None:
+            path.append(tail)
+            tail = previous.get(tail)
+        path.reverse()
+
+        return {
+            "steps": path,
+            "duration": path_cost[path[-1]],
+            "step_durations": durations,
+        }
 
     async def _execute_step_with_semaphore(
         self, context: ExecutionContext
@@ -287,6 +502,7 @@ class WorkflowExecutionEngine:
                 # Execute step
                 execution_context = {
                     "workflow_id": context.workflow_id,
+                    "run_id": context.run_id,
                     "step_id": context.step_id,
                     "timestamp": context.start_time.isoformat(),
                     "attempt": attempt + 1,
@@ -325,7 +541,7 @@ class WorkflowExecutionEngine:
 
     def _prepare_step_input(
         self,
-        workflow_id: str,
+        run: WorkflowRun,
         step_id: str,
         step_config: Dict[str, Any],
         dependencies: Dict[str, List[str]],
@@ -338,8 +554,8 @@ class WorkflowExecutionEngine:
         dependency_results = {}
 
         for dep_step in step_dependencies:
-            if dep_step in self.step_results[workflow_id]:
-                dependency_results[dep_step] = self.step_results[workflow_id][dep_step]
+            if dep_step in run.step_results:
+                dependency_results[dep_step] = run.step_results[dep_step]
 
         # Merge dependency data into input data
         if dependency_results:
@@ -377,20 +593,41 @@ class WorkflowExecutionEngine:
 
         return input_data
 
-    def get_execution_status(self, workflow_id: str) -> Dict[str, Any]:
-        """Get current execution status for a workflow"""
-        return {
-            "workflow_id": workflow_id,
-            "completed_steps": list(self.completed_steps.get(workflow_id, set())),
-            "active_executions": len(
-                [
-                    ctx
-                    for ctx in self.active_executions.values()
-                    if ctx.workflow_id == workflow_id
-                ]
-            ),
-            "step_results": self.step_results.get(workflow_id, {}),
-        }
+    def get_execution_status(self, run_id: str) -> Dict[str, Any]:
+        """Get execution status for a run
+
+        A workflow id is also accepted, in which case the most recently started
+        run of that workflow is reported.
+        """
+        run = self._find_run(run_id)
+        if run is None:
+            return {
+                "run_id": None,
+                "workflow_id": run_id,
+                "status": None,
+                "completed_steps": [],
+                "active_executions": 0,
+                "step_results": {},
+            }
+
+        active_steps = sum(
+            1 for ctx in self.active_executions.values() if ctx.run_id == run.run_id
+        )
+        return run.to_status(active_steps)
+
+    def _find_run(self, run_id: str) -> Optional[WorkflowRun]:
+        run = self.active_runs.get(run_id) or self.recent_runs.get(run_id)
+        if run is not None:
+            return run
+
+        candidates = [
+            run
+            for run in list(self.active_runs.values()) + list(self.recent_runs.values())
+            if run.workflow_id == run_id
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda run: run.started_at)
 
 
 class ExecutionError(Exception):
@@ -399,3 +636,15 @@ class ExecutionError(Exception):
 
 class ExecutorNotFoundError(ExecutionError):
     """Raised when no executor is found for a step type"""
+
+
+class MissingDependencyError(ExecutionError):
+    """Raised when a step depends on a step that is not defined"""
+
+
+class CyclicDependencyError(ExecutionError):
+    """Raised when workflow step dependencies form a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle detected: {' -> '.join(cycle)}")
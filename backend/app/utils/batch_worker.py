@@ -0,0 +1,214 @@
+"""Background workers that process queued items in batches.
+
+Used by the services that buffer work in memory and hand it on in
+batches (bulk indexing, Kafka publishing, audit rows, error shipping).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_NOTHING = object()
+
+
+class RetryGate:
+    """Holds off further attempts for ``interval`` seconds after a failure."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._retry_at = 0.0
+
+    def is_open(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def trip(self):
+        self._retry_at = time.monotonic() + self.interval
+
+    def reset(self):
+        self._retry_at = 0.0
+
+
+class BatchWorker(Generic[T]):
+    """Base class for services that queue items and process them in batches.
+
+    Items go on a bounded queue; a background task, started on first use,
+    takes up to ``max_batch_size`` of them at a time and passes them to
+    ``_process_batch``. With ``linger`` the task keeps collecting items for
+    up to ``flush_interval`` seconds after the first one arrives (or until
+    ``flush`` asks for them); otherwise it takes only what is already
+    queued. ``_on_idle`` runs when nothing arrives for ``flush_interval``
+    seconds.
+
+    The queue and task belong to the event loop that started them and are
+    recreated when used from another loop (e.g. between tests).
+    """
+
+    stats: Any
+    # Key for the queue depth in get_stats()
+    depth_stat = "buffered"
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        max_batch_size: int,
+        flush_interval: float,
+        linger: bool = False,
+    ):
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.linger = linger
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._stop_requested: Optional[asyncio.Event] = None
+
+    @property
+    def pending(self) -> int:
+        """Items queued but not yet taken by the worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop_requested is not None and self._stop_requested.is_set()
+
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters plus the current queue depth."""
+        stats = asdict(self.stats)
+        stats[self.depth_stat] = self.pending
+        return stats
+
+    async def flush(self):
+        """Wait until every queued item has been processed."""
+        if self._loop is not asyncio.get_running_loop() or not self.is_running():
+            return
+        # Cut a lingering batch short instead of waiting out flush_interval
+        self._flush_requested.set()
+        try:
+            await self._queue.join()
+        finally:
+            self._flush_requested.clear()
+
+    async def close(self):
+        """Process everything still queued and stop the background task.
+
+        A batch being processed is allowed to finish. A task whose event
+        loop is no longer in use is cancelled instead, and the items left
+        in its queue are processed here.
+        """
+        queue, worker, loop = self._queue, self._worker, self._loop
+        if worker is not None and not worker.done():
+            if loop is asyncio.get_running_loop():
+                await self.flush()
+                self._stop_requested.set()
+                await asyncio.gather(worker, return_exceptions=True)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(worker.cancel)
+
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        self._flush_requested = None
+        self._stop_requested = None
+
+        # Items queued while the worker was stopping, or on a dead loop
+        while queue is not None and not queue.empty():
+            count = min(queue.qsize(), self.max_batch_size)
+            await self._process(queue, [queue.get_nowait() for _ in range(count)])
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or not self.is_running():
+            if self._loop is not loop:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+                self._flush_requested = asyncio.Event()
+                self._stop_requested = asyncio.Event()
+                self._loop = loop
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _process_batch(self, batch: List[T]):
+        raise NotImplementedError
+
+    async def _on_idle(self):
+        pass
+
+    async def _run(self):
+        queue, stop_requested = self._queue, self._stop_requested
+        while not stop_requested.is_set():
+            batch = await self._next_batch(queue)
+            if batch:
+                await self._process(queue, batch)
+            elif not stop_requested.is_set():
+                try:
+                    await self._on_idle()
+                except Exception as e:
+                    logger.error(f"{type(self).__name__} idle work failed: {e}")
+
+    async def _process(self, queue: asyncio.Queue, batch: List[T]):
+        try:
+            await self._process_batch(batch)
+        except Exception as e:
+            logger.error(f"{type(self).__name__} failed a batch of {len(batch)}: {e}")
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[T]:
+        """Wait up to ``flush_interval`` for an item, then gather a batch.
+
+        Empty if nothing arrived or the worker is being stopped.
+        """
+        first = await self._get(queue, self._stop_requested, self.flush_interval)
+        if first is _NOTHING:
+            return []
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - loop.time()
+            if not self.linger or remaining <= 0 or self._flush_requested.is_set():
+                break
+            item = await self._get(queue, self._flush_requested, remaining)
+            if item is _NOTHING:
+                break
+            batch.append(item)
+
+        return batch
+
+    @staticmethod
+    async def _get(queue: asyncio.Queue, interrupt: asyncio.Event, timeout: float):
+        """The next item, or ``_NOTHING`` on timeout or if ``interrupt`` is
+        set first."""
+        getter = asyncio.ensure_future(queue.get())
+        waiter = asyncio.ensure_future(interrupt.wait())
+        try:
+            await asyncio.wait(
+                {getter, waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            waiter.cancel()
+            if not getter.done():
+                # Cancelling a pending get leaves its item in the queue
+                getter.cancel()
+        if not getter.done() or getter.cancelled():
+            return _NOTHING
+        return getter.result()
@@ -1,27 +1,231 @@
 """
 Error aggregation utility for sending errors to correlation service.
 This utility is used by all systems to report errors for correlation analysis.
+
+Errors are buffered and shipped to the batch endpoint by a background task.
+Identical errors reported within a short window are collapsed into one
+entry with an occurrence count, and batches that cannot be delivered are
+spilled to a local on-disk queue and replayed once the service is back.
 """
 
 import asyncio
+import hashlib
+import itertools
+import json
 import logging
+import os
+import tempfile
+import time
+import uuid
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 
 from ..exceptions import BaseAppException
+from .batch_worker import BatchWorker, RetryGate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShippingStats:
+    """Counters for errors passing through the buffered shipper."""
+
+    queued: int = 0
+    deduplicated: int = 0
+    dropped: int = 0
+    sent: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    spilled: int = 0
+    replayed: int = 0
+
+
+@dataclass
+class PendingError:
+    """An error waiting to be shipped, with its repeat count."""
+
+    data: Dict[str, Any]
+    count: int
+    first_seen: Optional[str]
+    last_seen: Optional[str]
+    key: Tuple[str, int]
+
+    def payload(self) -> Dict[str, Any]:
+        payload = dict(self.data)
+        payload["occurrence_count"] = self.count
+        payload["first_seen"] = self.first_seen
+        payload["last_seen"] = self.last_seen
+        return payload
+
+
+class ErrorSpool:
+    """On-disk queue of error batches that could not be delivered.
+
+    Each batch is written atomically as one JSON file; file names sort in
+    arrival order. Beyond ``max_batches`` files the oldest are discarded.
+    The directory may be shared by several processes: a batch is claimed
+    by renaming its file before it is replayed, so only one process sends
+    it. Claims left by a process that died are returned to the queue.
+    """
+
+    def __init__(
+        self, directory: str, max_batches: int = 1000, recover_interval: float = 60.0
+    ):
+        self.directory = Path(directory)
+        self.max_batches = max_batches
+        self.recover_interval = recover_interval
+        self._seq = itertools.count()
+        self._recover_at = 0.0
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+    def put(self, errors: List[Dict[str, Any]]) -> None:
+        """Append a batch to the queue."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._seq):06d}.json"
+        tmp_path = self.directory / f"{name}.tmp"
+        tmp_path.write_text(json.dumps(errors, default=str))
+        tmp_path.replace(self.directory / name)
+
+        files = self._files()
+        overflow = files[: max(0, len(files) - self.max_batches)]
+        for path in overflow:
+            path.unlink(missing_ok=True)
+        if overflow:
+            logger.warning(f"Error spool full, discarded {len(overflow)} batches")
+
+    def claim(self) -> Optional[Tuple[Path, List[Dict[str, Any]]]]:
+        """Take the oldest readable batch, or None when the queue is empty.
+
+        The claimed file must be passed to ``remove`` once delivered or to
+        ``release`` to return it to the queue.
+        """
+        if time.monotonic() >= self._recover_at:
+            self._recover_stale_claims()
+
+        for path in self._files():
+            claimed = path.with_name(f"{path.name}.{_claim_owner()}.claim")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                # Claimed or discarded by another process
+                continue
+            try:
+                return claimed, json.loads(claimed.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable error spool file {path}: {e}")
+                claimed.unlink(missing_ok=True)
+        return None
+
+    def release(self, claimed: Path) -> None:
+        """Return a claimed batch to the queue."""
+        claimed.rename(self._unclaimed_path(claimed))
+
+    def remove(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _unclaimed_path(claimed: Path) -> Path:
+        return claimed.with_name(claimed.name.rsplit(".", 2)[0])
+
+    def _recover_stale_claims(self):
+        self._recover_at = time.monotonic() + self.recover_interval
+        if not self.directory.is_dir():
+            return
+
+        for claimed in self.directory.glob("*.claim"):
+            owner = claimed.name.rsplit(".", 2)[1]
+            pid = owner.partition("-")[0]
+            if not pid.isdigit():
+                continue
+            if owner == _claim_owner():
+                continue
+            # Our pid with another token was an earlier process
+            if int(pid) != os.getpid() and _process_alive(int(pid)):
+                continue
+            try:
+                self.release(claimed)
+            except FileNotFoundError:
+                continue
+
+
+_owner: Optional[Tuple[int, str]] = None
 
 
-class ErrorAggregator:
+def _claim_owner() -> str:
+    """``<pid>-<token>`` naming this process in spool claims; the token
+    tells it apart from an earlier process with the same pid."""
+    global _owner
+
+    if _owner is None or _owner[0] != os.getpid():
+        _owner = (os.getpid(), uuid.uuid4().hex[:8])
+    return f"{_owner[0]}-{_owner[1]}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ErrorAggregator(BatchWorker[PendingError]):
     """Utility class for aggregating errors to correlation service."""
 
-    def __init__(self, correlation_service_url: str = "http://localhost:8000"):
+    depth_stat = "pending"
+
+    def __init__(
+        self,
+        correlation_service_url: str = "http://localhost:8000",
+        buffered: bool = True,
+        max_batch_size: int = 100,
+        flush_interval: float = 2.0,
+        dedup_window: float = 10.0,
+        max_pending: int = 5000,
+        retry_interval: float = 30.0,
+        max_replay_batches: int = 10,
+        spool_dir: Optional[str] = None,
+    ):
+        super().__init__(max_pending, max_batch_size, flush_interval, linger=True)
         self.correlation_service_url = correlation_service_url.rstrip("/")
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.session: Optional[aiohttp.ClientSession] = None
 
+        self.buffered = buffered
+        self.dedup_window = dedup_window
+        self.max_replay_batches = max_replay_batches
+        self.spool = ErrorSpool(
+            spool_dir
+            or os.getenv(
+                "ERROR_SPOOL_DIR",
+                os.path.join(tempfile.gettempdir(), "error_aggregator_spool"),
+            )
+        )
+
+        self.stats = ShippingStats()
+        # Queued errors by fingerprint and window, so repeats can be merged
+        # into them until they are shipped
+        self._pending: Dict[Tuple[str, int], PendingError] = {}
+        self._seq = itertools.count()
+        # After a failed send, batches go straight to the spool for a while
+        self._retry = RetryGate(retry_interval)
+        # The spool directory is shared with other (and earlier) processes
+        self._spool_may_have_data = True
+
     async def __aenter__(self):
         """Async context manager entry."""
         self.session = aiohttp.ClientSession()
@@ -333,12 +537,21 @@ class ErrorAggregator:
         """
         Send error data to correlation service.
 
+        When buffered, the error is queued for the background shipper and
+        True means it was accepted, not yet delivered.
+
         Args:
             error_data: Error data dictionary
 
         Returns:
             bool: True if successful, False otherwise
         """
+        if self.buffered:
+            return self._enqueue(error_data)
+        return await self._post_error_data(error_data)
+
+    async def _post_error_data(self, error_data: Dict[str, Any]) -> bool:
+        """POST a single error to the correlation service."""
         try:
             async with self.get_session() as session:
                 url = (
@@ -381,8 +594,113 @@ class ErrorAggregator:
         except Exception:
             return None
 
+    def _fingerprint(self, error_data: Dict[str, Any]) -> str:
+        """Identity of an error for deduplication."""
+        content = "\x1f".join(
+            str(error_data.get(field))
+            for field in ("code", "category", "severity", "message")
+        )
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def _enqueue(self, error_data: Dict[str, Any]) -> bool:
+        """Queue an error, merging it into an identical error still waiting
+        to be shipped from the same dedup window."""
+        queue = self._ensure_started()
+
+        if self.dedup_window > 0:
+            window = int(time.monotonic() // self.dedup_window)
+        else:
+            window = next(self._seq)
+        key = (self._fingerprint(error_data), window)
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.count += 1
+            pending.last_seen = error_data.get("timestamp")
+            self.stats.deduplicated += 1
+            return True
+
+        timestamp = error_data.get("timestamp")
+        pending = PendingError(error_data, 1, timestamp, timestamp, key)
+        try:
+            queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            self.logger.warning(
+                f"Error buffer full, dropped error: {error_data.get('code')}"
+            )
+            return False
+
+        self._pending[key] = pending
+        self.stats.queued += 1
+        return True
+
+    async def _process_batch(self, batch: List[PendingError]):
+        for pending in batch:
+            # Repeats from now on start a new entry
+            if self._pending.get(pending.key) is pending:
+                del self._pending[pending.key]
+        await self._ship([pending.payload() for pending in batch])
+        if not self.stopping:
+            await self._replay_spool()
+
+    async def _on_idle(self):
+        await self._replay_spool()
+
+    async def _ship(self, batch: List[Dict[str, Any]]) -> bool:
+        if self._retry.is_open():
+            if await self.aggregate_batch_errors(batch):
+                self.stats.sent += len(batch)
+                self.stats.batches += 1
+                return True
+            self.stats.failed_batches += 1
+            self._retry.trip()
+
+        await self._spill(batch)
+        return False
+
+    async def _spill(self, batch: List[Dict[str, Any]]):
+        try:
+            await asyncio.to_thread(self.spool.put, batch)
+        except OSError as e:
+            self.stats.dropped += len(batch)
+            self.logger.error(f"Failed to spill {len(batch)} errors to disk: {e}")
+            return
+        self.stats.spilled += len(batch)
+        self._spool_may_have_data = True
+
+    async def _replay_spool(self):
+        """Resend spilled batches, oldest first, while the service accepts
+        them."""
+        for _ in range(self.max_replay_batches):
+            if not self._spool_may_have_data or not self._retry.is_open():
+                return
+
+            item = await asyncio.to_thread(self.spool.claim)
+            if item is None:
+                self._spool_may_have_data = False
+                return
+
+            path, batch = item
+            delivered = False
+            try:
+                delivered = await self.aggregate_batch_errors(batch)
+            finally:
+                if not delivered:
+                    self.spool.release(path)
+            if not delivered:
+                self.stats.failed_batches += 1
+                self._retry.trip()
+                return
+
+            await asyncio.to_thread(self.spool.remove, path)
+            self.stats.replayed += len(batch)
+            self.stats.batches += 1
+
     async def close(self):
-        """Close the HTTP session."""
+        """Drain buffered errors and close the HTTP session."""
+        await super().close()
+
         if self.session:
             await self.session.close()
             self.session = None
@@ -402,6 +720,12 @@ def get_error_aggregator() -> ErrorAggregator:
     return _error_aggregator
 
 
+async def close_error_aggregator():
+    """Drain and close the shared error aggregator."""
+    if _error_aggregator is not None:
+        await _error_aggregator.close()
+
+
 # Convenience functions for different systems
 async def aggregate_autmatrix_error(
     workflow_id: str,
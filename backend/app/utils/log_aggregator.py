@@ -1,15 +1,39 @@
 """Log aggregation and filtering utilities."""
 
+import asyncio
+import gzip
 import json
 import logging
-from collections import Counter
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+LogLine = Union[str, bytes]
+
 
 class LogLevel(str, Enum):
     """Log levels for filtering."""
@@ -21,6 +45,21 @@ class LogLevel(str, Enum):
     CRITICAL = "critical"
 
 
+ERROR_LEVELS = (LogLevel.ERROR, LogLevel.CRITICAL)
+
+# Level lookup accepting both "error" and "ERROR" spellings
+_LEVELS_BY_NAME = {
+    **{level.value: level for level in LogLevel},
+    **{level.value.upper(): level for level in LogLevel},
+}
+
+# Parse errors that turn a log line into a plain-text entry
+_PARSE_ERRORS = (ValueError, KeyError, TypeError, AttributeError)
+
+# Fields with a secondary index, used to narrow filter candidates
+INDEXED_FIELDS = ("correlation_id", "component", "user_id", "level")
+
+
 @dataclass
 class LogEntry:
     """Structured log entry."""
@@ -48,6 +87,97 @@ class LogMetrics:
     time_range: Dict[str, datetime]
 
 
+def _epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch, treating naive timestamps as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _bump(counter: Counter, key: Any, delta: int) -> None:
+    """Adjust a count, dropping keys that reach zero."""
+    count = counter[key] + delta
+    if count:
+        counter[key] = count
+    else:
+        del counter[key]
+
+
+@dataclass
+class IngestStats:
+    """Outcome of a bulk ingestion run."""
+
+    lines: int = 0
+    ingested: int = 0
+    parse_failures: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def _loads(data: LogLine) -> Any:
+    """Decode JSON with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value.__class__ is str else value
+
+
+@dataclass
+class LogCounters:
+    """Counts over a set of log entries, maintained as entries come and go."""
+
+    total: int = 0
+    by_level: Counter = field(default_factory=Counter)
+    by_component: Counter = field(default_factory=Counter)
+    by_event: Counter = field(default_factory=Counter)
+    error_messages: Counter = field(default_factory=Counter)
+    component_errors: Counter = field(default_factory=Counter)
+
+    def add(self, entry: LogEntry, delta: int = 1) -> None:
+        self.total += delta
+        _bump(self.by_level, entry.level.value, delta)
+        if entry.component:
+            _bump(self.by_component, entry.component, delta)
+        if entry.event:
+            _bump(self.by_event, entry.event, delta)
+        if entry.level in ERROR_LEVELS:
+            _bump(self.error_messages, entry.message, delta)
+            if entry.component:
+                _bump(self.component_errors, entry.component, delta)
+
+    def remove(self, entry: LogEntry) -> None:
+        self.add(entry, -1)
+
+    def merge(self, other: "LogCounters") -> None:
+        self.total += other.total
+        self.by_level.update(other.by_level)
+        self.by_component.update(other.by_component)
+        self.by_event.update(other.by_event)
+        self.error_messages.update(other.error_messages)
+        self.component_errors.update(other.component_errors)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.by_level.get(level.value, 0) for level in ERROR_LEVELS)
+
+
+@dataclass
+class _TimeBucket:
+    """Entries whose timestamps fall in one bucket interval."""
+
+    start: float
+    entries: Deque[LogEntry] = field(default_factory=deque)
+    counters: LogCounters = field(default_factory=LogCounters)
+    component_last: Dict[str, datetime] = field(default_factory=dict)
+
+
 class LogFilter:
     """Log filtering utility."""
 
@@ -102,56 +232,221 @@ class LogFilter:
 
         return True
 
+    @property
+    def time_only(self) -> bool:
+        """Whether the filter constrains nothing but the time range."""
+        return not (
+            self.level
+            or self.component
+            or self.event
+            or self.correlation_id
+            or self.user_id
+            or self.message_contains
+        )
+
 
 class LogAggregator:
-    """Log aggregation and analysis utility."""
+    """Log aggregation and analysis utility.
+
+    Entries live in fixed-width time buckets, each keeping running counters,
+    with secondary indexes on ``INDEXED_FIELDS``. Windowed metrics merge
+    bucket counters and only scan the (at most two) buckets the window
+    boundaries cut through; filters start from the smallest matching index
+    or the buckets in their time range. Once ``max_entries`` is exceeded
+    the oldest entries are evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        bucket_seconds: int = 60,
+        parse_failure_log_every: int = 1000,
+    ):
+        self.max_entries = max_entries  # Limit memory usage
+        self.bucket_seconds = bucket_seconds
+        # Log the first unparsable line, then one in every N
+        self.parse_failure_log_every = parse_failure_log_every
+        self.parse_failures = 0
+        self._size = 0
+        self._buckets: Dict[int, _TimeBucket] = {}
+        self._bucket_keys: List[int] = []  # sorted
+        # field -> value -> {id(entry): entry}, in insertion order
+        self._indexes: Dict[str, Dict[Any, Dict[int, LogEntry]]] = {
+            name: {} for name in INDEXED_FIELDS
+        }
+        self._index_list = list(self._indexes.values())
 
-    def __init__(self):
-        self.entries: List[LogEntry] = []
-        self.max_entries = 10000  # Limit memory usage
+    @property
+    def entries(self) -> List[LogEntry]:
+        """All stored entries, oldest bucket first."""
+        return [entry for bucket in self._iter_buckets() for entry in bucket.entries]
+
+    def __len__(self) -> int:
+        return self._size
 
     def add_entry(self, entry: LogEntry) -> None:
         """Add a log entry to the aggregator."""
-        self.entries.append(entry)
+        key = int(_epoch(entry.timestamp) // self.bucket_seconds)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TimeBucket(start=key * self.bucket_seconds)
+            if not self._bucket_keys or key > self._bucket_keys[-1]:
+                self._bucket_keys.append(key)
+            else:
+                insort(self._bucket_keys, key)
+
+        bucket.entries.append(entry)
+        bucket.counters.add(entry)
+        if entry.component:
+            last = bucket.component_last.get(entry.component)
+            if last is None or entry.timestamp > last:
+                bucket.component_last[entry.component] = entry.timestamp
+
+        entry_id = id(entry)
+        for index, value in zip(self._index_list, self._index_keys(entry)):
+            if value is not None:
+                index.setdefault(value, {})[entry_id] = entry
+        self._size += 1
 
         # Remove old entries if we exceed the limit
-        if len(self.entries) > self.max_entries:
-            self.entries = self.entries[-self.max_entries :]
+        while self._size > self.max_entries:
+            self._evict_oldest()
 
     def add_from_log_line(self, log_line: str) -> None:
         """Parse and add a log entry from a log line."""
         try:
             # Try to parse as JSON (structured log)
-            log_data = json.loads(log_line)
-
-            entry = LogEntry(
-                timestamp=datetime.fromisoformat(
-                    log_data.get("timestamp", datetime.utcnow().isoformat())
-                ),
-                level=LogLevel(log_data.get("level", "info")),
-                message=log_data.get("message", ""),
-                correlation_id=log_data.get("correlation_id"),
-                event=log_data.get("event"),
-                component=log_data.get("component"),
-                user_id=log_data.get("user_id"),
-                context=log_data.get("context", {}),
-            )
-
+            entry = self._entry_from_record(_loads(log_line))
+        except _PARSE_ERRORS as e:
+            # If parsing fails, create a basic entry
+            entry = self._unparsed_entry(log_line, e)
+
+        self.add_entry(entry)
+
+    def ingest_lines(
+        self, lines: Iterable[LogLine], chunk_size: int = 1000
+    ) -> IngestStats:
+        """Parse and add log lines from any iterable (file, socket file,
+        generator), a chunk at a time."""
+        stats = IngestStats()
+        started = time.perf_counter()
+        chunk: List[LogLine] = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                self._ingest_chunk(chunk, stats)
+                chunk = []
+        if chunk:
+            self._ingest_chunk(chunk, stats)
+
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def ingest_file(self, path: str, chunk_size: int = 1000) -> IngestStats:
+        """Ingest a (optionally gzipped) newline-delimited JSON log file."""
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rb") as log_file:
+            return self.ingest_lines(log_file, chunk_size)
+
+    async def ingest_stream(
+        self, lines: AsyncIterable[LogLine], chunk_size: int = 1000
+    ) -> IngestStats:
+        """Ingest lines from an async iterator such as an
+        ``asyncio.StreamReader``, yielding to the event loop between
+        chunks."""
+        stats = IngestStats()
+        started = time.perf_counter()
+        chunk: List[LogLine] = []
+        async for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                self._ingest_chunk(chunk, stats)
+                chunk = []
+                await asyncio.sleep(0)
+        if chunk:
+            self._ingest_chunk(chunk, stats)
+
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def _ingest_chunk(self, lines: List[LogLine], stats: IngestStats) -> None:
+        stats.lines += len(lines)
+        present = [line for line in lines if line.strip()]
+        stats.skipped += len(lines) - len(present)
+        lines = present
+
+        for line, record in zip(lines, self._parse_chunk(lines)):
+            try:
+                if record is None:
+                    record = _loads(line)
+                entry = self._entry_from_record(record)
+            except _PARSE_ERRORS as e:
+                entry = self._unparsed_entry(line, e)
+                stats.parse_failures += 1
             self.add_entry(entry)
+            stats.ingested += 1
+
+    @staticmethod
+    def _parse_chunk(lines: List[LogLine]) -> List[Any]:
+        """Decode a chunk of lines as one JSON array, which is much cheaper
+        than a decode call per line. If any line is malformed (or the chunk
+        does not split back into one object per line) return ``None``
+        placeholders so the lines are decoded one by one."""
+        try:
+            if isinstance(lines[0], bytes):
+                records = _loads(b"[" + b",".join(lines) + b"]")
+            else:
+                records = _loads("[" + ",".join(lines) + "]")
+        except _PARSE_ERRORS + (IndexError,):
+            records = None
 
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
-            # If parsing fails, create a basic entry
-            logger.warning(f"Failed to parse log line: {e}")
-            entry = LogEntry(
-                timestamp=datetime.utcnow(),
-                level=LogLevel.INFO,
-                message=log_line.strip(),
+        if (
+            isinstance(records, list)
+            and len(records) == len(lines)
+            and all(isinstance(record, dict) for record in records)
+        ):
+            return records
+        return [None] * len(lines)
+
+    def _entry_from_record(self, log_data: Dict[str, Any]) -> LogEntry:
+        timestamp = log_data.get("timestamp")
+        level = log_data.get("level", "info")
+        return LogEntry(
+            timestamp=(
+                datetime.fromisoformat(timestamp) if timestamp else datetime.utcnow()
+            ),
+            level=_LEVELS_BY_NAME.get(level) or LogLevel(level),
+            message=log_data.get("message", ""),
+            correlation_id=log_data.get("correlation_id"),
+            event=_intern(log_data.get("event")),
+            component=_intern(log_data.get("component")),
+            user_id=_intern(log_data.get("user_id")),
+            context=log_data.get("context", {}),
+        )
+
+    def _unparsed_entry(self, log_line: LogLine, error: Exception) -> LogEntry:
+        self.parse_failures += 1
+        if self.parse_failures == 1 or (
+            self.parse_failures % self.parse_failure_log_every == 0
+        ):
+            logger.warning(
+                f"Failed to parse log line ({self.parse_failures} failures "
+                f"so far): {error}"
             )
-            self.add_entry(entry)
+
+        if isinstance(log_line, bytes):
+            log_line = log_line.decode("utf-8", errors="replace")
+        return LogEntry(
+            timestamp=datetime.utcnow(),
+            level=LogLevel.INFO,
+            message=log_line.strip(),
+        )
 
     def filter_entries(self, log_filter: LogFilter) -> List[LogEntry]:
         """Filter log entries based on criteria."""
-        return [entry for entry in self.entries if log_filter.matches(entry)]
+        return [
+            entry for entry in self._candidates(log_filter) if log_filter.matches(entry)
+        ]
 
     def get_metrics(
         self, log_filter: Optional[LogFilter] = None, time_window_hours: int = 24
@@ -167,13 +462,18 @@ class LogAggregator:
                 log_filter.start_time = start_time
             if not log_filter.end_time:
                 log_filter.end_time = end_time
-            entries = self.filter_entries(log_filter)
         else:
             # Create time-only filter
-            time_filter = LogFilter(start_time=start_time, end_time=end_time)
-            entries = self.filter_entries(time_filter)
+            log_filter = LogFilter(start_time=start_time, end_time=end_time)
+
+        if log_filter.time_only:
+            counters = self._window_counters(log_filter.start_time, log_filter.end_time)
+        else:
+            counters = LogCounters()
+            for entry in self.filter_entries(log_filter):
+                counters.add(entry)
 
-        if not entries:
+        if not counters.total:
             return LogMetrics(
                 total_entries=0,
                 entries_by_level={},
@@ -184,50 +484,26 @@ class LogAggregator:
                 time_range={"start": start_time, "end": end_time},
             )
 
-        # Calculate metrics
-        total_entries = len(entries)
-
-        # Count by level
-        level_counts = Counter(entry.level.value for entry in entries)
-        entries_by_level = dict(level_counts)
-
-        # Count by component
-        component_counts = Counter(
-            entry.component for entry in entries if entry.component
-        )
-        entries_by_component = dict(component_counts)
-
-        # Count by event
-        event_counts = Counter(entry.event for entry in entries if entry.event)
-        entries_by_event = dict(event_counts)
-
         # Calculate error rate
-        error_count = level_counts.get("error", 0) + level_counts.get("critical", 0)
+        total_entries = counters.total
+        error_count = counters.error_count
         error_rate = (error_count / total_entries) * 100 if total_entries > 0 else 0.0
 
         # Get top errors
-        error_entries = [
-            entry
-            for entry in entries
-            if entry.level in [LogLevel.ERROR, LogLevel.CRITICAL]
-        ]
-        error_message_counts = Counter(entry.message for entry in error_entries)
         top_errors = [
             {
                 "message": message,
                 "count": count,
-                "percentage": (
-                    (count / len(error_entries)) * 100 if error_entries else 0
-                ),
+                "percentage": ((count / error_count) * 100 if error_count else 0),
             }
-            for message, count in error_message_counts.most_common(10)
+            for message, count in counters.error_messages.most_common(10)
         ]
 
         return LogMetrics(
             total_entries=total_entries,
-            entries_by_level=entries_by_level,
-            entries_by_component=entries_by_component,
-            entries_by_event=entries_by_event,
+            entries_by_level=dict(counters.by_level),
+            entries_by_component=dict(counters.by_component),
+            entries_by_event=dict(counters.by_event),
             error_rate=error_rate,
             top_errors=top_errors,
             time_range={"start": start_time, "end": end_time},
@@ -258,13 +534,30 @@ class LogAggregator:
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
 
-        component_filter = LogFilter(
-            component=component, start_time=start_time, end_time=end_time
-        )
-
-        entries = self.filter_entries(component_filter)
-
-        if not entries:
+        total_entries = 0
+        error_count = 0
+        last_activity = None
+
+        for bucket, whole in self._window_buckets(start_time, end_time):
+            if whole:
+                total_entries += bucket.counters.by_component.get(component, 0)
+                error_count += bucket.counters.component_errors.get(component, 0)
+                last = bucket.component_last.get(component)
+            else:
+                last = None
+                for entry in bucket.entries:
+                    if entry.component != component:
+                        continue
+                    if not start_time <= entry.timestamp <= end_time:
+                        continue
+                    total_entries += 1
+                    error_count += entry.level in ERROR_LEVELS
+                    if last is None or entry.timestamp > last:
+                        last = entry.timestamp
+            if last is not None and (last_activity is None or last > last_activity):
+                last_activity = last
+
+        if not total_entries:
             return {
                 "status": "unknown",
                 "total_entries": 0,
@@ -273,10 +566,7 @@ class LogAggregator:
                 "last_activity": None,
             }
 
-        error_count = sum(
-            1 for entry in entries if entry.level in [LogLevel.ERROR, LogLevel.CRITICAL]
-        )
-        error_rate = (error_count / len(entries)) * 100
+        error_rate = (error_count / total_entries) * 100
 
         # Determine health status
         if error_rate > 10:
@@ -288,26 +578,164 @@ class LogAggregator:
 
         return {
             "status": status,
-            "total_entries": len(entries),
+            "total_entries": total_entries,
             "error_count": error_count,
             "error_rate": error_rate,
-            "last_activity": max(entry.timestamp for entry in entries),
+            "last_activity": last_activity,
         }
 
     def clear_old_entries(self, hours: int = 168) -> int:  # Default: 1 week
         """Remove log entries older than specified hours."""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cutoff_key = int(_epoch(cutoff_time) // self.bucket_seconds)
+
+        removed_count = 0
+        while self._bucket_keys and self._bucket_keys[0] <= cutoff_key:
+            key = self._bucket_keys[0]
+            bucket = self._buckets[key]
+            if key < cutoff_key:
+                # Entirely before the cutoff
+                for entry in bucket.entries:
+                    self._unindex(entry)
+                removed_count += len(bucket.entries)
+                self._size -= len(bucket.entries)
+                self._drop_bucket(0)
+                continue
+
+            # The cutoff falls inside this bucket
+            removed = [e for e in bucket.entries if e.timestamp <= cutoff_time]
+            bucket.entries = deque(
+                e for e in bucket.entries if e.timestamp > cutoff_time
+            )
+            for entry in removed:
+                self._discard(bucket, entry)
+            self._refresh_component_last(
+                bucket, {e.component for e in removed if e.component}
+            )
+            removed_count += len(removed)
+            if not bucket.entries:
+                self._drop_bucket(0)
+            break
 
-        old_count = len(self.entries)
-        self.entries = [
-            entry for entry in self.entries if entry.timestamp > cutoff_time
-        ]
-
-        removed_count = old_count - len(self.entries)
         logger.info(f"Removed {removed_count} old log entries")
 
         return removed_count
 
+    def _iter_buckets(self) -> Iterable[_TimeBucket]:
+        return (self._buckets[key] for key in self._bucket_keys)
+
+    def _window_buckets(self, start_time: datetime, end_time: datetime):
+        """Yield ``(bucket, whole)`` for buckets overlapping the window;
+        ``whole`` is True when the bucket lies entirely inside it."""
+        start, end = _epoch(start_time), _epoch(end_time)
+        lo = bisect_left(self._bucket_keys, int(start // self.bucket_seconds))
+        hi = bisect_right(self._bucket_keys, int(end // self.bucket_seconds))
+        for key in self._bucket_keys[lo:hi]:
+            bucket = self._buckets[key]
+            # Bucket times are [start, start + width); end_time is inclusive
+            whole = bucket.start >= start and bucket.start + self.bucket_seconds <= end
+            yield bucket, whole
+
+    def _window_counters(
+        self, start_time: Optional[datetime], end_time: Optional[datetime]
+    ) -> LogCounters:
+        """Counters for entries with ``start_time <= timestamp <= end_time``."""
+        if start_time is None or end_time is None:
+            window_filter = LogFilter(start_time=start_time, end_time=end_time)
+            counters = LogCounters()
+            for entry in self.filter_entries(window_filter):
+                counters.add(entry)
+            return counters
+
+        counters = LogCounters()
+        for bucket, whole in self._window_buckets(start_time, end_time):
+            if whole:
+                counters.merge(bucket.counters)
+                continue
+            for entry in bucket.entries:
+                if start_time <= entry.timestamp <= end_time:
+                    counters.add(entry)
+        return counters
+
+    def _candidates(self, log_filter: LogFilter) -> Iterable[LogEntry]:
+        """Smallest readily available superset of the filter's matches."""
+        best: Optional[Iterable[LogEntry]] = None
+        best_size = self._size
+
+        for name in INDEXED_FIELDS:
+            value = getattr(log_filter, name)
+            if value and name == "level":
+                value = LogLevel(value).value
+            if value:
+                matches = self._indexes[name].get(value, {})
+                if len(matches) < best_size or best is None:
+                    best, best_size = matches.values(), len(matches)
+
+        if log_filter.start_time and log_filter.end_time:
+            buckets = [
+                bucket
+                for bucket, _ in self._window_buckets(
+                    log_filter.start_time, log_filter.end_time
+                )
+            ]
+            in_range = sum(len(bucket.entries) for bucket in buckets)
+            if best is None or in_range < best_size:
+                return (entry for bucket in buckets for entry in bucket.entries)
+
+        if best is not None:
+            return best
+        return (entry for bucket in self._iter_buckets() for entry in bucket.entries)
+
+    def _evict_oldest(self) -> None:
+        bucket = self._buckets[self._bucket_keys[0]]
+        entry = bucket.entries.popleft()
+        self._discard(bucket, entry)
+        if bucket.component_last.get(entry.component) == entry.timestamp:
+            self._refresh_component_last(bucket, {entry.component})
+        if not bucket.entries:
+            self._drop_bucket(0)
+
+    def _discard(self, bucket: _TimeBucket, entry: LogEntry) -> None:
+        """Account for ``entry`` having been taken out of ``bucket``; the
+        caller refreshes ``component_last`` once the removals are done."""
+        bucket.counters.remove(entry)
+        self._unindex(entry)
+        self._size -= 1
+
+    @staticmethod
+    def _refresh_component_last(bucket: _TimeBucket, components: Set[str]) -> None:
+        """Recompute the latest timestamp of each component from the entries
+        left in ``bucket``."""
+        for component in components:
+            last = max(
+                (e.timestamp for e in bucket.entries if e.component == component),
+                default=None,
+            )
+            if last is None:
+                bucket.component_last.pop(component, None)
+            else:
+                bucket.component_last[component] = last
+
+    def _drop_bucket(self, position: int) -> None:
+        del self._buckets[self._bucket_keys.pop(position)]
+
+    @staticmethod
+    def _index_keys(entry: LogEntry) -> tuple:
+        """Index keys of an entry, in ``INDEXED_FIELDS`` order. Enum members
+        hash by name, so levels are indexed by their string value."""
+        return (entry.correlation_id, entry.component, entry.user_id, entry.level.value)
+
+    def _unindex(self, entry: LogEntry) -> None:
+        entry_id = id(entry)
+        for index, value in zip(self._index_list, self._index_keys(entry)):
+            if value is None:
+                continue
+            matches = index.get(value)
+            if matches is not None:
+                matches.pop(entry_id, None)
+                if not matches:
+                    del index[value]
+
 
 # Global log aggregator instance
 log_aggregator = LogAggregator()
@@ -0,0 +1,269 @@
+"""Mergeable streaming quantile sketches for latency and duration metrics."""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_PERCENTILES = (50, 95, 99, 99.9)
+
+
+def percentile_label(percentile: float) -> str:
+    """Format a percentile as a metric key, e.g. 99.9 -> "p999"."""
+    return "p" + f"{percentile:g}".replace(".", "")
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Positive values are counted in logarithmically sized buckets so every
+    quantile estimate is within ``relative_accuracy`` of the true value
+    (DDSketch-style). Memory is bounded by ``max_bins``: when exceeded, the
+    lowest buckets are collapsed, which only affects the smallest values and
+    keeps the tail percentiles accurate. Two sketches with the same accuracy
+    can be merged exactly, e.g. to combine results from several workers.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def add(self, value: float, count: int = 1):
+        """Record ``count`` observations of ``value`` (negatives count as zero)."""
+        if count <= 0:
+            return
+
+        value = float(value)
+        if value <= 0:
+            self._zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._bins[key] = self._bins.get(key, 0) + count
+            if len(self._bins) > self.max_bins:
+                self._collapse()
+
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        """Merge another sketch's observations into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        if not other.count:
+            return
+
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0 <= q <= 1)."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if rank < seen:
+                estimate = 2 * self._gamma**key / (self._gamma + 1)
+                # Bucket midpoints can fall just outside the observed range
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def percentiles(
+        self, percentiles: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, float]:
+        """Return ``{"p50": ..., "p95": ...}`` for the requested percentiles."""
+        return {
+            percentile_label(percentile): self.quantile(percentile / 100)
+            for percentile in percentiles
+        }
+
+    def summary(
+        self, percentiles: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, float]:
+        """Count, mean, min, max and percentiles in one dictionary."""
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            **self.percentiles(percentiles),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for shipping between processes (JSON compatible)."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "bins": {str(key): count for key, count in self._bins.items()},
+            "zero_count": self._zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data.get("max_bins", 2048))
+        sketch._bins = {int(key): count for key, count in data["bins"].items()}
+        sketch._zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def _collapse(self):
+        """Fold the lowest buckets together until within ``max_bins``."""
+        keys = sorted(self._bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._bins[target] += self._bins.pop(key)
+
+
+class WindowedQuantileSketch:
+    """Quantile sketch over a sliding time window.
+
+    Observations go into one sketch per ``interval_seconds`` time slot; the
+    last ``num_intervals`` slots are retained and merged on demand, so a
+    query over the last N seconds costs O(slots), independent of how many
+    observations were recorded. Slots are aligned to wall-clock time, which
+    lets sketches from different processes be merged slot by slot.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = 60,
+        num_intervals: int = 60,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+    ):
+        self.interval_seconds = interval_seconds
+        self.num_intervals = num_intervals
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._slots: Dict[int, QuantileSketch] = {}
+        self.total_count = 0
+
+    @property
+    def span_seconds(self) -> int:
+        return self.interval_seconds * self.num_intervals
+
+    def add(self, value: float, timestamp: Optional[float] = None):
+        slot = self._slot_for(timestamp)
+        sketch = self._slots.get(slot)
+        if sketch is None:
+            sketch = QuantileSketch(self.relative_accuracy, self.max_bins)
+            self._slots[slot] = sketch
+            self._expire(slot)
+        sketch.add(value)
+        self.total_count += 1
+
+    def snapshot(
+        self, window_seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> QuantileSketch:
+        """Merge the slots covering the last ``window_seconds`` (default: all)."""
+        current = self._slot_for(now)
+        if window_seconds is None:
+            oldest = current - self.num_intervals + 1
+        else:
+            slots = max(1, math.ceil(window_seconds / self.interval_seconds))
+            oldest = current - min(slots, self.num_intervals) + 1
+
+        merged = QuantileSketch(self.relative_accuracy, self.max_bins)
+        for slot, sketch in self._slots.items():
+            if oldest <= slot <= current:
+                merged.merge(sketch)
+        return merged
+
+    def merge(self, other: "WindowedQuantileSketch"):
+        """Merge another windowed sketch with the same slot width."""
+        if other.interval_seconds != self.interval_seconds:
+            raise ValueError("Cannot merge windows with different intervals")
+
+        for slot, sketch in other._slots.items():
+            if slot not in self._slots:
+                self._slots[slot] = QuantileSketch(
+                    self.relative_accuracy, self.max_bins
+                )
+            self._slots[slot].merge(sketch)
+        self.total_count += other.total_count
+        if self._slots:
+            self._expire(max(self._slots))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "num_intervals": self.num_intervals,
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "total_count": self.total_count,
+            "slots": {
+                str(slot): sketch.to_dict() for slot, sketch in self._slots.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WindowedQuantileSketch":
+        windowed = cls(
+            data["interval_seconds"],
+            data["num_intervals"],
+            data["relative_accuracy"],
+            data.get("max_bins", 2048),
+        )
+        windowed.total_count = data["total_count"]
+        windowed._slots = {
+            int(slot): QuantileSketch.from_dict(sketch)
+            for slot, sketch in data["slots"].items()
+        }
+        return windowed
+
+    def _slot_for(self, timestamp: Optional[float]) -> int:
+        if timestamp is None:
+            timestamp = time.time()
+        return int(timestamp // self.interval_seconds)
+
+    def _expire(self, newest_slot: int):
+        oldest = newest_slot - self.num_intervals + 1
+        stale: List[int] = [slot for slot in self._slots if slot < oldest]
+        for slot in stale:
+            del self._slots[slot]
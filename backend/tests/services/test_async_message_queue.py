@@ -0,0 +1,147 @@
+"""Tests for the asyncio message queue and consumer runner."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from app.services import async_message_queue
+from app.services.async_message_queue import AsyncMessageQueue, QueueConsumer
+from app.services.message_queue import MessageStatus
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+async def queue():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    with patch.object(async_message_queue.aioredis, "from_url", return_value=client):
+        mq = AsyncMessageQueue(redis_url="redis://fake")
+    yield mq
+    await mq.close()
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_async_queue_round_trip(queue):
+    ids = await queue.enqueue_many("jobs", [{"n": 1}, {"n": 2}])
+    urgent = await queue.enqueue("jobs", {"n": 3}, priority=10)
+
+    message = await queue.dequeue("jobs")
+    assert message.id == urgent
+    assert message.status == MessageStatus.PROCESSING
+    assert await queue.ack(message)
+
+    message = await queue.dequeue("jobs")
+    assert message.id == ids[0]
+    assert await queue.nack(message, "boom")
+    assert message.retry_count == 1
+
+    with patch.object(async_message_queue.time, "time", return_value=time.time() + 10):
+        assert await queue.process_scheduled_messages() == 1
+
+    assert await queue.get_queue_stats("jobs") == {
+        "pending": 2,
+        "processing": 0,
+        "dead_letter": 0,
+    }
+    assert await queue.purge_queue("jobs") == 2
+
+
+@pytest.mark.asyncio
+async def test_async_dequeue_waits_on_several_queues(queue):
+    assert await queue.dequeue_many_from(["a", "b"], 5, timeout=0) == []
+
+    async def later():
+        await asyncio.sleep(0.05)
+        await queue.enqueue("b", {"n": 1})
+
+    producer = asyncio.create_task(later())
+    messages = await queue.dequeue_many_from(["a", "b"], 5, timeout=2)
+    await producer
+
+    assert [m.queue_name for m in messages] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_async_recover_stale_messages(queue):
+    await queue.enqueue("jobs", {"n": 1})
+    message = await queue.dequeue("jobs")
+    await queue.redis_client.zadd(
+        queue._get_processing_started_key("jobs"),
+        {message.id: time.time() - queue.processing_timeout - 1},
+    )
+
+    assert await queue.recover_stale_messages() == 1
+    recovered = await queue.get_message(message.id)
+    assert recovered.retry_count == 1
+    assert (await queue.get_queue_stats("jobs"))["processing"] == 0
+
+
+@pytest.mark.asyncio
+async def test_consumer_bounds_concurrency_and_settles_messages(queue):
+    active = {"now": 0, "peak": 0}
+    handled = []
+
+    async def handle(message):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if message.payload["n"] == "bad":
+            raise ValueError("bad payload")
+        handled.append(message.payload["n"])
+
+    def handle_sync(message):
+        handled.append(message.payload["n"])
+
+    await queue.enqueue_many("work", [{"n": n} for n in range(10)])
+    bad = await queue.enqueue("work", {"n": "bad"}, max_retries=0)
+    await queue.enqueue("audit", {"n": "audit"})
+
+    consumer = QueueConsumer(
+        queue,
+        {"work": handle, "audit": handle_sync},
+        concurrency=3,
+        block_timeout=0.05,
+    )
+    await consumer.start()
+    await _wait_for(lambda: consumer.processed + consumer.failed == 12)
+    await consumer.stop()
+
+    assert sorted(map(str, handled)) == sorted([str(n) for n in range(10)] + ["audit"])
+    assert active["peak"] == 3
+    assert consumer.failed == 1
+    assert (await queue.get_message(bad)).status == MessageStatus.DEAD_LETTER
+    assert await queue.get_queue_stats("work") == {
+        "pending": 0,
+        "processing": 0,
+        "dead_letter": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_consumer_wakes_for_new_messages_and_drains_on_stop(queue):
+    done = []
+
+    async def handle(message):
+        await asyncio.sleep(0.05)
+        done.append(message.id)
+
+    consumer = QueueConsumer(queue, {"work": handle}, block_timeout=5)
+    await consumer.start()
+    await asyncio.sleep(0.02)
+
+    started = time.monotonic()
+    message_id = await queue.enqueue("work", {"n": 1})
+    await _wait_for(lambda: consumer.active == 1)
+    await consumer.stop()
+
+    assert done == [message_id]
+    assert time.monotonic() - started < 2
@@ -0,0 +1,250 @@
+"""Tests for the background audit log writer."""
+
+import fcntl
+import json
+import uuid
+
+import pytest
+from app.models.tenant import AuditLog
+from app.services.audit_service import AuditService
+from app.services.audit_writer import AuditWriter
+from sqlalchemy.dialects import postgresql
+
+from tests.conftest import TestingSessionLocal
+
+
+class FakeDatabase:
+    """Session factory whose sessions record inserts; while ``error`` is set,
+    executing a statement raises it."""
+
+    def __init__(self):
+        self.error = None
+        self.inserts = []
+        self.commits = 0
+
+    def __call__(self):
+        return FakeSession(self)
+
+    @property
+    def rows(self):
+        return [row for batch in self.inserts for row in batch]
+
+
+class FakeSession:
+    class _Bind:
+        class dialect:
+            name = "fake"
+
+    def __init__(self, database):
+        self.database = database
+        self.pending = []
+
+    def get_bind(self):
+        return self._Bind()
+
+    def execute(self, statement, rows):
+        if self.database.error is not None:
+            raise self.database.error
+        self.pending.append(list(rows))
+
+    def commit(self):
+        self.database.inserts.extend(self.pending)
+        self.database.commits += 1
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+def _row(n, tenant_id=None):
+    return {
+        "tenant_id": tenant_id or uuid.uuid4(),
+        "user_id": None,
+        "event_type": "api_access",
+        "resource_type": "workflow",
+        "action": f"post_{n}",
+        "audit_metadata": {"n": n},
+        "status": "success",
+    }
+
+
+@pytest.fixture
+def database():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def spill(tmp_path):
+    return tmp_path / "audit_spill.jsonl"
+
+
+@pytest.fixture
+async def writer(database, spill):
+    writer = AuditWriter(
+        session_factory=database, spill_path=str(spill), flush_interval=0.05
+    )
+    yield writer
+    await writer.close()
+
+
+class TestAuditWriter:
+    async def test_writes_queued_rows_in_one_multi_row_insert(self, writer, database):
+        for n in range(5):
+            await writer.submit(_row(n))
+
+        await writer.flush()
+
+        assert [len(batch) for batch in database.inserts] == [5]
+        assert database.commits == 1
+        assert writer.stats.written == 5
+
+    async def test_batches_are_capped_at_max_batch_size(self, database, spill):
+        writer = AuditWriter(
+            session_factory=database, spill_path=str(spill), max_batch_size=2
+        )
+        for n in range(5):
+            await writer.submit(_row(n))
+
+        await writer.close()
+
+        assert [len(batch) for batch in database.inserts] == [2, 2, 1]
+
+    async def test_spills_while_database_down_and_replays(
+        self, writer, database, spill
+    ):
+        database.error = ConnectionError("database unavailable")
+        tenant_id = uuid.uuid4()
+        await writer.submit(_row(1, tenant_id))
+        await writer.flush()
+
+        spilled = [json.loads(line) for line in spill.read_text().splitlines()]
+        assert [row["action"] for row in spilled] == ["post_1"]
+        assert database.rows == []
+        assert writer.stats.failed_batches == 1
+
+        database.error = None
+        writer._retry.reset()
+        await writer._replay_spill()
+
+        assert [row["action"] for row in database.rows] == ["post_1"]
+        assert database.rows[0]["tenant_id"] == tenant_id
+        assert not spill.exists()
+        assert writer.stats.replayed == 1
+
+    async def test_failed_replay_keeps_unwritten_rows(self, database, spill):
+        writer = AuditWriter(
+            session_factory=database,
+            spill_path=str(spill),
+            max_batch_size=1,
+            retry_interval=0,
+        )
+        writer._append_spill([_row(1), _row(2)])
+        database.error = ConnectionError("database unavailable")
+
+        await writer._replay_spill()
+
+        replay = spill.with_name(spill.name + ".replay")
+        assert len(replay.read_text().splitlines()) == 2
+
+        database.error = None
+        await writer._replay_spill()
+
+        assert [row["action"] for row in database.rows] == ["post_1", "post_2"]
+        assert not replay.exists()
+
+    async def test_full_buffer_spills_to_disk(self, database, spill):
+        writer = AuditWriter(
+            session_factory=database, spill_path=str(spill), max_buffer_size=1
+        )
+        # The worker has not run yet when the second row arrives
+        for n in range(1, 4):
+            await writer.submit(_row(n))
+        await writer.flush()
+
+        assert writer.stats.overflowed == 2
+        assert writer.stats.spilled == 2
+
+        await writer.close()
+        await writer._replay_spill()
+        assert sorted(row["action"] for row in database.rows) == [
+            "post_1",
+            "post_2",
+            "post_3",
+        ]
+
+    async def test_overflow_is_spilled_in_one_write(self, database, spill, monkeypatch):
+        writer = AuditWriter(
+            session_factory=database, spill_path=str(spill), max_buffer_size=1
+        )
+        writes = []
+        monkeypatch.setattr(writer, "_append_spill", writes.append)
+
+        for n in range(5):
+            await writer.submit(_row(n))
+        await writer.close()
+
+        assert [len(rows) for rows in writes] == [4]
+
+    async def test_rows_get_their_id_when_submitted(self, writer, database):
+        row = _row(1)
+        await writer.submit(row)
+        await writer.flush()
+
+        assert isinstance(row["id"], uuid.UUID)
+        assert database.rows[0]["id"] == row["id"]
+
+    def test_insert_skips_rows_already_written(self):
+        statement = AuditWriter._insert_statement("postgresql")
+
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO NOTHING" in sql
+
+    async def test_replay_skipped_while_another_process_replays(
+        self, writer, database, spill
+    ):
+        writer._append_spill([_row(1)])
+
+        with open(f"{spill}.replay.lock", "a") as other:
+            fcntl.flock(other, fcntl.LOCK_EX)
+            assert writer._replay_spill_file() == 0
+
+        assert database.rows == []
+        assert writer._replay_spill_file() == 1
+        assert [row["action"] for row in database.rows] == ["post_1"]
+
+    async def test_close_drains_buffer(self, database, spill):
+        writer = AuditWriter(
+            session_factory=database, spill_path=str(spill), flush_interval=60
+        )
+        await writer.submit(_row(1))
+
+        await writer.close()
+
+        assert len(database.rows) == 1
+        assert writer.get_stats()["buffered"] == 0
+
+
+class TestAuditServiceQueue:
+    async def test_queue_event_persists_row_with_metadata(self, db_session, tmp_path):
+        writer = AuditWriter(
+            session_factory=TestingSessionLocal,
+            spill_path=str(tmp_path / "audit_spill.jsonl"),
+        )
+        service = AuditService(writer=writer)
+        tenant_id = uuid.uuid4()
+
+        await service.queue_event(
+            tenant_id=tenant_id,
+            event_type="workflow",
+            resource_type="workflow",
+            action="post_execute",
+            metadata={"status_code": 201},
+        )
+        await writer.close()
+
+        logs = db_session.query(AuditLog).filter(AuditLog.tenant_id == tenant_id).all()
+        assert len(logs) == 1
+        assert logs[0].audit_metadata == {"status_code": 201}
+        assert logs[0].timestamp is not None
@@ -0,0 +1,133 @@
+"""Tests for the buffered Elasticsearch bulk indexer."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.services import search_service
+from app.services.bulk_indexer import BulkAction, BulkIndexer
+
+
+class FakeElasticsearch:
+    """Records bulk requests; queued responses decide each item's status."""
+
+    def __init__(self, statuses=None, failures=0):
+        self.requests = []
+        self.statuses = list(statuses or [])
+        self.failures = failures
+
+    def bulk(self, operations):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("cluster unavailable")
+
+        self.requests.append(operations)
+        count = len(operations) // 2
+        statuses = self.statuses.pop(0) if self.statuses else [201] * count
+        items = [
+            {"index": {"status": status, "error": None if status < 300 else "x"}}
+            for status in statuses
+        ]
+        return {"errors": any(s >= 300 for s in statuses), "items": items}
+
+
+def _action(n):
+    return BulkAction("logs", {"message": f"entry {n}"})
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full():
+    client = FakeElasticsearch()
+    indexer = BulkIndexer(client, max_batch_size=3, flush_interval=60)
+
+    for n in range(6):
+        await indexer.submit(_action(n))
+    await indexer.flush()
+
+    assert [len(r) // 2 for r in client.requests] == [3, 3]
+    assert indexer.stats.indexed == 6
+    await indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_interval():
+    client = FakeElasticsearch()
+    indexer = BulkIndexer(client, max_batch_size=100, flush_interval=0.05)
+
+    indexer.submit_nowait(_action(1))
+    await asyncio.sleep(0.2)
+
+    assert len(client.requests) == 1
+    await indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_only_rejected_items():
+    client = FakeElasticsearch(statuses=[[201, 429, 400], [201]])
+    indexer = BulkIndexer(client, max_batch_size=3, retry_backoff=0)
+
+    for n in range(3):
+        await indexer.submit(_action(n))
+    await indexer.flush()
+
+    assert len(client.requests) == 2
+    assert client.requests[1][1] == {"message": "entry 1"}
+    assert indexer.stats.indexed == 2
+    assert indexer.stats.failed == 1
+    assert indexer.stats.retried == 1
+    await indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    client = FakeElasticsearch(failures=10)
+    indexer = BulkIndexer(client, max_retries=2, retry_backoff=0)
+
+    await indexer.submit(_action(1))
+    await indexer.flush()
+
+    assert indexer.stats.failed == 1
+    assert indexer.stats.retried == 2
+    await indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_nowait_sheds_load_when_queue_is_full():
+    indexer = BulkIndexer(FakeElasticsearch(), max_queue_size=2, flush_interval=60)
+
+    accepted = [indexer.submit_nowait(_action(n)) for n in range(4)]
+
+    assert accepted == [True, True, False, False]
+    assert indexer.stats.dropped == 2
+    await indexer.close()
+
+
+@pytest.fixture
+def service():
+    with patch.object(search_service, "Elasticsearch") as client_cls:
+        client_cls.return_value = MagicMock()
+        yield search_service.SearchService(host="localhost:9200")
+
+
+@pytest.mark.asyncio
+async def test_index_methods_feed_the_bulk_indexer(service):
+    assert service.index_log({"message": "hello"})
+    assert service.index_execution("exec-1", {"status": "completed"})
+    assert service.index_workflow("wf-1", {"name": "Workflow"})
+    service.client.index.assert_not_called()
+
+    service.client.bulk.return_value = {"errors": False, "items": []}
+    await service.close()
+
+    operations = service.client.bulk.call_args.kwargs["operations"]
+    headers = [op["index"] for op in operations[::2]]
+    assert headers == [
+        {"_index": "logs"},
+        {"_index": "executions", "_id": "exec-1"},
+        {"_index": "workflows", "_id": "wf-1"},
+    ]
+
+
+def test_index_log_without_event_loop_writes_directly(service):
+    assert service.index_log({"message": "hello"})
+    service.client.index.assert_called_once()
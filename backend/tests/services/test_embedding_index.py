@@ -0,0 +1,137 @@
+"""Tests for the in-process embedding similarity index"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from app.services.embedding_index import (
+    EmbeddingMatrixIndex,
+    IndexedEmbedding,
+    approximate_similar_pairs,
+    connected_components,
+    leader_clusters,
+    leader_clusters_from_pairs,
+    mean_pairwise_similarity,
+    similar_pairs,
+    stack_normalized,
+)
+
+
+def _record():
+    return IndexedEmbedding(
+        embedding_id=uuid4(), item_id=uuid4(), item_type="ticket", content_hash="x"
+    )
+
+
+def _brute_force(vectors, query):
+    return [
+        float(np.dot(v, query) / (np.linalg.norm(v) * np.linalg.norm(query)))
+        for v in vectors
+    ]
+
+
+class TestEmbeddingMatrixIndex:
+    def test_search_matches_brute_force_top_k(self):
+        rng = np.random.default_rng(7)
+        vectors = rng.normal(size=(500, 32)).tolist()
+        records = [_record() for _ in vectors]
+        index = EmbeddingMatrixIndex()
+        index.bulk_load(records, vectors)
+
+        query = rng.normal(size=32).tolist()
+        matches = index.search(query, limit=5)
+
+        expected = np.argsort(_brute_force(vectors, query))[::-1][:5]
+        assert [m.record for m in matches] == [records[i] for i in expected]
+        assert matches[0].similarity_score >= matches[-1].similarity_score
+
+    def test_threshold_filters_results(self):
+        index = EmbeddingMatrixIndex()
+        close, far = _record(), _record()
+        index.upsert(close, [1.0, 0.1])
+        index.upsert(far, [-1.0, 0.0])
+
+        matches = index.search([1.0, 0.0], limit=10, threshold=0.8)
+
+        assert [m.record for m in matches] == [close]
+
+    def test_incremental_upsert_and_remove(self):
+        index = EmbeddingMatrixIndex(initial_capacity=2)
+        records = [_record() for _ in range(5)]
+        for i, record in enumerate(records):
+            vector = [0.0] * 5
+            vector[i] = 1.0
+            index.upsert(record, vector)
+
+        assert len(index) == 5
+        assert index.remove(records[1].embedding_id)
+        assert records[1].embedding_id not in index
+
+        # The row moved into the freed slot must still be found
+        assert index.search([0, 0, 0, 0, 1.0], limit=1)[0].record == records[4]
+
+        index.upsert(records[4], [1.0, 0, 0, 0, 0])
+        top = index.search([1.0, 0, 0, 0, 0], limit=2, threshold=0.99)
+        assert {m.record.embedding_id for m in top} == {
+            records[0].embedding_id,
+            records[4].embedding_id,
+        }
+
+    def test_dimension_mismatch_is_ignored(self):
+        index = EmbeddingMatrixIndex()
+        index.upsert(_record(), [1.0, 0.0])
+
+        assert not index.upsert(_record(), [1.0, 0.0, 0.0])
+        assert index.search([1.0, 0.0, 0.0]) == []
+        assert len(index) == 1
+
+
+class TestBulkSimilarity:
+    def _vectors(self):
+        rng = np.random.default_rng(3)
+        centers = rng.normal(size=(4, 64))
+        noisy = [c + rng.normal(scale=0.05, size=(25, 64)) for c in centers]
+        vectors, _ = stack_normalized(np.vstack(noisy).tolist())
+        return vectors
+
+    def test_blocked_pairs_match_full_matrix(self):
+        vectors = self._vectors()
+        left, right, scores = similar_pairs(vectors, 0.9, memory_budget_bytes=4096)
+
+        full = vectors @ vectors.T
+        expected = {
+            (i, j)
+            for i in range(len(vectors))
+            for j in range(i + 1, len(vectors))
+            if full[i, j] >= 0.9
+        }
+        assert set(zip(left.tolist(), right.tolist())) == expected
+        assert np.all(scores >= 0.9)
+
+    def test_leader_and_connected_clusters(self):
+        vectors = self._vectors()
+
+        leaders = leader_clusters(vectors, 0.9, memory_budget_bytes=4096)
+        left, right, _ = similar_pairs(vectors, 0.9)
+        components = connected_components(len(vectors), left, right)
+
+        expected = [list(range(k * 25, (k + 1) * 25)) for k in range(4)]
+        assert sorted(map(sorted, leaders)) == expected
+        assert sorted(map(sorted, components)) == expected
+        assert leader_clusters_from_pairs(len(vectors), left, right) == leaders
+
+    def test_lsh_finds_near_duplicates(self):
+        vectors = self._vectors()
+        exact_left, _, _ = similar_pairs(vectors, 0.95)
+        left, right, _ = approximate_similar_pairs(vectors, 0.95)
+
+        # Candidates are verified exactly, so there are no false positives
+        assert len(left) <= len(exact_left)
+        assert len(left) >= 0.9 * len(exact_left)
+
+    def test_mean_pairwise_similarity(self):
+        vectors = self._vectors()
+        full = vectors.astype(np.float64) @ vectors.T.astype(np.float64)
+        upper = full[np.triu_indices(len(vectors), k=1)]
+
+        assert mean_pairwise_similarity(vectors) == pytest.approx(upper.mean())
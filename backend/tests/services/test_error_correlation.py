@@ -0,0 +1,141 @@
+"""Tests for incremental error correlation."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.services.correlation_index import CorrelationIndex, MinHasher, jaccard
+from app.services.error_correlation import (
+    CorrelationPattern,
+    ErrorCorrelationService,
+    SystemError,
+    SystemType,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _error(error_id, system, message, code="ERR", category="system", age=0):
+    return SystemError(
+        id=error_id,
+        system=system,
+        timestamp=datetime.utcnow() - timedelta(seconds=age),
+        category=category,
+        severity="medium",
+        message=message,
+        code=code,
+        context={},
+    )
+
+
+class TestCorrelationIndex:
+    def test_similar_messages_matches_exact_jaccard(self):
+        index = CorrelationIndex()
+        base = "upstream model gateway returned status 502 for request"
+        index.add(_error("a", SystemType.RELAYCORE, base))
+        index.add(_error("b", SystemType.AUTMATRIX, base + " retry"))
+        index.add(_error("c", SystemType.NEUROWEAVER, "disk quota exceeded on node"))
+
+        similar = index.similar_messages("a", 0.7)
+
+        assert [entry.error_id for entry in similar] == ["b"]
+        assert jaccard(index.get("a").tokens, similar[0].tokens) > 0.7
+
+    def test_minhash_estimates_jaccard(self):
+        hasher = MinHasher(num_perm=256, bands=64)
+        words1 = {f"w{i}" for i in range(40)}
+        words2 = {f"w{i}" for i in range(10, 50)}
+        sig1, sig2 = hasher.signature(words1), hasher.signature(words2)
+
+        estimate = sum(a == b for a, b in zip(sig1, sig2)) / hasher.num_perm
+
+        assert estimate == pytest.approx(30 / 50, abs=0.1)
+
+    def test_signal_and_code_buckets_exclude_expired_errors(self):
+        index = CorrelationIndex(window=timedelta(minutes=5), bucket_seconds=30)
+        index.add(_error("old", SystemType.AUTMATRIX, "database timeout", age=900))
+        index.add(_error("new", SystemType.RELAYCORE, "database timeout", age=5))
+
+        assert [e.error_id for e in index.with_signal("dependency")] == ["new"]
+        assert [e.error_id for e in index.with_code("ERR")] == ["new"]
+
+        assert index.expire() == 1
+        assert "old" not in index
+        assert len(index) == 1
+
+    def test_earliest_per_system_and_replacement(self):
+        index = CorrelationIndex()
+        index.add(_error("x", SystemType.AUTMATRIX, "first", age=60))
+        index.add(_error("y", SystemType.AUTMATRIX, "second", age=30))
+        assert index.earliest("autmatrix").error_id == "x"
+
+        # Re-adding an id replaces the earlier entry
+        index.add(_error("x", SystemType.AUTMATRIX, "first", age=0))
+        assert index.earliest("autmatrix").error_id == "y"
+        assert len(index) == 2
+
+    def test_max_errors_evicts_oldest(self):
+        index = CorrelationIndex(max_errors=3)
+        for i in range(5):
+            index.add(_error(f"e{i}", SystemType.AUTMATRIX, f"message {i}"))
+
+        assert len(index) == 3
+        assert "e0" not in index and "e1" not in index
+        assert [e.error_id for e in index.with_code("ERR")] == ["e2", "e3", "e4"]
+
+
+class TestErrorCorrelationService:
+    @pytest.fixture
+    def service(self):
+        client = fakeredis.aioredis.FakeRedis()
+        return ErrorCorrelationService(client)
+
+    async def test_common_root_cause_across_systems(self, service):
+        message = "upstream provider rejected the request payload schema"
+        await service._trigger_correlation_analysis(
+            _error("r1", SystemType.RELAYCORE, message, code="A")
+        )
+        new_error = _error("m1", SystemType.AUTMATRIX, message + " again", code="B")
+        service.index.add(new_error)
+
+        correlations = await service._analyze_correlations(new_error)
+        common = [
+            c for c in correlations if c.pattern == CorrelationPattern.COMMON_ROOT_CAUSE
+        ]
+
+        assert len(common) == 1
+        assert common[0].error_ids == ["r1", "m1"]
+        assert common[0].affected_systems == {
+            SystemType.RELAYCORE,
+            SystemType.AUTMATRIX,
+        }
+
+    async def test_single_error_does_not_correlate_with_itself(self, service):
+        new_error = _error("n1", SystemType.RELAYCORE, "database connection timeout")
+        service.index.add(new_error)
+
+        correlations = await service._analyze_correlations(new_error)
+
+        assert correlations == []
+
+    async def test_sync_pulls_only_unindexed_errors_from_redis(self, service):
+        other = ErrorCorrelationService(service.redis)
+        for i, system in enumerate(SystemType):
+            await other._store_error_in_redis(
+                _error(f"s{i}", system, f"network unreachable {i}")
+            )
+        service.index.add(_error("s0", SystemType.AUTMATRIX, "network unreachable 0"))
+
+        added = await service._sync_index_from_redis(force=True)
+
+        assert added == 2
+        assert all(f"s{i}" in service.index for i in range(3))
+        assert service.index.get("s1").error.system == SystemType.RELAYCORE
+
+    async def test_sync_is_rate_limited(self, service):
+        await service._sync_index_from_redis()
+        await service._store_error_in_redis(
+            _error("late", SystemType.NEUROWEAVER, "model load failed")
+        )
+
+        assert await service._sync_index_from_redis() == 0
+        assert await service._sync_index_from_redis(force=True) == 1
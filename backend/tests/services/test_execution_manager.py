@@ -0,0 +1,127 @@
+"""Tests for the execution manager and its indexed execution store"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from app.services.execution_manager import (
+    ExecutionManager,
+    ExecutionMetrics,
+    ExecutionStatus,
+    ExecutionType,
+)
+
+
+async def _start(manager, user_id, parent=None, execution_type=ExecutionType.TOOL_CALL):
+    return await manager.start_execution(
+        execution_type=execution_type,
+        target_id="target",
+        target_name="Target",
+        user_id=user_id,
+        parent_execution_id=parent,
+    )
+
+
+class TestExecutionStore:
+    """Test indexed lookups and listing"""
+
+    @pytest.mark.asyncio
+    async def test_list_executions_newest_first_with_filters(self):
+        manager = ExecutionManager()
+        alice, bob = uuid4(), uuid4()
+
+        ids = [await _start(manager, alice if i % 2 else bob) for i in range(6)]
+        await manager.complete_execution(ids[1], {"ok": True})
+        await manager.fail_execution(ids[3], {"error": "boom"})
+
+        alice_ids = [e.id for e in manager.list_executions(user_id=alice, limit=2)]
+        assert alice_ids == [ids[5], ids[3]]
+
+        completed = manager.list_executions(status=ExecutionStatus.COMPLETED)
+        assert [e.id for e in completed] == [ids[1]]
+
+        pending = manager.list_executions(user_id=bob, status=ExecutionStatus.PENDING)
+        assert [e.id for e in pending] == [ids[4], ids[2], ids[0]]
+
+        assert manager.get_execution(ids[3]).status == ExecutionStatus.FAILED
+        assert manager.get_execution(uuid4()) is None
+
+    @pytest.mark.asyncio
+    async def test_child_executions(self):
+        manager = ExecutionManager()
+        user_id = uuid4()
+        parent = await _start(manager, user_id, execution_type=ExecutionType.BATCH)
+        children = [await _start(manager, user_id, parent=parent) for _ in range(3)]
+        await _start(manager, user_id)
+
+        assert {e.id for e in manager.get_child_executions(parent)} == set(children)
+
+
+class TestRetention:
+    """Test age- and count-based eviction of finished executions"""
+
+    @pytest.mark.asyncio
+    async def test_count_based_eviction_keeps_active(self):
+        manager = ExecutionManager(max_history=2)
+        user_id = uuid4()
+
+        active = await _start(manager, user_id)
+        finished = []
+        for _ in range(4):
+            execution_id = await _start(manager, user_id)
+            await manager.complete_execution(execution_id, {})
+            finished.append(execution_id)
+
+        assert manager.get_execution(active) is not None
+        assert [e.id for e in manager.execution_history] == finished[2:]
+        assert manager.get_system_stats()["historical_executions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_executions(self):
+        manager = ExecutionManager(history_retention=timedelta(days=365))
+        user_id = uuid4()
+
+        old = await _start(manager, user_id)
+        manager.get_execution(old).created_at = datetime.utcnow() - timedelta(days=40)
+        await manager.complete_execution(old, {})
+        recent = await _start(manager, user_id)
+        await manager.complete_execution(recent, {})
+
+        assert manager.cleanup_old_executions(days_to_keep=30) == 1
+        assert manager.get_execution(old) is None
+        assert manager.list_executions(user_id=user_id)[0].id == recent
+
+    @pytest.mark.asyncio
+    async def test_age_based_eviction_on_completion(self):
+        manager = ExecutionManager(history_retention=timedelta(days=1))
+        user_id = uuid4()
+
+        stale = await _start(manager, user_id)
+        manager.get_execution(stale).created_at = datetime.utcnow() - timedelta(days=2)
+        await manager.complete_execution(stale, {})
+
+        assert manager.get_execution(stale) is None
+
+
+class TestPerformanceStats:
+    """Test duration percentiles recorded on completion"""
+
+    @pytest.mark.asyncio
+    async def test_stats_cover_all_executions(self):
+        manager = ExecutionManager()
+        user_id = uuid4()
+
+        for duration in range(1, 201):
+            execution_id = await _start(manager, user_id)
+            execution = manager.get_execution(execution_id)
+            execution.metrics = ExecutionMetrics(
+                start_time=execution.created_at, duration_ms=duration
+            )
+            await manager._update_performance_cache(execution)
+
+        stats = manager.get_performance_stats("target", ExecutionType.TOOL_CALL)
+
+        assert stats["total_executions"] == 200
+        assert stats["min_duration_ms"] == 1
+        assert stats["max_duration_ms"] == 200
+        assert stats["p99_duration_ms"] == pytest.approx(198, rel=0.02)
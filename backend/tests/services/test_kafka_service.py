@@ -0,0 +1,231 @@
+"""Tests for batched, non-blocking Kafka event publishing."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app.services.kafka_service import KafkaService
+
+
+class FakeFuture:
+    def __init__(self):
+        self.callbacks = []
+        self.errbacks = []
+
+    def add_callback(self, fn, *args):
+        self.callbacks.append((fn, args))
+        return self
+
+    def add_errback(self, fn, *args):
+        self.errbacks.append((fn, args))
+        return self
+
+
+class FakeBroker:
+    """Stand-in for a Kafka cluster: records what producers send and acks
+    (or rejects) it when the producer flushes."""
+
+    def __init__(self, send_delay=0.0, failing_topics=()):
+        self.send_delay = send_delay
+        self.failing_topics = set(failing_topics)
+        self.config = None
+        self.messages = []
+        self.send_threads = set()
+        self.flushes = 0
+        self.closed = False
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def producer(self, **config):
+        self.config = config
+        return FakeProducer(self)
+
+
+class FakeProducer:
+    def __init__(self, broker):
+        self.broker = broker
+        self.serialize = broker.config["value_serializer"]
+
+    def send(self, topic, value):
+        broker = self.broker
+        broker.send_threads.add(threading.get_ident())
+        time.sleep(broker.send_delay)
+        future = FakeFuture()
+        with broker._lock:
+            broker._pending.append((topic, self.serialize(value), future))
+        return future
+
+    def flush(self, timeout=None):
+        broker = self.broker
+        with broker._lock:
+            pending, broker._pending = broker._pending, []
+        for topic, payload, future in pending:
+            if topic in broker.failing_topics:
+                for fn, args in future.errbacks:
+                    fn(*args, RuntimeError("broker rejected"))
+            else:
+                broker.messages.append((topic, payload))
+                for fn, args in future.callbacks:
+                    fn(*args, {"topic": topic})
+        broker.flushes += 1
+
+    def close(self, timeout=None):
+        self.flush()
+        self.broker.closed = True
+
+
+@pytest.mark.asyncio
+async def test_publish_is_buffered_and_flushed_on_close():
+    broker = FakeBroker()
+    deliveries = []
+    service = KafkaService(
+        producer_factory=broker.producer,
+        on_delivery=lambda topic, event, error: deliveries.append((topic, error)),
+    )
+
+    for n in range(5):
+        assert await service.publish_event("events", {"n": n})
+    await service.publish_workflow_event("wf-1", "started", {"timestamp": "now"})
+    await service.close()
+
+    assert broker.config["linger_ms"] == 20
+    assert broker.config["compression_type"] == "gzip"
+    assert len(broker.messages) == 6
+    assert broker.messages[-1][0] == "workflow-events"
+    assert b'"workflow_id": "wf-1"' in broker.messages[-1][1]
+    assert deliveries == [("events", None)] * 5 + [("workflow-events", None)]
+    assert broker.closed
+    assert service.get_stats()["delivered"] == 6
+
+
+@pytest.mark.asyncio
+async def test_slow_broker_does_not_block_event_loop():
+    broker = FakeBroker(send_delay=0.05)
+    service = KafkaService(producer_factory=broker.producer)
+
+    started = time.monotonic()
+    for n in range(10):
+        await service.publish_event("events", {"n": n})
+    publish_time = time.monotonic() - started
+
+    ticks = 0
+    while service.get_stats()["sent"] < 10:
+        await asyncio.sleep(0.01)
+        ticks += 1
+    await service.close()
+
+    assert publish_time < 0.05
+    assert ticks > 10  # the loop kept running while sends were in flight
+    assert threading.get_ident() not in broker.send_threads
+    assert len(broker.messages) == 10
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_applies_backpressure_or_drops():
+    broker = FakeBroker(send_delay=0.02)
+    service = KafkaService(
+        producer_factory=broker.producer, max_buffer_size=2, max_batch_events=1
+    )
+
+    await asyncio.gather(*(service.publish_event("events", {"n": n}) for n in range(6)))
+    results = [service.publish_event_nowait("events", {"n": n}) for n in range(5)]
+    await service.close()
+
+    assert results.count(False) >= 1
+    stats = service.get_stats()
+    assert stats["dropped"] == results.count(False)
+    assert len(broker.messages) == stats["queued"] == 6 + results.count(True)
+
+
+@pytest.mark.asyncio
+async def test_delivery_failures_reported_and_periodic_flush():
+    broker = FakeBroker(failing_topics={"bad"})
+    errors = []
+    service = KafkaService(
+        producer_factory=broker.producer,
+        flush_interval=0.05,
+        on_delivery=lambda topic, event, error: error and errors.append(topic),
+    )
+
+    await service.publish_event("good", {"n": 1})
+    await service.publish_event("bad", {"n": 2})
+    for _ in range(100):
+        if service.get_stats()["flushes"]:
+            break
+        await asyncio.sleep(0.01)
+
+    # Flushed by the idle timer, before any explicit flush
+    assert service.get_stats()["flushes"] >= 1
+    assert errors == ["bad"]
+    assert broker.messages == [("good", b'{"n": 1}')]
+    await service.close()
+    assert service.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_broker_counts_failures():
+    def unavailable(**config):
+        raise ConnectionError("no brokers")
+
+    service = KafkaService(producer_factory=unavailable)
+    await service.publish_event("events", {"n": 1})
+    await service.close()
+
+    assert service.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_idle_flush_keeps_worker_running():
+    broker = FakeBroker()
+    service = KafkaService(producer_factory=broker.producer, flush_interval=0.05)
+    await service.publish_event("events", {"n": 1})
+    await asyncio.sleep(0.01)
+    producer = service.producer
+    flush = producer.flush
+
+    def timed_out(timeout=None):
+        raise TimeoutError("flush timed out")
+
+    producer.flush = timed_out
+
+    for _ in range(100):
+        if service.get_stats()["flush_failures"]:
+            break
+        await asyncio.sleep(0.01)
+
+    assert service.get_stats()["flush_failures"] >= 1
+    assert not service._worker.done()
+
+    producer.flush = flush
+    await service.publish_event("events", {"n": 2})
+    await service.close()
+    assert len(broker.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_flushes_do_not_lose_the_unflushed_count():
+    broker = FakeBroker()
+    service = KafkaService(producer_factory=broker.producer, flush_interval=60)
+    for n in range(3):
+        await service.publish_event("events", {"n": n})
+    while service.get_stats()["sent"] < 3:
+        await asyncio.sleep(0.01)
+
+    release = threading.Event()
+    flush = service.producer.flush
+
+    def slow_flush(timeout=None):
+        release.wait(5)
+        flush(timeout)
+
+    service.producer.flush = slow_flush
+    flushes = [asyncio.to_thread(service._flush_producer) for _ in range(2)]
+    gathered = asyncio.gather(*flushes)
+    await asyncio.sleep(0.05)
+    release.set()
+    await gathered
+
+    assert service._unflushed == 0
+    assert len(broker.messages) == 3
+    await service.close()
@@ -0,0 +1,225 @@
+"""Tests for the Redis message queue."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from app.services import message_queue
+from app.services.message_queue import MessageQueue, MessageStatus
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    """FakeRedis that counts round trips (commands, pipelines, scripts)."""
+
+    round_trips = 0
+
+    def execute_command(self, *args, **options):
+        CountingRedis.round_trips += 1
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        def counted_execute(*args, **kwargs):
+            CountingRedis.round_trips += 1
+            return execute(*args, **kwargs)
+
+        pipe.execute = counted_execute
+        return pipe
+
+
+@pytest.fixture
+def queue():
+    server = fakeredis.FakeServer()
+    client = CountingRedis(server=server, decode_responses=True)
+    with patch.object(message_queue.redis, "from_url", return_value=client):
+        mq = MessageQueue(redis_url="redis://fake")
+    # Load scripts up front so EVALSHA never falls back to SCRIPT LOAD
+    for name in ("_dequeue_script", "_nack_script", "_promote_script"):
+        client.script_load(getattr(mq, name).script)
+    CountingRedis.round_trips = 0
+    return mq
+
+
+def _round_trips(action):
+    CountingRedis.round_trips = 0
+    result = action()
+    return result, CountingRedis.round_trips
+
+
+def test_enqueue_dequeue_ack_round_trips(queue):
+    message_id, trips = _round_trips(lambda: queue.enqueue("jobs", {"n": 1}))
+    assert trips == 1
+
+    message, trips = _round_trips(lambda: queue.dequeue("jobs"))
+    assert message.id == message_id
+    assert message.status == MessageStatus.PROCESSING
+    assert trips == 1
+    assert queue.get_message(message_id).status == MessageStatus.PROCESSING
+
+    acked, trips = _round_trips(lambda: queue.ack(message))
+    assert acked and trips == 1
+    assert queue.get_queue_stats("jobs") == {
+        "pending": 0,
+        "processing": 0,
+        "dead_letter": 0,
+    }
+    assert not queue.ack(message)
+
+
+def test_enqueue_many_and_dequeue_many_are_fifo(queue):
+    ids, trips = _round_trips(
+        lambda: queue.enqueue_many("jobs", [{"n": n} for n in range(5)])
+    )
+    assert trips == 1
+
+    messages, trips = _round_trips(lambda: queue.dequeue_many("jobs", 3))
+    assert [m.id for m in messages] == ids[:3]
+    assert trips == 1
+    assert [m.id for m in queue.dequeue_many("jobs", 10)] == ids[3:]
+    assert queue.dequeue_many("jobs", 10) == []
+
+
+def test_dequeue_marks_processing_without_touching_payload(queue):
+    payload = {"status": "pending", "tags": [], "ratio": 0.1, "nested": {}}
+    message_id = queue.enqueue("jobs", payload)
+
+    message = queue.dequeue_many("jobs", 1)[0]
+
+    stored = queue.get_message(message_id)
+    assert stored.status == MessageStatus.PROCESSING
+    assert stored.payload == payload == message.payload
+    ttl = queue.redis_client.ttl(queue._get_message_key(message_id))
+    assert 0 < ttl <= queue.processing_timeout
+
+
+def test_expired_message_is_skipped_on_dequeue(queue):
+    first = queue.enqueue("jobs", {"n": 1})
+    second = queue.enqueue("jobs", {"n": 2})
+    queue.redis_client.delete(queue._get_message_key(first))
+
+    assert [m.id for m in queue.dequeue_many("jobs", 2)] == [second]
+    assert queue.get_queue_stats("jobs")["processing"] == 1
+
+
+def test_nack_schedules_retry_then_dead_letters(queue):
+    queue.enqueue("jobs", {"n": 1}, max_retries=1)
+    message = queue.dequeue("jobs")
+
+    assert queue.nack(message, "boom")
+    assert message.retry_count == 1
+    assert message.status == MessageStatus.PENDING
+    assert not queue.nack(message, "again")  # no longer processing
+
+    with patch.object(message_queue.time, "time", return_value=time.time() + 10):
+        assert queue.process_scheduled_messages() == 1
+
+    message = queue.dequeue("jobs")
+    assert message.retry_count == 1
+    assert queue.nack(message, "boom")
+    assert message.status == MessageStatus.DEAD_LETTER
+    assert queue.get_queue_stats("jobs")["dead_letter"] == 1
+
+
+def test_scheduled_messages_promoted_in_batches(queue):
+    queue.promote_batch_size = 2
+    queue.enqueue_many("jobs", [{"n": n} for n in range(5)], delay_seconds=1)
+    expired = queue.enqueue("jobs", {"n": 5}, delay_seconds=1, ttl_seconds=60)
+    message = queue.get_message(expired)
+    message.expires_at = message.created_at.replace(year=2000)
+    queue.redis_client.set(queue._get_message_key(expired), message.model_dump_json())
+
+    with patch.object(message_queue.time, "time", return_value=time.time() + 5):
+        assert queue.process_scheduled_messages() == 5
+
+    assert queue.get_queue_stats("jobs")["pending"] == 5
+    assert queue.get_message(expired) is None
+
+
+def test_recover_stale_messages_uses_processing_start(queue):
+    queue.enqueue_many("jobs", [{"n": 1}, {"n": 2}])
+    stale, fresh = queue.dequeue_many("jobs", 2)
+    queue.redis_client.zadd(
+        queue._get_processing_started_key("jobs"),
+        {stale.id: time.time() - queue.processing_timeout - 1},
+    )
+
+    assert queue.recover_stale_messages() == 1
+
+    recovered = queue.get_message(stale.id)
+    assert recovered.retry_count == 1
+    assert recovered.error_message == "Processing timeout exceeded"
+    assert queue.get_queue_stats("jobs")["processing"] == 1
+    assert queue.ack(fresh)
+
+
+def test_purge_queue(queue):
+    queue.enqueue_many("jobs", [{"n": n} for n in range(3)])
+    queue.dequeue("jobs")
+
+    assert queue.purge_queue("jobs") == 3
+    assert queue.get_queue_stats("jobs") == {
+        "pending": 0,
+        "processing": 0,
+        "dead_letter": 0,
+    }
+
+
+def test_high_priority_served_first_without_starving_low(queue):
+    backfill = queue.enqueue_many("jobs", [{"n": n} for n in range(20)])
+    interactive = queue.enqueue_many("jobs", [{"n": n} for n in range(20)], priority=10)
+    assert queue.get_lane_stats("jobs")[10] == 20
+    assert queue.get_queue_stats("jobs")["pending"] == 40
+
+    served = [m.id for m in queue.dequeue_many("jobs", 12)]
+    # Weights 11:1 - interactive dominates but backfill keeps moving
+    assert [i for i in served if i in interactive] == interactive[:11]
+    assert [i for i in served if i in backfill] == backfill[:1]
+
+    served += [m.id for m in queue.dequeue_many("jobs", 28)]
+    assert [i for i in served if i in interactive] == interactive
+    assert [i for i in served if i in backfill] == backfill
+
+
+def test_custom_lane_weights(queue):
+    queue.lane_weights = [(p, 1) for p, _ in queue.lane_weights]
+    low = queue.enqueue_many("jobs", [{"n": n} for n in range(3)], priority=1)
+    high = queue.enqueue_many("jobs", [{"n": n} for n in range(3)], priority=5)
+
+    served = [m.id for m in queue.dequeue_many("jobs", 6)]
+    assert served == [high[0], low[0], high[1], low[1], high[2], low[2]]
+
+
+def test_priority_survives_delay_and_retry(queue):
+    queue.enqueue_many("jobs", [{"n": n} for n in range(5)])
+    urgent = queue.enqueue("jobs", {"n": "urgent"}, priority=9, delay_seconds=1)
+
+    with patch.object(message_queue.time, "time", return_value=time.time() + 5):
+        queue.process_scheduled_messages()
+    assert queue.get_lane_stats("jobs")[9] == 1
+
+    message = queue.dequeue("jobs")
+    assert message.id == urgent
+    queue.nack(message, "boom")
+
+    with patch.object(message_queue.time, "time", return_value=time.time() + 10):
+        queue.process_scheduled_messages()
+    assert queue.get_lane_stats("jobs")[9] == 1
+    assert queue.dequeue("jobs").id == urgent
+
+
+def test_blocking_dequeue_wakes_on_enqueue(queue):
+    assert queue.dequeue("jobs", timeout=0) is None
+
+    timer = threading.Timer(0.05, queue.enqueue, args=("jobs", {"n": 1}))
+    timer.start()
+    started = time.monotonic()
+    message = queue.dequeue("jobs", timeout=5)
+    timer.join()
+
+    assert message.payload == {"n": 1}
+    assert time.monotonic() - started < 2
@@ -0,0 +1,145 @@
+"""Tests for the RelayCore HTTP client."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.exceptions import AIServiceError
+from app.services.relaycore_client import RelayCoreAIService, RelayCoreClient
+
+
+@pytest.fixture
+async def relaycore_server():
+    """Local stand-in for RelayCore that records peers and request counts."""
+    state = {"chat_calls": 0, "batch_sizes": [], "peers": set(), "delay": 0.0}
+
+    async def chat(request):
+        state["chat_calls"] += 1
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        await asyncio.sleep(state["delay"])
+        return web.json_response(
+            {"success": True, "data": {"content": body["prompt"].upper()}}
+        )
+
+    async def batch(request):
+        body = await request.json()
+        state["batch_sizes"].append(len(body["requests"]))
+        results = [
+            (
+                {"error": "rejected"}
+                if item["prompt"] == "bad"
+                else {"content": item["prompt"].upper(), "provider": "test"}
+            )
+            for item in body["requests"]
+        ]
+        return web.json_response({"success": True, "data": {"results": results}})
+
+    async def health(request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/ai/chat", chat)
+    app.router.add_post("/api/v1/ai/batch", batch)
+    app.router.add_get("/health", health)
+
+    server = TestServer(app)
+    await server.start_server()
+    state["url"] = str(server.make_url("")).rstrip("/")
+    yield state
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connection(relaycore_server):
+    async with RelayCoreClient(base_url=relaycore_server["url"]) as client:
+        assert await client.health_check()
+        for _ in range(3):
+            result = await client.chat_completion("hello")
+            assert result.content == "HELLO"
+
+    # Sequential requests ride on one keep-alive connection
+    assert len(relaycore_server["peers"]) == 1
+    assert client._session is None
+
+
+@pytest.mark.asyncio
+async def test_session_from_finished_loop_is_released():
+    client = RelayCoreClient(base_url="http://127.0.0.1:9")
+    # Created on a loop that asyncio.run then closes
+    old = await asyncio.to_thread(asyncio.run, client._get_session())
+    connector = old.connector
+
+    new = await client._get_session()
+
+    assert new is not old
+    assert old.closed
+    assert connector.closed
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_are_coalesced(relaycore_server):
+    relaycore_server["delay"] = 0.05
+
+    async with RelayCoreClient(
+        base_url=relaycore_server["url"], coalesce_requests=True
+    ) as client:
+        results = await asyncio.gather(
+            *(client.chat_completion("same") for _ in range(5)),
+            client.chat_completion("other"),
+        )
+
+    assert [r.content for r in results] == ["SAME"] * 5 + ["OTHER"]
+    assert relaycore_server["chat_calls"] == 2
+    assert client._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_requests_not_coalesced_by_default(relaycore_server):
+    async with RelayCoreClient(base_url=relaycore_server["url"]) as client:
+        await asyncio.gather(*(client.chat_completion("same") for _ in range(3)))
+
+    assert relaycore_server["chat_calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batching_fans_results_back_out(relaycore_server):
+    client = RelayCoreClient(base_url=relaycore_server["url"], max_retries=0)
+    service = RelayCoreAIService(
+        relaycore_client=client, enable_fallback=False, enable_batching=True
+    )
+
+    prompts = [f"step {n}" for n in range(10)] + ["bad"]
+    results = await asyncio.gather(
+        *(service.process_text(prompt) for prompt in prompts),
+        return_exceptions=True,
+    )
+    await service.close()
+
+    assert [r["content"] for r in results[:10]] == [p.upper() for p in prompts[:10]]
+    assert isinstance(results[10], AIServiceError)
+    assert relaycore_server["batch_sizes"] == [11]
+    assert relaycore_server["chat_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batcher_splits_on_max_size_and_sends_singles_to_chat(
+    relaycore_server,
+):
+    client = RelayCoreClient(base_url=relaycore_server["url"])
+    service = RelayCoreAIService(
+        relaycore_client=client,
+        enable_fallback=False,
+        enable_batching=True,
+        batch_max_size=4,
+    )
+
+    await asyncio.gather(*(service.process_text(f"p{n}") for n in range(9)))
+    await service.process_text("alone")
+    await service.close()
+
+    assert relaycore_server["batch_sizes"] == [4, 4]
+    assert relaycore_server["chat_calls"] == 2
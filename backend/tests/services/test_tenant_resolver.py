@@ -0,0 +1,180 @@
+"""Tests for cached tenant resolution."""
+
+import asyncio
+import uuid
+
+import pytest
+from app.middleware.tenant_middleware import TenantIsolationMiddleware
+from app.services.tenant_resolver import ResolvedTenant, TenantResolver
+
+
+class FakeTenantResolver(TenantResolver):
+    """Resolver backed by a dict instead of the database; counts loads."""
+
+    def __init__(self, tenants, users=None, **kwargs):
+        super().__init__(session_scope=None, **kwargs)
+        self.tenants = {tenant.id: tenant for tenant in tenants}
+        self.users = users or {}
+        self.loads = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def _record(self, kind, arg):
+        self.loads.append((kind, arg))
+        await asyncio.wait_for(self.gate.wait(), 1)
+
+    async def _load_by_slug(self, slug):
+        await self._record("slug", slug)
+        return next((t for t in self.tenants.values() if t.slug == slug), None)
+
+    async def _load_by_id(self, tenant_id):
+        await self._record("id", tenant_id)
+        return self.tenants.get(tenant_id)
+
+    async def _load_user_tenant_id(self, email):
+        await self._record("user", email)
+        return self.users.get(email)
+
+
+@pytest.fixture
+def acme():
+    return ResolvedTenant(id=uuid.uuid4(), slug="acme", status="active")
+
+
+class TestTenantResolver:
+    async def test_slug_lookup_also_caches_by_id(self, acme):
+        resolver = FakeTenantResolver([acme])
+
+        assert await resolver.get_by_slug("acme") == acme
+        assert await resolver.get_by_id(acme.id) == acme
+        assert await resolver.get_by_slug("acme") == acme
+
+        assert resolver.loads == [("slug", "acme")]
+
+    async def test_misses_are_cached_for_negative_ttl(self):
+        resolver = FakeTenantResolver([], negative_ttl=60)
+
+        assert await resolver.get_by_slug("nobody") is None
+        assert await resolver.get_by_slug("nobody") is None
+        assert len(resolver.loads) == 1
+
+        resolver.negative_ttl = 0
+        resolver.clear()
+        await resolver.get_by_slug("nobody")
+        await resolver.get_by_slug("nobody")
+        assert len(resolver.loads) == 3
+
+    async def test_entries_expire_after_ttl(self, acme):
+        resolver = FakeTenantResolver([acme], ttl=0)
+
+        await resolver.get_by_id(acme.id)
+        await resolver.get_by_id(acme.id)
+
+        assert len(resolver.loads) == 2
+
+    async def test_invalidate_picks_up_status_change(self, acme):
+        resolver = FakeTenantResolver([acme])
+        assert (await resolver.get_by_slug("acme")).is_active
+
+        suspended = ResolvedTenant(id=acme.id, slug="acme", status="suspended")
+        resolver.tenants[acme.id] = suspended
+        assert (await resolver.get_by_id(acme.id)).is_active  # still cached
+
+        resolver.invalidate(acme.id)
+
+        assert await resolver.get_by_id(acme.id) == suspended
+        assert await resolver.get_by_slug("acme") == suspended
+
+    async def test_concurrent_misses_share_one_load(self, acme):
+        resolver = FakeTenantResolver([acme])
+        resolver.gate.clear()
+
+        lookups = [asyncio.create_task(resolver.get_by_slug("acme")) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        resolver.gate.set()
+
+        assert await asyncio.gather(*lookups) == [acme] * 10
+        assert resolver.loads == [("slug", "acme")]
+
+    async def test_load_started_before_invalidate_is_not_cached(self, acme):
+        resolver = FakeTenantResolver([acme])
+        resolver.gate.clear()
+
+        lookup = asyncio.create_task(resolver.get_by_id(acme.id))
+        await asyncio.sleep(0.01)
+        resolver.invalidate(acme.id)
+        resolver.gate.set()
+        await lookup
+
+        await resolver.get_by_id(acme.id)
+        assert len(resolver.loads) == 2
+
+    async def test_cancelled_load_does_not_fail_waiters(self, acme):
+        resolver = FakeTenantResolver([acme])
+        resolver.gate.clear()
+
+        first = asyncio.create_task(resolver.get_by_id(acme.id))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(resolver.get_by_id(acme.id))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        resolver.gate.set()
+
+        assert await asyncio.wait_for(second, 1) == acme
+        assert first.cancelled()
+        assert resolver.loads == [("id", acme.id), ("id", acme.id)]
+
+    async def test_cancelled_waiter_does_not_cancel_load(self, acme):
+        resolver = FakeTenantResolver([acme])
+        resolver.gate.clear()
+
+        first = asyncio.create_task(resolver.get_by_id(acme.id))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(resolver.get_by_id(acme.id))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        resolver.gate.set()
+
+        assert await first == acme
+        assert second.cancelled()
+
+    async def test_user_tenant_lookup_is_cached(self, acme):
+        resolver = FakeTenantResolver([acme], users={"a@acme.io": acme.id})
+
+        assert await resolver.get_tenant_id_for_user("a@acme.io") == acme.id
+        assert await resolver.get_tenant_id_for_user("a@acme.io") == acme.id
+        assert resolver.loads == [("user", "a@acme.io")]
+
+    async def test_max_entries_evicts_oldest(self):
+        tenants = [
+            ResolvedTenant(id=uuid.uuid4(), slug=f"t{i}", status="active")
+            for i in range(3)
+        ]
+        resolver = FakeTenantResolver(tenants, max_entries=2)
+
+        for tenant in tenants:
+            await resolver.get_by_slug(tenant.slug)
+
+        assert len(resolver._entries) == 2
+
+
+class TestTenantMiddlewareHosts:
+    @pytest.mark.parametrize(
+        "host, expected",
+        [
+            ("acme.example.com", "acme"),
+            ("acme.example.com:8443", "acme"),
+            ("localhost", None),
+            ("localhost:8000", None),
+            ("app.localhost:3000", None),
+            ("127.0.0.1:8000", None),
+            ("10.0.0.5", None),
+            ("[::1]:8000", None),
+            ("", None),
+        ],
+    )
+    def test_subdomain_lookup_skips_ips_and_localhost(self, host, expected):
+        middleware = TenantIsolationMiddleware(app=None)
+
+        assert middleware._get_subdomain(host) == expected
@@ -0,0 +1,35 @@
+"""Tests for embedding generation in the vector duplicate service."""
+
+from unittest.mock import Mock, patch
+
+from app.services import vector_duplicate_service
+from app.services.vector_duplicate_service import VectorDuplicateService
+from app.services.vector_service import EMBEDDING_DIMENSIONS
+
+
+async def test_generate_embeddings_uses_one_batched_encode():
+    vectors = Mock()
+    vectors.embed_texts.return_value = [[0.1], [0.2], [0.3]]
+
+    with patch.object(
+        vector_duplicate_service, "get_vector_service", return_value=vectors
+    ):
+        service = VectorDuplicateService(Mock())
+        result = await service._generate_embeddings(["a", "b", "c"], batch_size=2)
+
+    assert result == [[0.1], [0.2], [0.3]]
+    vectors.embed_texts.assert_called_once_with(["a", "b", "c"], 2)
+
+
+async def test_generate_embeddings_falls_back_to_hash_vectors():
+    vectors = Mock()
+    vectors.embed_texts.side_effect = RuntimeError("encoder unavailable")
+
+    with patch.object(
+        vector_duplicate_service, "get_vector_service", return_value=vectors
+    ):
+        service = VectorDuplicateService(Mock())
+        result = await service._generate_embeddings(["a", "b"])
+
+    assert [len(vector) for vector in result] == [EMBEDDING_DIMENSIONS] * 2
+    assert result[0] != result[1]
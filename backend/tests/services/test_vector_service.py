@@ -0,0 +1,125 @@
+"""Tests for the Qdrant vector service."""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from app.services import vector_service
+from app.services.vector_service import VectorService
+from qdrant_client import QdrantClient
+
+
+class FakeEncoder:
+    """Deterministic stand-in for SentenceTransformer that records calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(text) for text in texts])
+
+    def _vector(self, text):
+        rng = np.random.default_rng(sum(text.encode()))
+        return rng.normal(size=384).astype(np.float32)
+
+
+@pytest.fixture
+def service():
+    with (
+        patch.object(vector_service, "QdrantClient") as client_cls,
+        patch.object(vector_service, "SentenceTransformer", return_value=FakeEncoder()),
+    ):
+        client_cls.return_value = Mock()
+        yield VectorService(host="localhost", port=6333)
+
+
+def test_embed_texts_encodes_distinct_texts_once(service):
+    vectors = service.embed_texts(["alpha", "beta", "alpha"])
+
+    assert len(vectors) == 3
+    assert vectors[0] == vectors[2]
+    assert service.encoder.calls == [["alpha", "beta"]]
+
+
+def test_embed_text_served_from_cache(service):
+    first = service.embed_texts(["alpha", "beta"])
+    assert service.embed_text("beta") == first[1]
+    assert len(service.encoder.calls) == 1
+
+
+def test_embedding_cache_is_bounded(service):
+    with patch.object(vector_service, "EMBEDDING_CACHE_SIZE", 2):
+        service.embed_texts(["a", "b", "c"])
+        assert len(service._embedding_cache) == 2
+
+        service.embed_text("a")
+        assert service.encoder.calls[-1] == ["a"]
+
+
+@pytest.fixture
+def local_service():
+    """Service backed by qdrant-client's in-process local mode."""
+    with (
+        patch.object(
+            vector_service, "QdrantClient", return_value=QdrantClient(":memory:")
+        ),
+        patch.object(vector_service, "SentenceTransformer", return_value=FakeEncoder()),
+    ):
+        yield VectorService(host="localhost", port=6333)
+
+
+def test_ensure_collection_is_memoized(service):
+    service.client.get_collections.return_value = Mock(collections=[])
+    service.client.get_collections.reset_mock()
+
+    service.store_vector("contexts", "alpha", {})
+    service.store_vector("contexts", "beta", {})
+
+    assert service.client.get_collections.call_count == 1
+    service.client.create_collection.assert_called_once()
+
+
+def test_store_vectors_batch_chunks_and_waits_on_last(service):
+    items = [{"text": f"text {i}", "metadata": {"n": i}} for i in range(5)]
+
+    ids = service.store_vectors_batch("contexts", items, batch_size=2)
+
+    assert len(ids) == 5
+    calls = service.client.upsert.call_args_list
+    assert [len(call.kwargs["points"]) for call in calls] == [2, 2, 1]
+    assert [call.kwargs["wait"] for call in calls] == [False, False, True]
+    assert len(service.encoder.calls) == 1
+
+
+def test_batch_store_and_search_with_payload_filters(local_service):
+    texts = ["invoice overdue", "password reset", "invoice overdue"]
+    local_service.store_vectors_batch(
+        "contexts",
+        [
+            {"text": texts[0], "metadata": {"tenant_id": "t1", "workflow_id": "w1"}},
+            {"text": texts[1], "metadata": {"tenant_id": "t1", "workflow_id": "w2"}},
+            {"text": texts[2], "metadata": {"tenant_id": "t2", "workflow_id": "w1"}},
+        ],
+        batch_size=2,
+    )
+
+    unfiltered = local_service.search_similar("contexts", "invoice overdue")
+    assert len(unfiltered) == 2
+
+    tenant = local_service.search_similar(
+        "contexts", "invoice overdue", filters={"tenant_id": "t1"}
+    )
+    assert [r["metadata"]["tenant_id"] for r in tenant] == ["t1"]
+
+    batch = local_service.search_batch(
+        "contexts",
+        ["invoice overdue", "password reset"],
+        filters={"tenant_id": "t1", "workflow_id": ["w1", "w2"]},
+    )
+    assert [[r["text"] for r in results] for results in batch] == [
+        ["invoice overdue"],
+        ["password reset"],
+    ]
@@ -6,11 +6,14 @@ from unittest.mock import Mock, patch
 
 import pytest
 from app.services.workflow_execution_engine import (
+    CyclicDependencyError,
     ExecutionContext,
     ExecutionStatus,
+    MissingDependencyError,
     RetryManager,
     TopologicalExecutor,
     WorkflowExecutionEngine,
+    WorkflowRun,
 )
 
 
@@ -80,6 +83,57 @@ class TestTopologicalExecutor:
         assert plan.execution_order[2] == ["E"]
         assert plan.execution_order[3] == ["F"]
 
+    def test_cycle_detection_reports_path(self):
+        """Test that cyclic dependencies raise with the offending path"""
+        executor = TopologicalExecutor()
+        workflow = {
+            "id": "cyclic_workflow",
+            "steps": {
+                "A": {"type": "input", "depends_on": []},
+                "B": {"type": "process", "depends_on": ["A", "D"]},
+                "C": {"type": "process", "depends_on": ["B"]},
+                "D": {"type": "process", "depends_on": ["C"]},
+                "E": {"type": "output", "depends_on": ["D"]},
+            },
+        }
+
+        with pytest.raises(CyclicDependencyError) as exc_info:
+            executor.create_execution_plan(workflow)
+
+        cycle = exc_info.value.cycle
+        assert cycle[0] == cycle[-1]
+        assert set(cycle) == {"B", "C", "D"}
+
+    def test_missing_dependency(self):
+        """Test that dependencies on undefined steps are rejected"""
+        executor = TopologicalExecutor()
+        workflow = {
+            "id": "missing_dep_workflow",
+            "steps": {"A": {"type": "input", "depends_on": ["ghost"]}},
+        }
+
+        with pytest.raises(MissingDependencyError):
+            executor.create_execution_plan(workflow)
+
+    def test_execution_plan_cache(self):
+        """Test that identical definitions reuse the cached plan"""
+        executor = TopologicalExecutor(plan_cache_size=1)
+        workflow = {
+            "id": "cached_workflow",
+            "steps": {
+                "A": {"type": "input", "depends_on": []},
+                "B": {"type": "process", "depends_on": ["A"]},
+            },
+        }
+
+        plan = executor.create_execution_plan(workflow)
+        assert executor.create_execution_plan(dict(workflow)) is plan
+
+        workflow["steps"]["C"] = {"type": "output", "depends_on": ["B"]}
+        changed_plan = executor.create_execution_plan(workflow)
+        assert changed_plan is not plan
+        assert changed_plan.execution_order[-1] == ["C"]
+
 
 class TestRetryManager:
     """Test retry logic and exponential backoff"""
@@ -257,18 +311,50 @@ class TestWorkflowExecutionEngine:
         engine = WorkflowExecutionEngine()
         workflow_id = "status_test"
 
-        # Simulate some completed steps
-        engine.completed_steps[workflow_id].add("step1")
-        engine.completed_steps[workflow_id].add("step2")
-        engine.step_results[workflow_id]["step1"] = {"result": "data1"}
-        engine.step_results[workflow_id]["step2"] = {"result": "data2"}
+        # Simulate a run with some completed steps
+        run = WorkflowRun(run_id="run-1", workflow_id=workflow_id)
+        run.completed_steps.update({"step1", "step2"})
+        run.step_results["step1"] = {"result": "data1"}
+        run.step_results["step2"] = {"result": "data2"}
+        engine.active_runs[run.run_id] = run
 
-        status = engine.get_execution_status(workflow_id)
+        status = engine.get_execution_status("run-1")
 
         assert status["workflow_id"] == workflow_id
         assert set(status["completed_steps"]) == {"step1", "step2"}
         assert len(status["step_results"]) == 2
 
+        # Looking up by workflow id reports the latest run
+        assert engine.get_execution_status(workflow_id)["run_id"] == "run-1"
+
+    @pytest.mark.asyncio
+    async def test_run_state_isolation_and_retention(self):
+        """Test that runs do not share results and finished runs are bounded"""
+        engine = WorkflowExecutionEngine(max_recent_runs=2)
+        workflow = {
+            "id": "isolation_test",
+            "steps": {
+                "step1": {
+                    "type": "input",
+                    "input": {"data": {"value": 1}},
+                    "depends_on": [],
+                }
+            },
+        }
+
+        results = await asyncio.gather(
+            *(engine.execute_workflow(workflow) for _ in range(3))
+        )
+
+        run_ids = [result["run_id"] for result in results]
+        assert len(set(run_ids)) == 3
+        assert all(result["status"] == "completed" for result in results)
+        assert results[0]["results"] is not results[1]["results"]
+
+        assert engine.active_runs == {}
+        assert list(engine.recent_runs) == run_ids[1:]
+        assert engine.get_execution_status(run_ids[0])["run_id"] is None
+
 
 @pytest.mark.asyncio
 async def test_resource_limiting():
@@ -311,5 +397,51 @@ async def test_resource_limiting():
         assert max_concurrent <= 2  # Should not exceed limit
 
 
+@pytest.mark.asyncio
+async def test_independent_branch_not_blocked_by_slow_step():
+    """Test that a step starts as soon as its own dependencies are done"""
+    engine = WorkflowExecutionEngine()
+
+    workflow = {
+        "id": "ready_queue_test",
+        "steps": {
+            "slow": {"type": "process", "input": {"delay": 0.3}, "depends_on": []},
+            "fast": {"type": "process", "input": {"delay": 0.0}, "depends_on": []},
+            "after_fast": {
+                "type": "process",
+                "input": {"delay": 0.0},
+                "depends_on": ["fast"],
+            },
+            "join": {
+                "type": "process",
+                "input": {"delay": 0.0},
+                "depends_on": ["slow", "after_fast"],
+            },
+        },
+    }
+
+    finished = []
+
+    async def mock_execute(input_data, context):
+        await asyncio.sleep(input_data["delay"])
+        finished.append(context["step_id"])
+        return Mock(success=True, data={"result": context["step_id"]})
+
+    with patch(
+        "app.services.step_executors.factory.StepExecutorFactory.create_executor"
+    ) as mock_factory:
+        mock_executor = Mock()
+        mock_executor.execute = mock_execute
+        mock_factory.return_value = mock_executor
+
+        result = await engine.execute_workflow(workflow)
+
+    assert result["status"] == "completed"
+    # after_fast must not wait for the slow step from the previous level
+    assert finished.index("after_fast") < finished.index("slow")
+    assert finished[-1] == "join"
+    assert result["critical_path"]["steps"] == ["slow", "join"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,111 @@
+"""Tests for the shared background batch worker."""
+
+import asyncio
+from dataclasses import dataclass
+
+from app.utils.batch_worker import BatchWorker, RetryGate
+
+
+@dataclass
+class CountingStats:
+    processed: int = 0
+
+
+class Collector(BatchWorker[int]):
+    """Records each batch; ``hold`` keeps a batch in flight until set."""
+
+    def __init__(self, **options):
+        options.setdefault("max_queue_size", 100)
+        options.setdefault("max_batch_size", 10)
+        options.setdefault("flush_interval", 60)
+        super().__init__(**options)
+        self.stats = CountingStats()
+        self.batches = []
+        self.idle_calls = 0
+        self.hold = asyncio.Event()
+        self.hold.set()
+
+    async def _process_batch(self, batch):
+        await self.hold.wait()
+        self.batches.append(batch)
+        self.stats.processed += len(batch)
+
+    async def _on_idle(self):
+        self.idle_calls += 1
+
+
+async def test_takes_only_queued_items_without_linger():
+    worker = Collector()
+    queue = worker._ensure_started()
+    for n in range(3):
+        queue.put_nowait(n)
+
+    await worker.flush()
+    queue.put_nowait(3)
+    await worker.flush()
+
+    assert worker.batches == [[0, 1, 2], [3]]
+    await worker.close()
+
+
+async def test_linger_collects_until_batch_is_full():
+    worker = Collector(max_batch_size=3, linger=True)
+    queue = worker._ensure_started()
+    for n in range(4):
+        queue.put_nowait(n)
+        await asyncio.sleep(0.01)
+
+    assert worker.batches == [[0, 1, 2]]
+    await worker.flush()
+    assert worker.batches == [[0, 1, 2], [3]]
+    await worker.close()
+
+
+async def test_idle_hook_runs_when_nothing_arrives():
+    worker = Collector(flush_interval=0.01)
+    worker._ensure_started()
+
+    await asyncio.sleep(0.1)
+
+    assert worker.idle_calls >= 2
+    await worker.close()
+
+
+async def test_close_lets_batch_in_flight_finish():
+    worker = Collector()
+    worker.hold.clear()
+    worker._ensure_started().put_nowait(1)
+    await asyncio.sleep(0.01)
+
+    closing = asyncio.create_task(worker.close())
+    await asyncio.sleep(0.01)
+    assert not closing.done()
+    worker.hold.set()
+    await closing
+
+    assert worker.batches == [[1]]
+    assert not worker.is_running()
+
+
+async def test_close_processes_items_left_on_another_loop():
+    worker = Collector()
+
+    async def queue_items():
+        worker._ensure_started().put_nowait(1)
+
+    await asyncio.to_thread(asyncio.run, queue_items())
+    await worker.close()
+
+    assert worker.batches == [[1]]
+    assert worker.get_stats() == {"processed": 1, "buffered": 0}
+
+
+def test_retry_gate_closes_for_its_interval():
+    gate = RetryGate(60)
+    assert gate.is_open()
+
+    gate.trip()
+    assert not gate.is_open()
+
+    gate.reset()
+    assert gate.is_open()
@@ -1,7 +1,8 @@
 """Unit tests for database operations."""
 
+import asyncio
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
@@ -10,9 +11,13 @@ from sqlalchemy.exc import SQLAlchemyError
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 
 from app.database import (
+    async_session_scope,
     check_database_connection,
     create_tables,
     drop_tables,
+    get_async_database_url,
+    get_async_db,
+    get_async_db_session,
     get_db,
     get_db_session,
 )
@@ -107,6 +112,172 @@ class TestDatabaseUtilities:
         mock_logger.error.assert_called()
 
 
+class TestAsyncDatabaseUtilities:
+    """Test cases for the async engine and session helpers."""
+
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            (
+                "postgresql+psycopg2://u:p@db:5432/app",
+                "postgresql+asyncpg://u:p@db:5432/app",
+            ),
+            ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+            ("sqlite:///./local.db", "sqlite+aiosqlite:///./local.db"),
+            ("sqlite+aiosqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+        ],
+    )
+    def test_get_async_database_url(self, url, expected):
+        """Test sync URLs are mapped to their async drivers."""
+        assert get_async_database_url(url) == expected
+
+    def test_get_async_database_url_unsupported(self):
+        """Test databases without a configured async driver are rejected."""
+        with pytest.raises(ValueError):
+            get_async_database_url("oracle://u:p@db/app")
+
+    @patch("app.database.new_async_session")
+    async def test_get_async_db_session_success(self, mock_new_session):
+        """Test successful async session context manager."""
+        mock_session = AsyncMock()
+        mock_new_session.return_value = mock_session
+
+        async with get_async_db_session() as db:
+            assert db == mock_session
+
+        mock_session.commit.assert_awaited_once()
+        mock_session.close.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_get_async_db_session_exception(self, mock_new_session):
+        """Test async session context manager with exception."""
+        mock_session = AsyncMock()
+        mock_new_session.return_value = mock_session
+
+        with pytest.raises(Exception):
+            async with get_async_db_session():
+                raise Exception("Test exception")
+
+        mock_session.rollback.assert_awaited_once()
+        mock_session.close.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_session_scope_shares_one_session(self, mock_new_session):
+        """Test sessions are reused inside a scope, which owns the commit."""
+        mock_session = _mock_async_session()
+        mock_new_session.return_value = mock_session
+
+        async with async_session_scope():
+            async with get_async_db_session() as first:
+                pass
+            async for second in get_async_db():
+                assert second is first
+            mock_session.commit.assert_not_awaited()
+            mock_session.close.assert_not_awaited()
+
+        mock_new_session.assert_called_once()
+        mock_session.begin_nested.assert_called_once()
+        mock_session.commit.assert_awaited_once()
+        mock_session.close.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_shared_session_error_only_undoes_savepoint(self, mock_new_session):
+        """Test an error in a shared block does not roll back the request."""
+        mock_session = _mock_async_session()
+        mock_new_session.return_value = mock_session
+
+        async with async_session_scope():
+            with pytest.raises(ValueError):
+                async with get_async_db_session():
+                    raise ValueError("step failed")
+
+        savepoint = mock_session.begin_nested.return_value
+        assert savepoint.__aexit__.await_args.args[0] is ValueError
+        mock_session.rollback.assert_not_awaited()
+        mock_session.commit.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_failed_scope_is_not_committed(self, mock_new_session):
+        """Test a scope that raises discards its work."""
+        mock_session = _mock_async_session()
+        mock_new_session.return_value = mock_session
+
+        with pytest.raises(RuntimeError):
+            async with async_session_scope():
+                async with get_async_db_session():
+                    pass
+                raise RuntimeError("request failed")
+
+        mock_session.commit.assert_not_awaited()
+        mock_session.close.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_unshared_session_inside_scope(self, mock_new_session):
+        """Test shared=False opens and commits a session of its own."""
+        mock_new_session.side_effect = lambda: _mock_async_session()
+
+        async with async_session_scope():
+            async with get_async_db_session() as scoped:
+                pass
+            async with get_async_db_session(shared=False) as own:
+                assert own is not scoped
+            own.commit.assert_awaited_once()
+            own.close.assert_awaited_once()
+
+    @patch("app.database.new_async_session")
+    async def test_session_scope_opens_session_lazily(self, mock_new_session):
+        """Test a scope that never uses the database opens no session."""
+        async with async_session_scope():
+            pass
+
+        mock_new_session.assert_not_called()
+
+    @patch("app.database.new_async_session")
+    async def test_concurrent_task_gets_own_session(self, mock_new_session):
+        """Test a task spawned during the request never shares the session
+        while the request is using it."""
+        mock_new_session.side_effect = lambda: _mock_async_session()
+
+        async def background():
+            async with get_async_db_session() as db:
+                return db
+
+        async with async_session_scope():
+            async for scoped in get_async_db():
+                task = asyncio.create_task(background())
+                assert await task is not scoped
+
+        assert mock_new_session.call_count == 2
+
+    @patch("app.database.new_async_session")
+    async def test_task_outliving_scope_gets_own_session(self, mock_new_session):
+        """Test work left running after the scope does not reuse its session."""
+        mock_new_session.side_effect = lambda: _mock_async_session()
+        release = asyncio.Event()
+
+        async def background():
+            await release.wait()
+            async with get_async_db_session() as db:
+                return db
+
+        async with async_session_scope():
+            async with get_async_db_session() as scoped:
+                pass
+            task = asyncio.create_task(background())
+
+        release.set()
+        assert await task is not scoped
+        assert mock_new_session.call_count == 2
+
+
+def _mock_async_session():
+    session = AsyncMock()
+    savepoint = MagicMock()
+    savepoint.__aexit__.return_value = False
+    session.begin_nested = MagicMock(return_value=savepoint)
+    return session
+
+
 class TestDatabaseInitialization:
     """Test cases for database initialization."""
 
@@ -0,0 +1,263 @@
+"""Tests for buffered, batched error shipping."""
+
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.utils.error_aggregator import ErrorAggregator, ErrorSpool
+
+
+@pytest.fixture
+async def correlation_service():
+    """Local stand-in for the correlation service that records what it
+    receives; set ``status`` to make it fail and clear ``gate`` to hold
+    responses back."""
+    state = {"status": 200, "batches": [], "single": [], "gate": asyncio.Event()}
+    state["gate"].set()
+
+    async def aggregate_batch(request):
+        await state["gate"].wait()
+        if state["status"] != 200:
+            return web.Response(status=state["status"], text="unavailable")
+        state["batches"].append(await request.json())
+        return web.json_response({"accepted": True})
+
+    async def aggregate(request):
+        state["single"].append(await request.json())
+        return web.json_response({"accepted": True})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/error-correlation/aggregate/batch", aggregate_batch)
+    app.router.add_post("/api/v1/error-correlation/aggregate", aggregate)
+
+    server = TestServer(app)
+    await server.start_server()
+    state["url"] = str(server.make_url("")).rstrip("/")
+    yield state
+    await server.close()
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    return str(tmp_path / "spool")
+
+
+async def _report(aggregator, message, code="E1"):
+    return await aggregator.aggregate_raw_error(message=message, code=code)
+
+
+class TestBufferedShipping:
+    async def test_identical_errors_are_deduplicated_with_counts(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], flush_interval=60, spool_dir=spool_dir
+        )
+        for _ in range(5):
+            assert await _report(aggregator, "db down")
+        await _report(aggregator, "db down", code="E2")
+
+        await aggregator.flush()
+
+        batches = correlation_service["batches"]
+        assert len(batches) == 1
+        counts = {e["code"]: e["occurrence_count"] for e in batches[0]}
+        assert counts == {"E1": 5, "E2": 1}
+        assert aggregator.stats.deduplicated == 4
+        await aggregator.close()
+
+    async def test_repeats_after_shipping_start_a_new_entry(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], flush_interval=60, spool_dir=spool_dir
+        )
+        await _report(aggregator, "db down")
+        await aggregator.flush()
+        await _report(aggregator, "db down")
+        await aggregator.close()
+
+        batches = correlation_service["batches"]
+        assert [[e["occurrence_count"] for e in batch] for batch in batches] == [
+            [1],
+            [1],
+        ]
+
+    async def test_flushes_when_batch_size_reached(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"],
+            max_batch_size=3,
+            flush_interval=60,
+            spool_dir=spool_dir,
+        )
+        for i in range(3):
+            await _report(aggregator, f"error {i}")
+
+        for _ in range(50):
+            if correlation_service["batches"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert [len(batch) for batch in correlation_service["batches"]] == [3]
+        await aggregator.close()
+
+    async def test_flushes_on_interval(self, correlation_service, spool_dir):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], flush_interval=0.05, spool_dir=spool_dir
+        )
+        await _report(aggregator, "slow trickle")
+
+        await asyncio.sleep(0.3)
+
+        assert len(correlation_service["batches"]) == 1
+        await aggregator.close()
+
+    async def test_spills_while_service_down_and_replays(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"],
+            flush_interval=60,
+            retry_interval=0,
+            spool_dir=spool_dir,
+        )
+        correlation_service["status"] = 503
+        await _report(aggregator, "first")
+        await aggregator.flush()
+        await _report(aggregator, "second")
+        await aggregator.flush()
+
+        assert correlation_service["batches"] == []
+        assert len(aggregator.spool) == 2
+        assert aggregator.stats.spilled == 2
+
+        correlation_service["status"] = 200
+        await aggregator._replay_spool()
+
+        assert [b[0]["message"] for b in correlation_service["batches"]] == [
+            "first",
+            "second",
+        ]
+        assert len(aggregator.spool) == 0
+        assert aggregator.stats.replayed == 2
+        await aggregator.close()
+
+    async def test_skips_sends_until_retry_interval_elapses(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"],
+            flush_interval=60,
+            retry_interval=60,
+            spool_dir=spool_dir,
+        )
+        correlation_service["status"] = 503
+        await _report(aggregator, "first")
+        await aggregator.flush()
+        correlation_service["status"] = 200
+        await _report(aggregator, "second")
+        await aggregator.flush()
+
+        assert correlation_service["batches"] == []
+        assert aggregator.stats.failed_batches == 1
+        assert len(aggregator.spool) == 2
+        await aggregator.close()
+
+    async def test_close_drains_pending_errors(self, correlation_service, spool_dir):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], flush_interval=60, spool_dir=spool_dir
+        )
+        await _report(aggregator, "pending at shutdown")
+
+        await aggregator.close()
+
+        assert len(correlation_service["batches"]) == 1
+        assert aggregator.get_stats()["pending"] == 0
+
+    async def test_close_waits_for_batch_in_flight(
+        self, correlation_service, spool_dir
+    ):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], flush_interval=0.01, spool_dir=spool_dir
+        )
+        correlation_service["gate"].clear()
+        await _report(aggregator, "shipping at shutdown")
+        await asyncio.sleep(0.1)
+        assert aggregator.get_stats()["pending"] == 0  # taken by the worker
+
+        closing = asyncio.create_task(aggregator.close())
+        await asyncio.sleep(0.01)
+        correlation_service["gate"].set()
+        await closing
+
+        assert [b[0]["message"] for b in correlation_service["batches"]] == [
+            "shipping at shutdown"
+        ]
+
+    async def test_full_buffer_drops_new_errors(self, correlation_service, spool_dir):
+        aggregator = ErrorAggregator(
+            correlation_service["url"],
+            max_pending=2,
+            max_batch_size=10,
+            spool_dir=spool_dir,
+        )
+        assert await _report(aggregator, "a")
+        assert await _report(aggregator, "b")
+        assert not await _report(aggregator, "c")
+        assert aggregator.stats.dropped == 1
+        await aggregator.close()
+
+    async def test_unbuffered_posts_each_error(self, correlation_service, spool_dir):
+        aggregator = ErrorAggregator(
+            correlation_service["url"], buffered=False, spool_dir=spool_dir
+        )
+        await _report(aggregator, "direct")
+        await aggregator.close()
+
+        assert [e["message"] for e in correlation_service["single"]] == ["direct"]
+        assert correlation_service["batches"] == []
+
+
+class TestErrorSpool:
+    def test_discards_oldest_batches_beyond_limit(self, tmp_path):
+        spool = ErrorSpool(str(tmp_path), max_batches=2)
+        for i in range(3):
+            spool.put([{"n": i}])
+
+        assert len(spool) == 2
+        path, batch = spool.claim()
+        assert batch == [{"n": 1}]
+        spool.remove(path)
+        assert spool.claim()[1] == [{"n": 2}]
+
+    def test_skips_unreadable_files(self, tmp_path):
+        spool = ErrorSpool(str(tmp_path))
+        (tmp_path / "00000000000000000000-0-000000.json").write_text("{not json")
+        spool.put([{"n": 1}])
+
+        assert spool.claim()[1] == [{"n": 1}]
+        assert len(spool) == 0
+
+    def test_claimed_batch_is_not_handed_out_again(self, tmp_path):
+        spool = ErrorSpool(str(tmp_path))
+        other_process = ErrorSpool(str(tmp_path))
+        spool.put([{"n": 1}])
+
+        path, _ = spool.claim()
+        assert other_process.claim() is None
+
+        spool.release(path)
+        assert other_process.claim()[1] == [{"n": 1}]
+
+    def test_claims_of_dead_processes_are_recovered(self, tmp_path):
+        spool = ErrorSpool(str(tmp_path))
+        spool.put([{"n": 1}])
+        path, _ = spool.claim()
+        dead_pid = 2**22 + 1  # above the default pid_max
+        path.rename(str(path).replace(f".{os.getpid()}-", f".{dead_pid}-"))
+
+        assert ErrorSpool(str(tmp_path)).claim()[1] == [{"n": 1}]
@@ -0,0 +1,297 @@
+"""Tests for the indexed, time-bucketed log aggregator"""
+
+import asyncio
+import gzip
+import json
+import logging
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from app.utils.log_aggregator import LogAggregator, LogEntry, LogFilter, LogLevel
+
+COMPONENTS = ["api", "engine", "worker", None]
+LEVELS = list(LogLevel)
+
+
+def _random_entries(count, seed=7, span_hours=30):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        LogEntry(
+            timestamp=now - timedelta(seconds=rng.uniform(0, span_hours * 3600)),
+            level=rng.choice(LEVELS),
+            message=f"message {rng.randint(0, 5)}",
+            correlation_id=f"corr-{rng.randint(0, 50)}",
+            event=rng.choice(["start", "stop", None]),
+            component=rng.choice(COMPONENTS),
+            user_id=rng.choice(["u1", "u2", None]),
+        )
+        for _ in range(count)
+    ]
+
+
+def _ids(entries):
+    return sorted(id(entry) for entry in entries)
+
+
+@pytest.fixture
+def populated():
+    entries = _random_entries(3000)
+    aggregator = LogAggregator(max_entries=5000)
+    for entry in entries:
+        aggregator.add_entry(entry)
+    return aggregator, entries
+
+
+class TestLogAggregatorStore:
+    @pytest.mark.parametrize(
+        "criteria",
+        [
+            {"correlation_id": "corr-3"},
+            {"component": "engine", "level": LogLevel.ERROR},
+            {"user_id": "u1", "event": "start"},
+            {"level": "warning"},
+            {"component": "missing"},
+            {"message_contains": "MESSAGE 2"},
+            {"hours": 2},
+            {"hours": 2, "component": "api"},
+        ],
+    )
+    def test_filter_matches_full_scan(self, populated, criteria):
+        aggregator, entries = populated
+        criteria = dict(criteria)
+        hours = criteria.pop("hours", None)
+        if hours:
+            criteria["end_time"] = datetime.utcnow()
+            criteria["start_time"] = criteria["end_time"] - timedelta(hours=hours)
+        log_filter = LogFilter(**criteria)
+
+        expected = [entry for entry in entries if log_filter.matches(entry)]
+        assert _ids(aggregator.filter_entries(log_filter)) == _ids(expected)
+
+    def test_windowed_metrics_match_full_scan(self, populated):
+        aggregator, entries = populated
+        metrics = aggregator.get_metrics(time_window_hours=5)
+        start, end = metrics.time_range["start"], metrics.time_range["end"]
+        window = [e for e in entries if start <= e.timestamp <= end]
+
+        levels = Counter(e.level.value for e in window)
+        errors = [e for e in window if e.level in (LogLevel.ERROR, LogLevel.CRITICAL)]
+        assert metrics.total_entries == len(window)
+        assert metrics.entries_by_level == dict(levels)
+        assert metrics.entries_by_component == dict(
+            Counter(e.component for e in window if e.component)
+        )
+        assert metrics.entries_by_event == dict(
+            Counter(e.event for e in window if e.event)
+        )
+        assert metrics.error_rate == pytest.approx(len(errors) / len(window) * 100)
+        top = {item["message"]: item["count"] for item in metrics.top_errors}
+        assert top == dict(Counter(e.message for e in errors))
+
+    def test_filtered_metrics_use_matching_entries(self, populated):
+        aggregator, entries = populated
+        metrics = aggregator.get_metrics(LogFilter(component="api"))
+        start = metrics.time_range["start"]
+        expected = [e for e in entries if e.component == "api" and e.timestamp >= start]
+
+        assert metrics.total_entries == len(expected)
+        assert metrics.entries_by_component == {"api": len(expected)}
+
+    def test_component_health_matches_full_scan(self, populated):
+        aggregator, entries = populated
+        health = aggregator.get_component_health("worker", hours=3)
+        cutoff = datetime.utcnow() - timedelta(hours=3)
+        window = [
+            e for e in entries if e.component == "worker" and e.timestamp >= cutoff
+        ]
+        errors = [e for e in window if e.level in (LogLevel.ERROR, LogLevel.CRITICAL)]
+
+        assert health["total_entries"] == len(window)
+        assert health["error_count"] == len(errors)
+        assert health["last_activity"] == max(e.timestamp for e in window)
+        assert aggregator.get_component_health("missing")["status"] == "unknown"
+
+    def test_correlation_trace_and_user_activity(self, populated):
+        aggregator, entries = populated
+        trace = aggregator.get_correlation_trace("corr-7")
+        assert trace == sorted(
+            (e for e in entries if e.correlation_id == "corr-7"),
+            key=lambda e: e.timestamp,
+        )
+
+        activity = aggregator.get_user_activity("u2", hours=1)
+        timestamps = [e.timestamp for e in activity]
+        assert timestamps == sorted(timestamps, reverse=True)
+        assert all(e.user_id == "u2" for e in activity)
+
+    def test_capacity_evicts_oldest_and_updates_indexes(self):
+        aggregator = LogAggregator(max_entries=100, bucket_seconds=10)
+        start = datetime.utcnow() - timedelta(minutes=30)
+        entries = [
+            LogEntry(
+                timestamp=start + timedelta(seconds=n),
+                level=LogLevel.ERROR if n % 2 else LogLevel.INFO,
+                message="boom",
+                correlation_id=f"c{n}",
+                component="api",
+            )
+            for n in range(250)
+        ]
+        for entry in entries:
+            aggregator.add_entry(entry)
+
+        assert len(aggregator) == 100
+        assert aggregator.entries == entries[-100:]
+        assert aggregator.get_correlation_trace("c10") == []
+        assert aggregator.get_correlation_trace("c200") == [entries[200]]
+        assert len(aggregator.filter_entries(LogFilter(level=LogLevel.ERROR))) == 50
+
+        metrics = aggregator.get_metrics()
+        assert metrics.total_entries == 100
+        assert metrics.top_errors == [
+            {"message": "boom", "count": 50, "percentage": 100.0}
+        ]
+
+    def test_clear_old_entries(self, populated):
+        aggregator, entries = populated
+        removed = aggregator.clear_old_entries(hours=24)
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+
+        assert removed == sum(1 for e in entries if e.timestamp <= cutoff)
+        assert len(aggregator) == len(entries) - removed
+        assert all(e.timestamp > cutoff for e in aggregator.entries)
+        old = next(e for e in entries if e.timestamp <= cutoff)
+        assert old not in aggregator.get_correlation_trace(old.correlation_id)
+
+    def test_clear_old_entries_inside_a_bucket(self):
+        aggregator = LogAggregator(bucket_seconds=3600)
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        hour -= timedelta(hours=3)
+        for minute, component in ((10, "api"), (10, "api"), (40, "db")):
+            aggregator.add_entry(
+                LogEntry(
+                    timestamp=hour + timedelta(minutes=minute),
+                    level=LogLevel.INFO,
+                    message=component,
+                    component=component,
+                )
+            )
+        cutoff = hour + timedelta(minutes=20)
+        hours = (datetime.utcnow() - cutoff).total_seconds() / 3600
+
+        assert aggregator.clear_old_entries(hours=hours) == 2
+        assert [e.message for e in aggregator.entries] == ["db"]
+        bucket = next(aggregator._iter_buckets())
+        assert bucket.component_last == {"db": hour + timedelta(minutes=40)}
+
+    def test_out_of_order_entries(self):
+        aggregator = LogAggregator(bucket_seconds=60)
+        now = datetime.utcnow()
+        for minutes in (5, 50, 20):
+            aggregator.add_entry(
+                LogEntry(
+                    timestamp=now - timedelta(minutes=minutes),
+                    level=LogLevel.INFO,
+                    message=str(minutes),
+                )
+            )
+
+        assert [e.message for e in aggregator.entries] == ["50", "20", "5"]
+        assert aggregator.get_metrics(time_window_hours=1).total_entries == 3
+
+
+def _log_line(n, **overrides):
+    record = {
+        "timestamp": (datetime.utcnow() - timedelta(seconds=n)).isoformat(),
+        "level": "info",
+        "message": f"step {n}",
+        "correlation_id": f"corr-{n % 3}",
+        "event": "step_done",
+        "component": "engine",
+        "context": {"n": n},
+    }
+    record.update(overrides)
+    return json.dumps(record)
+
+
+class TestLogIngestion:
+    def test_ingest_lines_parses_chunks_and_recovers_bad_lines(self):
+        aggregator = LogAggregator()
+        lines = [_log_line(n) for n in range(25)]
+        lines[7] = "not json at all"
+        lines[12] = ""
+        lines[20] = _log_line(20, level="ERROR")
+
+        stats = aggregator.ingest_lines(lines, chunk_size=10)
+
+        assert (stats.lines, stats.ingested) == (25, 24)
+        assert (stats.parse_failures, stats.skipped) == (1, 1)
+        assert len(aggregator) == 24
+        messages = {entry.message for entry in aggregator.entries}
+        assert "not json at all" in messages
+        assert {f"step {n}" for n in range(25) if n not in (7, 12)} <= messages
+        assert len(aggregator.filter_entries(LogFilter(level=LogLevel.ERROR))) == 1
+        assert aggregator.get_correlation_trace("corr-1")[0].context["n"] % 3 == 1
+
+    def test_repeated_strings_are_interned(self):
+        aggregator = LogAggregator()
+        aggregator.ingest_lines(
+            [_log_line(n, component="".join(["eng", "ine"])) for n in range(5)]
+        )
+
+        components = {id(entry.component) for entry in aggregator.entries}
+        events = {id(entry.event) for entry in aggregator.entries}
+        assert len(components) == len(events) == 1
+
+    def test_parse_failures_are_counted_and_sampled(self, caplog):
+        aggregator = LogAggregator(parse_failure_log_every=10)
+        with caplog.at_level(logging.WARNING, logger="app.utils.log_aggregator"):
+            stats = aggregator.ingest_lines([f"garbage {n}" for n in range(25)])
+            aggregator.add_from_log_line("[1, 2]")
+
+        assert stats.parse_failures == 25
+        assert aggregator.parse_failures == 26
+        warnings = [r for r in caplog.records if "Failed to parse" in r.message]
+        assert len(warnings) == 3  # failures 1, 10 and 20
+
+    def test_ingest_gzipped_file_as_bytes(self, tmp_path):
+        path = tmp_path / "app.log.gz"
+        with gzip.open(path, "wt") as log_file:
+            for n in range(50):
+                log_file.write(_log_line(n) + "\n")
+            log_file.write("{broken\n")
+
+        aggregator = LogAggregator()
+        stats = aggregator.ingest_file(str(path), chunk_size=16)
+
+        assert stats.ingested == 51
+        assert stats.parse_failures == 1
+        assert aggregator.get_metrics().entries_by_component == {"engine": 50}
+
+    @pytest.mark.asyncio
+    async def test_ingest_stream_from_stream_reader(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(
+            "".join(_log_line(n) + "\n" for n in range(30)).encode("utf-8")
+        )
+        reader.feed_eof()
+
+        aggregator = LogAggregator()
+        stats = await aggregator.ingest_stream(reader, chunk_size=8)
+
+        assert stats.ingested == 30
+        assert stats.parse_failures == 0
+        assert stats.lines_per_second > 0
+
+    def test_add_from_log_line_keeps_single_line_behaviour(self):
+        aggregator = LogAggregator()
+        aggregator.add_from_log_line(_log_line(1, level="warning", user_id="u9"))
+        aggregator.add_from_log_line("plain text")
+
+        first, second = sorted(aggregator.entries, key=lambda e: e.message)
+        assert (first.level, second.level) == (LogLevel.INFO, LogLevel.WARNING)
+        assert second.user_id == "u9"
+        assert first.message == "plain text"
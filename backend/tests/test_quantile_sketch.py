@@ -0,0 +1,64 @@
+"""Tests for the streaming quantile sketches"""
+
+import random
+
+import pytest
+from app.utils.quantile_sketch import QuantileSketch, WindowedQuantileSketch
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestQuantileSketch:
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(42)
+        values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99, 0.999):
+            exact = _exact_quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+        assert sketch.count == len(values)
+        assert sketch.max == max(values)
+        assert set(sketch.percentiles()) == {"p50", "p95", "p99", "p999"}
+
+    def test_merge_matches_single_sketch(self):
+        left, right, combined = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 1001):
+            (left if value % 2 else right).add(value)
+            combined.add(value)
+
+        left.merge(QuantileSketch.from_dict(right.to_dict()))
+
+        assert left.count == combined.count
+        assert left.percentiles() == combined.percentiles()
+
+    def test_bins_are_bounded(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_bins=64)
+        for exponent in range(-20, 20):
+            for _ in range(10):
+                sketch.add(10**exponent)
+
+        assert len(sketch.to_dict()["bins"]) <= 64
+        assert sketch.quantile(0.999) == pytest.approx(1e19, rel=0.02)
+
+
+class TestWindowedQuantileSketch:
+    def test_window_selection_and_expiry(self):
+        windowed = WindowedQuantileSketch(interval_seconds=60, num_intervals=5)
+        windowed.add(1000, timestamp=0)
+        windowed.add(10, timestamp=240)
+        windowed.add(20, timestamp=270)
+
+        assert windowed.snapshot(now=270).count == 3
+        assert windowed.snapshot(window_seconds=60, now=270).max == 20
+
+        windowed.add(30, timestamp=300)
+        # The first slot has slid out of the five-minute window
+        assert windowed.snapshot(now=300).max == 30
+        assert windowed.total_count == 4
@@ -0,0 +1,135 @@
+"""Tests for RelayCore message dispatch."""
+
+import asyncio
+
+import pytest
+from app.core.relay_core import (
+    AIRoutingEngine,
+    DestinationStats,
+    MessagePriority,
+    MessageStatus,
+    PriorityDispatchQueue,
+    RelayCore,
+    RelayMessage,
+)
+
+
+def _message(n, destination="ai", priority=MessagePriority.NORMAL):
+    return RelayMessage(
+        id=f"m{n}",
+        source="test",
+        destination=destination,
+        payload={"n": n},
+        priority=priority,
+    )
+
+
+def test_queue_orders_by_priority_then_fifo():
+    queue = PriorityDispatchQueue()
+    queue.push(_message(1))
+    queue.push(_message(2, priority=MessagePriority.CRITICAL))
+    queue.push(_message(3))
+    queue.push(_message(4, priority=MessagePriority.CRITICAL))
+
+    order = []
+    while (message := queue.acquire()) is not None:
+        order.append(message.id)
+        queue.release(message.destination)
+
+    assert order == ["m2", "m4", "m1", "m3"]
+
+
+def test_queue_parks_messages_for_saturated_destination():
+    queue = PriorityDispatchQueue(max_in_flight_per_destination=1)
+    queue.push(_message(1, "ai", MessagePriority.HIGH))
+    queue.push(_message(2, "ai", MessagePriority.HIGH))
+    queue.push(_message(3, "data"))
+
+    assert queue.acquire().id == "m1"
+    # m2 waits for the ai slot, so lower-priority data traffic goes first
+    assert queue.acquire().id == "m3"
+    assert queue.acquire() is None
+    assert len(queue) == 1
+
+    assert queue.release("ai")
+    assert queue.acquire().id == "m2"
+    assert [m.id for m in queue] == []
+
+
+@pytest.mark.asyncio
+async def test_workers_deliver_concurrently_within_destination_limit():
+    relay = RelayCore(num_workers=4, max_in_flight_per_destination=2)
+    active = {"now": 0, "peak": 0}
+    delivered = []
+
+    async def route_message(message):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        delivered.append(message.id)
+        return True
+
+    relay.route_message = route_message
+    relay._running = True
+    task = asyncio.create_task(relay._process_message_queue())
+
+    for n in range(6):
+        relay.enqueue_message(_message(n))
+    for _ in range(100):
+        if len(delivered) == 6:
+            break
+        await asyncio.sleep(0.01)
+
+    relay._running = False
+    task.cancel()
+
+    assert sorted(delivered) == [f"m{n}" for n in range(6)]
+    assert active["peak"] == 2
+    assert relay.message_queue.in_flight == 0
+
+
+def test_destination_stats_roll_over_window():
+    stats = DestinationStats(window=3)
+    stats.record(False, 3)
+    stats.record(True, 40)
+    stats.record(True, 40)
+    assert stats.failures == 1
+
+    stats.record(True, 600)
+    assert (stats.successes, stats.failures) == (3, 0)
+    assert sum(stats.histogram) == 3
+    assert stats.latency_percentile(50) == 50.0
+    assert stats.latency_percentile(99) == 1000.0
+
+
+@pytest.mark.asyncio
+async def test_histories_are_bounded():
+    relay = RelayCore(history_size=5, stats_window=10)
+    relay.routing_engine = AIRoutingEngine(history_size=3)
+
+    for n in range(20):
+        message = _message(n)
+        await relay.routing_engine._record_routing_decision(message, "ai")
+        message.status = MessageStatus.DELIVERED
+        relay._record_outcome(message, True, 12.0)
+
+    assert [r.id for r in relay.processed_messages] == [f"m{n}" for n in range(15, 20)]
+    assert len(relay.routing_engine.routing_history) == 3
+    assert relay.destination_stats["ai"].total == 10
+    assert relay.get_status()["destinations"]["ai"]["failure_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_optimize_performance_uses_rolling_failure_rate():
+    relay = RelayCore()
+    await relay.optimize_performance()  # no traffic yet
+
+    for n in range(10):
+        message = _message(n)
+        message.status = MessageStatus.FAILED if n < 2 else MessageStatus.DELIVERED
+        relay._record_outcome(message, n >= 2, 5.0)
+    await relay.optimize_performance()
+
+    assert relay.circuit_breaker.ai_predictions["ai"] == pytest.approx(0.2)
+    assert relay.load_balancer.current_algorithm == "least_connections"